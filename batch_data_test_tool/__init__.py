@@ -9,17 +9,31 @@ __version__ = "1.2.22"
 __author__ = "zzti-bsj"
 __email__ = "otnw_bsj@163.com"
 
-from .apps.cola import cola_start
-from .apps.coffee import coffee_start
 from .tools.data_processing import read_dataframe_from_file, clean_dataframe_for_json
 from .tools.http_request import sync_http_request
 from .tools.http_response import structure_request_params, parse_recall_result_special
 
+# 界面入口按需导入：apps 模块导入时会创建日志文件、读取data目录和config.json并创建控件，
+# 只使用 tools 的代码（如多进程解析的子进程）导入包时不应触发这些初始化
+_APP_ENTRIES = {
+    "cola_start": ".apps.cola",
+    "coffee_start": ".apps.coffee",
+    "black_tea_start": ".apps.black_tea",
+}
+
+
+def __getattr__(name):
+    if name in _APP_ENTRIES:
+        from importlib import import_module
+        return getattr(import_module(_APP_ENTRIES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "cola_start",
     "coffee_start",
     "black_tea_start",
-    "read_dataframe_from_file", 
+    "read_dataframe_from_file",
     "clean_dataframe_for_json",
     "sync_http_request",
     "structure_request_params",
@@ -1,17 +1,23 @@
 import os, time, threading
+from functools import partial
 import logging
 import json
 import pandas as pd
 import ipywidgets as widgets
-from concurrent.futures import ThreadPoolExecutor
-from ..tools.data_processing import read_dataframe_from_file, clean_dataframe_for_json
-from ..tools.http_request import sync_http_request, parse_http_stream_false_response, parse_http_stream_true_response
-from ..tools.http_response import structure_request_params, parse_recall_result_special
+from ..tools.data_processing import read_dataframe_from_file, clean_dataframe_for_json, ChunkedDataFile, DEFAULT_CHUNK_SIZE
+from ..tools.http_request import parse_http_stream_false_response, parse_http_stream_true_response
+from ..tools.http_session import acquire_pooled_session, release_pooled_session
+from ..tools.http_response import parse_recall_result_special
 from ..tools import DATA_PROCESSING_METHODS, RESPONSE_PARSING_METHODS, get_json_field_value, get_all_json_keys
 from ..tools.get_config import get_api_url_name_list, get_api_params_placeholder_list_by_name, get_api_url_by_name, get_api_headers_by_name, get_api_params_by_name, get_api_timeout_by_name
 from IPython.display import display
-from ..concurrency.multi_threading import multi_exec
+from ..concurrency.async_engine import is_async_engine_available
+from ..concurrency.batch_runner import BatchRequestConfig, run_request_chunks
 from ..tools.structured_log import structured_logging_metadata, structured_logging_row_detail
+from ..tools.result_sink import ResultSink, IncrementalResultWriter, FSYNC_NEVER, FSYNC_WRITE, FSYNC_CLOSE
+from ..components.ui_scheduler import UIRefreshScheduler
+from ..tools.metrics import PHASE_COLUMNS, summarize_phase_timings, LiveBatchStats
+from ..tools.field_extractor import FieldSpec, FieldExtractor, ParsedDocumentCache, extract_fields, extract_fields_parallel
 
 if not os.path.exists('logs'):
     os.makedirs('logs')
@@ -42,7 +48,9 @@ detailed_logger.propagate = False  # 防止传播到根日志器
 
 # 全局数据
 df = None
+data_source = None  # 分块读取时的数据文件（ChunkedDataFile），此时df只保存第一个分块
 result_data = None  # 存储批量处理的结果
+result_file_path = None  # 自动保存时完整结果所在的文件，此时result_data只保留前若干行预览
 processing_lock = threading.Lock()  # 处理锁，防止重复执行
 is_processing = False  # 当前是否正在处理
 
@@ -70,9 +78,36 @@ step001_dropdown = widgets.Dropdown(
 # Step002. 读取数据
 step002_output = widgets.Output()
 
+# 分块读取：大文件不整表加载，只读取第一个分块用于预览和选择列，批量请求时逐块读取并发送
+chunked_read_checkbox = widgets.Checkbox(
+    value=False,
+    description='分块读取大文件',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 分块读取的每块行数
+read_chunk_size_input = widgets.BoundedIntText(
+    value=DEFAULT_CHUNK_SIZE,
+    min=100,
+    max=1000000,
+    step=1000,
+    description='读取分块行数:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 列裁剪：读取数据时只读取第一个分块，批量请求时只读取占位符映射列和透传列
+column_projection_checkbox = widgets.Checkbox(
+    value=False,
+    description='列裁剪（只读取映射列）',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
 def on_read_button_clicked(b):
     """按钮点击事件处理函数"""
-    global df
+    global df, data_source
     with step002_output:
         step002_output.clear_output()  # 清空之前的输出
         try:
@@ -81,10 +116,22 @@ def on_read_button_clicked(b):
             print(f"正在读取文件: {filepath}")
             
             # 读取数据
-            df = read_dataframe_from_file(filepath)
+            if chunked_read_checkbox.value or column_projection_checkbox.value:
+                data_source = ChunkedDataFile(filepath, chunk_size=read_chunk_size_input.value)
+                df = data_source.first_chunk()
+                if chunked_read_checkbox.value:
+                    print(f"📦 分块读取模式：每块 {data_source.chunk_size} 行，批量请求时逐块读取")
+                if column_projection_checkbox.value:
+                    print("🪶 列裁剪模式：批量请求时只读取映射列和透传列")
+            else:
+                data_source = None
+                df = read_dataframe_from_file(filepath)
             
             print(f"✅ 数据读取成功！")
-            print(f"📊 数据形状: {df.shape}")
+            print(f"📊 数据形状: {df.shape if data_source is None else data_source.shape}")
+            encoding = data_source.encoding if data_source is not None else df.attrs.get('encoding')
+            if encoding:
+                print(f"🔤 文件编码: {encoding}")
             print(f"📋 列名: {df.columns.tolist()}")
             
             # 自动更新列选择器
@@ -165,6 +212,15 @@ step000_api_config_selector.observe(on_api_config_changed, names='value')
 # 初始化列选择器容器
 columns_container.children = columns_selector
 
+# 列裁剪时除映射列外，额外读取并保留在结果中的列
+passthrough_columns_selector = widgets.SelectMultiple(
+    options=[],
+    value=[],
+    description='透传列',
+    disabled=True,
+    layout=widgets.Layout(width='300px', height='100px')
+)
+
 # 当数据改变时自动更新列选择器
 def update_columns():
     global df, columns_selector
@@ -174,12 +230,17 @@ def update_columns():
             column.value = df.columns.tolist()[0]
             column.disabled = False
             columns_selector[index] = column
+        passthrough_columns_selector.options = df.columns.tolist()
+        passthrough_columns_selector.value = []
+        passthrough_columns_selector.disabled = False
     else:
         for index, column in enumerate(columns_selector):
             column.options = []
             column.value = None
             column.disabled = True
             columns_selector[index] = column
+        passthrough_columns_selector.options = []
+        passthrough_columns_selector.disabled = True
 
 
 # Step004.1 展示选中列数据
@@ -217,6 +278,26 @@ max_workers_selector = widgets.IntSlider(
     style={'description_width': 'initial'}
 )
 
+# 执行引擎选择器：线程池受限于OS线程数，asyncio引擎可在单事件循环上保持上千个在途请求
+engine_selector = widgets.Dropdown(
+    options=[('线程池', 'thread'), ('asyncio', 'asyncio')] if is_async_engine_available() else [('线程池', 'thread')],
+    value='thread',
+    description='执行引擎:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# asyncio引擎并发数
+async_concurrency_input = widgets.BoundedIntText(
+    value=500,
+    min=1,
+    max=5000,
+    step=100,
+    description='asyncio并发数:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
 # 进度条
 progress_bar = widgets.IntProgress(
     value=0,
@@ -235,7 +316,46 @@ progress_text = widgets.HTML(
     layout=widgets.Layout(width='100%')
 )
 
-# 自动保存勾选框
+
+def format_bytes(num_bytes: int) -> str:
+    """字节数转换为可读的大小"""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_progress_text(completed: int, total: int) -> str:
+    """进度值文本HTML"""
+    return f'<div style="text-align: center; color: #495057; font-size: 14px; margin-top: 5px;">{completed}/{total}</div>'
+
+
+# 进度界面刷新节流：最多每 UI_REFRESH_INTERVAL_MS 毫秒刷新一次，
+# UI_REFRESH_EVERY 不为None时每完成这么多个请求也刷新一次
+UI_REFRESH_INTERVAL_MS = 200
+UI_REFRESH_EVERY = None
+
+# 实时延迟统计（p50/p90/p99/max、吞吐量、错误率），随进度界面一起刷新
+latency_stats_html = widgets.HTML(
+    value='',
+    layout=widgets.Layout(width='100%')
+)
+
+
+def format_latency_stats(snapshot: dict) -> str:
+    """将LiveBatchStats快照渲染为HTML"""
+    def ms(value):
+        return '-' if value is None else f"{value * 1000:.0f}ms"
+
+    return (
+        '<div style="text-align: center; color: #495057; font-size: 13px; margin-top: 5px;">'
+        f"p50 {ms(snapshot['p50'])} | p90 {ms(snapshot['p90'])} | p99 {ms(snapshot['p99'])} | max {ms(snapshot['max'])}"
+        f" | 吞吐 {snapshot['throughput']:.1f} req/s | 错误率 {snapshot['error_rate']:.1%}"
+        '</div>'
+    )
+
+# 自动保存勾选框：批量请求过程中把已完成的行按输入顺序增量追加写入结果文件
 auto_save_checkbox = widgets.Checkbox(
     value=False,
     description='自动保存',
@@ -243,6 +363,72 @@ auto_save_checkbox = widgets.Checkbox(
     style={'description_width': 'initial'}
 )
 
+# 自动保存的文件格式
+auto_save_format_dropdown = widgets.Dropdown(
+    options=[('CSV', 'csv'), ('JSONL', 'jsonl'), ('Parquet', 'parquet')],
+    value='csv',
+    description='保存格式:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 自动保存的写入间隔：距上次写入超过该秒数，或累计 AUTO_SAVE_FLUSH_ROWS 行时写入一批
+AUTO_SAVE_FLUSH_ROWS = 1000
+# 自动保存且分块读取（或总行数超过 AUTO_SAVE_FULL_RESULT_MAX_ROWS）时完整结果只写入文件，
+# 内存中只保留 AUTO_SAVE_PREVIEW_ROWS 行预览（用于结果预览和解析字段配置）；否则仍在内存中保留完整结果
+AUTO_SAVE_PREVIEW_ROWS = 100
+AUTO_SAVE_FULL_RESULT_MAX_ROWS = 100000
+auto_save_flush_interval_input = widgets.BoundedFloatText(
+    value=5.0,
+    min=0.1,
+    max=3600,
+    step=1,
+    description='写入间隔(秒):',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 自动保存的落盘（fsync）策略
+auto_save_fsync_dropdown = widgets.Dropdown(
+    options=[('结束时落盘', FSYNC_CLOSE), ('每次写入落盘', FSYNC_WRITE), ('不强制落盘', FSYNC_NEVER)],
+    value=FSYNC_CLOSE,
+    description='落盘策略:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 流式请求勾选框：边接收边解析SSE事件，记录首字节时间、首个事件时间、事件间隔和总耗时
+stream_request_checkbox = widgets.Checkbox(
+    value=False,
+    description='流式请求（记录首字节/首事件/事件间隔耗时）',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 分阶段耗时勾选框：记录每行的排队/构建/连接/首字节/下载/解析耗时，并在结束时输出汇总
+phase_timing_checkbox = widgets.Checkbox(
+    value=False,
+    description='记录分阶段耗时',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 请求时解析勾选框：已配置解析字段时，每个响应到达后立即在工作线程中解析
+inline_parse_checkbox = widgets.Checkbox(
+    value=False,
+    description='请求时解析（需先配置Step005.1解析字段）',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 丢弃原始响应勾选框：请求时解析后不保留response_text，降低内存占用
+drop_response_text_checkbox = widgets.Checkbox(
+    value=False,
+    description='请求时解析后丢弃原始响应',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
 # Step005. 执行批量测试
 step005_output = widgets.Output()
 
@@ -257,7 +443,7 @@ def process_batch_http_request(
     params: str,
     timeout: float = 30
 ):
-    global preview_response_first, is_processing, result_data
+    global preview_response_first, is_processing, result_data, result_file_path
     
     # 使用锁防止重复执行
     with processing_lock:
@@ -267,162 +453,216 @@ def process_batch_http_request(
         
         is_processing = True
     
+    completed_count = 0
+    success_count = 0
+    new_df = None  # 当前分块（只含用户选择的列）
+    result_store = None  # 当前分块的结果缓冲区
+    result_writer = None  # 自动保存时的增量结果写入器
+    ui_refresher = None  # 进度界面刷新器（含定时刷新线程），结束或异常时关闭
+    chunk_results = []  # 已完成分块的结果（自动保存时只保留预览行）
+    preview_row_count = 0  # 自动保存时已保留的预览行数
+    keep_preview_only = False  # 是否只在内存中保留预览行（完整结果在自动保存文件中）
+    # 并发数在开始时确定：请求使用的连接池会话按并发数区分，结束时释放同一个会话
+    max_workers = max_workers_selector.value
+    acquire_pooled_session(api_url, max_workers)
     try:
         # 清空输出区域并重置状态
         step005_output.clear_output()
         progress_bar.value = 0
-        progress_text.value = '<div style="text-align: center; color: #495057; font-size: 14px; margin-top: 5px;">0/0</div>'
+        progress_text.value = format_progress_text(0, 0)
         step005_output.append_stdout("🚀 开始批量HTTP请求处理...\n")
         
-        columns = df.columns.tolist()
-        # 保留用户选择的列
-        new_df = pd.DataFrame()
-        new_df[list(columns)] = df[list(columns)]
+        # 执行引擎：线程池 或 asyncio
+        use_async_engine = engine_selector.value == 'asyncio'
+        # 流式请求：额外记录流式耗时指标列
+        use_stream = stream_request_checkbox.value
+        # 分阶段耗时
+        use_phase_timing = phase_timing_checkbox.value
 
         # 3. 构建请求参数
-        func_params_dic = {}
-        for index, row in new_df.iterrows():
-            try:
-                # 3.1 构建参数
-                # col.description 是占位符的名字
-                # col.value 是数据中列名
-                placeholder_params_mapping_dic = {
-                    col.description: col.value
-                    for col in placeholder_params_mapping_list
-                }
-                request_params = structure_request_params(
-                    row,
-                    placeholder_params_mapping_dic,
-                    json.dumps(params)
+        # col.description 是占位符的名字
+        # col.value 是数据中列名
+        placeholder_params_mapping_dic = {
+            col.description: col.value
+            for col in placeholder_params_mapping_list
+        }
+
+        # 输入为整表DataFrame，或延迟读取的数据文件：
+        # 分块读取时逐块构建请求、发送并合并结果，不整表加载；列裁剪时只读取映射列和透传列
+        columns = list(df.columns)
+        if isinstance(df, ChunkedDataFile):
+            usecols = None
+            if column_projection_checkbox.value:
+                usecols = df.select_columns(
+                    list(placeholder_params_mapping_dic.values()) + list(passthrough_columns_selector.value)
                 )
-                # 3.1.1 字段预处理（pipeline）
-                # for data_processing_method in data_processing_methods:
-                #     # 使用前端传递的参数，如果没有则使用默认参数
-                #     method_params = data_processing_params.get(data_processing_method, DATA_PROCESSING_METHODS[data_processing_method]["params"])
-                #     input_data = DATA_PROCESSING_METHODS[data_processing_method]["object"](input_data, **method_params)
-                
-                
-                # 3.2 请求response
-                # 只构建参数列表
-                func_params = {
-                    'api_url': api_url,
-                    'headers': headers,
-                    'request_params': request_params,
-                    'timeout': timeout
-                }
-
-                # response = sync_http_request(api_url, request_params, headers)
-                func_params_dic[index] = func_params
-
-            except Exception as e:
-                logging.error(f"构建第{index}行请求参数时出错: {e} \n\n api_url:参数{func_params}；headers:参数{headers}；request_params:参数{request_params}")
-                print(f"处理第{index}行时出错: {e}")
-                raise Exception(f"处理第{index}行时出错: {e}")
-
+                saved_bytes, total_bytes = df.projection_savings(usecols)
+                projection_summary = (
+                    f"列裁剪: 读取 {len(usecols)}/{len(columns)} 列 {usecols}，"
+                    f"节省约 {format_bytes(saved_bytes)} / {format_bytes(total_bytes)}"
+                )
+                step005_output.append_stdout(f"🪶 {projection_summary}\n")
+                logging.info(projection_summary)
+                columns = usecols
+            chunked_input = chunked_read_checkbox.value
+            input_chunks = df.iter_chunks(usecols) if chunked_input else [df.read(usecols)]
+            total_rows = df.count_rows()
+        else:
+            chunked_input = False
+            input_chunks = [df]
+            total_rows = len(df)
+
+        # 请求时解析：只使用配置完整的解析字段
+        inline_extractor = None
+        if inline_parse_checkbox.value:
+            inline_field_specs = [
+                FieldSpec(field_config['field_name'], field_config['field_path'], field_config['parsing_method'])
+                for field_config in parsing_fields
+                if field_config.get('field_name') and field_config.get('parsing_method') and field_config.get('field_path')
+            ]
+            if inline_field_specs:
+                inline_extractor = FieldExtractor(inline_field_specs)
+                step005_output.append_stdout(f"🧩 请求时解析字段: {inline_extractor.field_names}\n")
+            else:
+                step005_output.append_stdout("⚠️ 未配置完整的解析字段，跳过请求时解析\n")
+        drop_response_text = inline_extractor is not None and drop_response_text_checkbox.value
+        request_config = BatchRequestConfig(
+            api_url=api_url,
+            headers=headers,
+            params=params,
+            placeholder_params_mapping_dic=placeholder_params_mapping_dic,
+            timeout=timeout,
+            max_workers=max_workers,
+            api_name=step000_api_config_selector.value,
+            use_async_engine=use_async_engine,
+            async_concurrency=async_concurrency_input.value,
+            stream=use_stream,
+            phase_timing=use_phase_timing,
+            inline_extractor=inline_extractor,
+            drop_response_text=drop_response_text
+        )
 
         # 初始化进度条
-        total_rows = len(new_df)
         progress_bar.max = total_rows
         progress_bar.value = 0
-        progress_text.value = f'<div style="text-align: center; color: #495057; font-size: 14px; margin-top: 5px;">0/{total_rows}</div>'
-        
-        # 实时并发执行和结果处理 - 改进版本
-        results = {}
-        completed_count = 0
-        lock = threading.Lock()
+        progress_text.value = format_progress_text(0, total_rows)
         
-        def update_ui_with_result(index, response):
-            """在UI线程中更新结果和日志"""
-            nonlocal completed_count
-            exception_message = ''
-            is_error = False
-            
-            # 如果response为None（请求失败），直接处理
-            if response is None:
-                new_df.loc[index, 'response_text'] = None
-                new_df.loc[index, 'response_time'] = None
-                is_error = True
+        def build_result_rows(store, chunk_df, positions=None):
+            """输入列+结果列并清理NaN值，使其能够正确序列化为JSON；positions为None时为整块"""
+            rows = store.to_dataframe(chunk_df, positions)
+            if drop_response_text:
+                # 原始响应已在请求时解析并丢弃
+                rows = rows.drop(columns=['response_text'])
+            return clean_dataframe_for_json(rows)
+
+        # 自动保存：已完成的行边请求边按输入顺序追加写入文件，不在结束后一次性保存
+        if auto_save_checkbox.value:
+            output_dir = 'output'
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"auto_save_{timestamp}.{auto_save_format_dropdown.value}"
+            result_writer = IncrementalResultWriter(
+                ResultSink(os.path.join(output_dir, filename), fsync_policy=auto_save_fsync_dropdown.value),
+                flush_rows=AUTO_SAVE_FLUSH_ROWS,
+                flush_interval=auto_save_flush_interval_input.value
+            )
+            step005_output.append_stdout(f"💾 自动保存：结果将增量写入 {result_writer.sink.filepath}\n")
+        keep_preview_only = result_writer is not None and (chunked_input or total_rows > AUTO_SAVE_FULL_RESULT_MAX_ROWS)
+
+        live_stats = LiveBatchStats(total_rows)
+        latency_stats_html.value = format_latency_stats(live_stats.snapshot())
+
+        def refresh_latency_stats():
+            latency_stats_html.value = format_latency_stats(live_stats.snapshot())
+
+        # 进度条、进度文本、错误输出和延迟统计按节流间隔合并刷新
+        ui_refresher = UIRefreshScheduler(
+            progress_bar=progress_bar,
+            progress_text=progress_text,
+            output=step005_output,
+            total=total_rows,
+            interval_ms=UI_REFRESH_INTERVAL_MS,
+            every=UI_REFRESH_EVERY,
+            format_text=format_progress_text,
+            on_refresh=refresh_latency_stats
+        )
+
+        def record_progress(index, error_message=None, response_time=None):
+            """更新进度条，只输出错误信息，成功的静默处理"""
+            nonlocal completed_count, success_count
+            completed_count += 1
+            live_stats.record(response_time, error_message is None)
+            if error_message is None:
+                success_count += 1
+                ui_refresher.advance()
             else:
-                try:
-                    new_df.loc[index, 'response_text'] = response.text
-                    # 记录响应时间
-                    if hasattr(response, 'response_time'):
-                        new_df.loc[index, 'response_time'] = response.response_time
-                    else:
-                        new_df.loc[index, 'response_time'] = None
-                except Exception as e:
-                    new_df.loc[index, 'response_text'] = None
-                    new_df.loc[index, 'response_time'] = None
-                    exception_message = f"数据「{index}」获取response_text时错误: {str(e)}"
-                    detailed_logger.error(f"数据「{index}」获取response_text时错误: {str(e)}")
-                    is_error = True
-            
-            # 安全更新UI - 只输出错误，更新进度条并显示进度值
-            with lock:
-                completed_count += 1
-                progress_bar.value = completed_count
-                # 更新进度值文本显示
-                progress_text.value = f'<div style="text-align: center; color: #495057; font-size: 14px; margin-top: 5px;">{completed_count}/{total_rows}</div>'
-                # 只输出错误信息，成功的静默处理
-                if is_error:
-                    if response is None:
-                        step005_output.append_stdout(f"❌ 行{index}: 请求失败\n")
-                    elif exception_message:
-                        step005_output.append_stdout(f"❌ 行{index}: {exception_message}\n")
-        
-        def process_future(index, future):
-            """处理单个future的结果"""
-            nonlocal completed_count
-            try:
-                response = future.result()
-                results[index] = response
-
-                # 尝试使用线程更新UI，如果失败则直接调用
-                try:
-                    threading.Thread(target=update_ui_with_result, args=(index, response), daemon=True).start()
-                except RuntimeError:
-                    # 线程创建失败，直接在当前线程中更新UI
-                    update_ui_with_result(index, response)
+                ui_refresher.advance(line=f"❌ 行{index}: {error_message}\n")
+            if result_writer is not None and not result_writer.failed:
+                result_writer.poll()
+                if result_writer.failed:
+                    ui_refresher.write(f"❌ 自动保存失败，已停止自动保存: {result_writer.error}\n")
+
+        def on_chunk_start(chunk_df, store):
+            """分块开始请求前：记录当前分块（异常时保存已完成的行），绑定增量结果写入器"""
+            nonlocal new_df, result_store
+            new_df, result_store = chunk_df, store
+            if result_writer is not None:
+                result_writer.bind(store, partial(build_result_rows, store, chunk_df))
+
+        # 并发执行和结果处理：分块输入时逐块执行，每块的请求全部完成后合并该块结果
+        phase_timings = {phase: [] for phase in PHASE_COLUMNS}  # 各块的分阶段耗时列
+        for new_df, result_store in run_request_chunks(input_chunks, columns, request_config, record_progress, on_chunk_start):
+            # 合并本块结果列：大批量自动保存时完整结果已写入文件，内存中只保留前若干行预览
+            if result_writer is not None:
+                result_writer.flush(include_pending=True)
+            if keep_preview_only and not result_writer.failed:
+                if preview_row_count < AUTO_SAVE_PREVIEW_ROWS:
+                    preview_rows = min(len(new_df), AUTO_SAVE_PREVIEW_ROWS - preview_row_count)
+                    chunk_results.append(build_result_rows(result_store, new_df, slice(0, preview_rows)))
+                    preview_row_count += preview_rows
+            else:
+                if preview_row_count:
+                    # 自动保存中途失败：之前的分块已写入文件，从本块起在内存中保留完整结果
+                    chunk_results = []
+                    preview_row_count = 0
+                chunk_results.append(build_result_rows(result_store, new_df))
+            if use_phase_timing:
+                for phase in PHASE_COLUMNS:
+                    phase_timings[phase].append(result_store.float_columns[phase])
+            result_store = None
 
-            except Exception as e:
-                new_df.loc[index, 'response_time'] = None
-                new_df.loc[index, 'response_text'] = None
-                detailed_logger.error(f"行{index}: 执行失败 - {str(e)}")
-                with lock:
-                    completed_count += 1
-                    progress_bar.value = completed_count
-                    # 更新进度值文本显示
-                    progress_text.value = f'<div style="text-align: center; color: #495057; font-size: 14px; margin-top: 5px;">{completed_count}/{total_rows}</div>'
-                    # 更新进度条描述，显示进度值
-                    progress_bar.description = f'处理进度: {completed_count}/{total_rows}'
-                # 输出错误信息（移到锁外面）
-                step005_output.append_stdout(f"❌ 行{index}: 执行失败 - {str(e)}\n")
-        
-        # 启动并发执行
-        with ThreadPoolExecutor(max_workers=max_workers_selector.value) as executor:
-            futures = {index: executor.submit(sync_http_request, **args) for index, args in func_params_dic.items()}
-            
-            # 为每个future创建监控线程
-            monitor_threads = []
-            for index, future in futures.items():
-                thread = threading.Thread(target=process_future, args=(index, future), daemon=True)
-                thread.start()
-                monitor_threads.append(thread)
-            
-            # 等待所有监控线程完成
-            for thread in monitor_threads:
-                thread.join()
-                
         # 最终状态更新
-        step005_output.append_stdout(f"\n🎉 所有请求完成！成功: {len([r for r in results.values() if r])}, 总数: {len(func_params_dic)}\n")
+        ui_refresher.close()
+        step005_output.append_stdout(f"\n🎉 所有请求完成！成功: {success_count}, 总数: {total_rows}\n")
+        if result_writer is not None:
+            result_writer.close()
+            if result_writer.failed:
+                step005_output.append_stdout(
+                    f"❌ 自动保存失败，已写入 {result_writer.rows_written} 行到 {result_writer.sink.filepath}: {result_writer.error}\n"
+                )
+            else:
+                logging.info(f"✅ 自动保存完成！共写入 {result_writer.rows_written} 行，文件已保存到: {result_writer.sink.filepath}")
+                step005_output.append_stdout(f"💾 自动保存完成！共写入 {result_writer.rows_written} 行，文件已保存到: {result_writer.sink.filepath}\n")
+        if use_phase_timing:
+            phase_summary = summarize_phase_timings(phase_timings)
+            step005_output.append_stdout(f"\n⏱️ 分阶段耗时汇总:\n{phase_summary}\n")
+            detailed_logger.info(f"分阶段耗时汇总:\n{phase_summary}")
           
-        # 清理NaN值，使其能够正确序列化为JSON
-        new_df = clean_dataframe_for_json(new_df)
+        # 合并各分块的结果
+        new_df = chunk_results[0] if len(chunk_results) == 1 else pd.concat(chunk_results)
         
         # 将结果转换为字典格式返回
-        global result_data
         result_data = new_df.to_dict('records')
-        logging.info(f"✅ 批量处理完成！处理了 {len(result_data)} 条记录")
+        result_file_path = result_writer.sink.filepath if preview_row_count else None
+        # 新一批响应，丢弃上一批的解析缓存
+        parsed_response_cache.clear()
+        logging.info(f"✅ 批量处理完成！处理了 {total_rows} 条记录")
+        if result_file_path is not None:
+            step005_output.append_stdout(f"📄 完整结果已保存在 {result_file_path}，内存中仅保留前 {len(result_data)} 行用于预览和解析字段配置\n")
+        elif result_writer is not None and result_writer.failed:
+            step005_output.append_stdout(f"⚠️ 未写入自动保存文件的 {len(result_data)} 行结果保留在内存中\n")
         
         # 更新列选择器
         update_available_columns()
@@ -431,43 +671,44 @@ def process_batch_http_request(
         update_all_field_path_options()
         
         # 更新预览响应第一个
-        preview_response_first = result_data[0]['response_text']
+        preview_response_first = result_data[0].get('response_text')
 
-        # 如果勾选了自动保存，则自动保存数据
-        if auto_save_checkbox.value:
-            try:
-                # 创建output目录
-                output_dir = 'output'
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                # 生成文件名
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"auto_save_{timestamp}.csv"
-                filepath = os.path.join(output_dir, filename)
-                
-                # 保存所有数据
-                new_df.to_csv(filepath, index=False)
-                logging.info(f"✅ 自动保存完成！文件已保存到: {filepath}")
-                step005_output.append_stdout(f"💾 自动保存完成！文件已保存到: {filepath}\n")
-            except Exception as e:
-                logging.error(f"自动保存失败: {e}")
-                step005_output.append_stdout(f"❌ 自动保存失败: {e}\n")
-        
         return result_data
         
     except Exception as e:
+        # 先输出已缓存的错误行和最终进度
+        if ui_refresher is not None:
+            ui_refresher.close()
         # 异常时先保存已处理的数据（兜底机制）
         try:
             # 获取已处理的数据
-            processed_count = len(results)
-            if processed_count > 0:
-                # 清理NaN值
-                new_df = clean_dataframe_for_json(new_df)
-                # 保存到全局变量
-                result_data = new_df.to_dict('records')
-                # 立即保存到文件
+            processed_count = completed_count
+            if result_writer is not None:
+                # 自动保存：已完成的行已增量写入，写出剩余的已完成行后关闭文件（写入出错时不抛出异常）
+                result_writer.close()
+                if not result_writer.failed:
+                    logging.info(f"已增量保存 {result_writer.rows_written} 条数据到: {result_writer.sink.filepath}")
+                    step005_output.append_stdout(f"程序异常，但已增量保存 {result_writer.rows_written} 条数据到: {result_writer.sink.filepath}\n")
+            # 自动保存成功时完整结果已在文件中，大批量时内存中只保留预览行
+            writer_saved = result_writer is not None and not result_writer.failed
+            preview_only = writer_saved and keep_preview_only
+            result_file_path = result_writer.sink.filepath if preview_only else None
+            partial_results = []
+            if processed_count > 0 and (chunk_results or result_store is not None):
+                # 合并已完成分块和当前分块的结果并清理NaN值（自动保存失败时预览行已在文件中，不再重复保留）
+                partial_results = list(chunk_results) if preview_only or not preview_row_count else []
+                if result_store is not None:
+                    if not preview_only:
+                        partial_results.append(clean_dataframe_for_json(result_store.to_dataframe(new_df)))
+                    elif preview_row_count < AUTO_SAVE_PREVIEW_ROWS:
+                        preview_rows = min(len(new_df), AUTO_SAVE_PREVIEW_ROWS - preview_row_count)
+                        partial_results.append(build_result_rows(result_store, new_df, slice(0, preview_rows)))
+                if partial_results:
+                    new_df = pd.concat(partial_results)
+                    # 保存到全局变量
+                    result_data = new_df.to_dict('records')
+            if processed_count > 0 and partial_results and not writer_saved:
+                # 未开启自动保存或自动保存失败时立即保存到文件
                 output_dir = 'output'
                 if not os.path.exists(output_dir):
                     os.makedirs(output_dir)
@@ -486,6 +727,11 @@ def process_batch_http_request(
         return []
         
     finally:
+        # 停止定时刷新（正常结束时已关闭，重复调用无影响）
+        if ui_refresher is not None:
+            ui_refresher.close()
+        # 批量结束后释放连接池会话（同一会话没有其他批量在使用时关闭）
+        release_pooled_session(api_url, max_workers)
         # 确保最终释放处理锁
         with processing_lock:
             is_processing = False
@@ -504,6 +750,8 @@ def on_process_batch_http_request_clicked(b):
     if df is None or columns_selector is None or step000_api_config_selector.value is None:
         step005_output.append_stdout("❌ 请先加载数据并选择列\n")
         return
+    # 分块读取时批量请求逐块读取整个文件
+    source = data_source if data_source is not None else df
     
     # 临时禁用按钮防止重复点击
     step005_button.disabled = True
@@ -514,15 +762,16 @@ def on_process_batch_http_request_clicked(b):
         input_file_name=step001_dropdown.value,
         all_columns=df.columns.tolist(),
         input_columns=[column.description for column in columns_selector],
-        input_shape=df.shape,
-        input_number=len(df)
+        input_shape=source.shape,
+        input_number=len(source),
+        input_encoding=data_source.encoding if data_source is not None else df.attrs.get('encoding')
     ))
     
     # 在后台线程中执行处理，避免阻塞UI
     def execute_processing():
         try:
             result_data = process_batch_http_request(
-                df,
+                source,
                 columns_selector,
                 True,
                 [],
@@ -571,6 +820,47 @@ parsing_fields = []
 # preview_response_first
 preview_response_first = None
 
+# 已解析响应的缓存：修改解析字段后重新生成时不再重复json.loads
+parsed_response_cache = ParsedDocumentCache()
+
+# 缓存解析结果勾选框
+parsed_cache_checkbox = widgets.Checkbox(
+    value=True,
+    description='缓存解析结果',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 多进程解析：大批量响应时按分块发送到进程池解析
+parallel_parse_checkbox = widgets.Checkbox(
+    value=False,
+    description='多进程解析',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 多进程解析的分块大小
+parse_chunk_size_input = widgets.BoundedIntText(
+    value=5000,
+    min=100,
+    max=1000000,
+    step=1000,
+    description='解析分块大小:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 多进程解析的进程数
+parse_workers_input = widgets.BoundedIntText(
+    value=os.cpu_count() or 4,
+    min=1,
+    max=64,
+    step=1,
+    description='解析进程数:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
 # 新增字段按钮
 add_field_button = widgets.Button(
     description='新增解析字段',
@@ -901,6 +1191,10 @@ def on_generate_result_fields_clicked(b):
         print("❌ 没有配置任何解析字段，请先添加解析字段")
         return
     
+    if not any('response_text' in row_data for row_data in result_data):
+        print("❌ 原始响应已在请求时解析后丢弃，解析字段已生成；如需重新解析请取消「请求时解析后丢弃原始响应」并重新执行Step005")
+        return
+    
     # 检查所有字段配置是否完整
     incomplete_fields = []
     for field_config in parsing_fields:
@@ -917,35 +1211,50 @@ def on_generate_result_fields_clicked(b):
     
     try:
         print(f"✅ 开始处理 {len(result_data)} 条数据，生成 {len(parsing_fields)} 个新字段")
+        if result_file_path is not None:
+            print(f"⚠️ 完整结果已自动保存到 {result_file_path}，此处仅解析内存中的预览行；如需解析全部数据请使用「请求时解析」")
         
-        # 为每条数据生成新字段
+        # 只处理带有response_text的行
+        positions = []
         for index, row_data in enumerate(result_data):
             if 'response_text' not in row_data:
                 print(f"⚠️ 第{index}行数据没有response_text字段，跳过")
                 continue
+            positions.append(index)
+        
+        field_specs = [
+            FieldSpec(field_config['field_name'], field_config['field_path'], field_config['parsing_method'])
+            for field_config in parsing_fields
+        ]
+        
+        def on_row_error(position, e):
+            print(f"⚠️ 处理第{positions[position]}行数据时出错: {e}")
+        
+        response_texts = [result_data[index]['response_text'] for index in positions]
+        if parallel_parse_checkbox.value:
+            # 多进程解析：解析结果留在子进程中，不写入缓存
+            print(f"⚙️ 多进程解析: {parse_workers_input.value} 个进程，每块 {parse_chunk_size_input.value} 行")
+            columns = extract_fields_parallel(
+                response_texts,
+                field_specs,
+                chunk_size=parse_chunk_size_input.value,
+                max_workers=parse_workers_input.value,
+                on_error=on_row_error
+            )
+        else:
+            if parsed_cache_checkbox.value:
+                cache = parsed_response_cache
+            else:
+                parsed_response_cache.clear()
+                cache = None
             
-            try:
-                # 解析JSON响应
-                response_json = json.loads(row_data['response_text'])
-                
-                # 为每个配置的字段生成结果
-                for field_config in parsing_fields:
-                    field_name = field_config['field_name']
-                    parse_method = field_config['parsing_method']
-                    field_path = field_config['field_path']
-                    
-                    # 使用配置的解析方法处理数据
-                    result = parse_method(response_json, field_path)
-                    
-                    # 将结果保存到数据中
-                    row_data[field_name] = result
-                    
-            except Exception as e:
-                print(f"⚠️ 处理第{index}行数据时出错: {e}")
-                # 为所有字段设置None值
-                for field_config in parsing_fields:
-                    field_name = field_config['field_name']
-                    row_data[field_name] = None
+            # 每条响应只解析一次，一次遍历生成所有字段
+            columns = extract_fields(response_texts, field_specs, cache=cache, on_error=on_row_error)
+        
+        # 将结果保存到数据中
+        for field_name, values in columns.items():
+            for index, value in zip(positions, values):
+                result_data[index][field_name] = value
         
         print(f"✅ 成功生成结果字段！")
         print(f"📊 新增字段: {[field_config['field_name'] for field_config in parsing_fields]}")
@@ -1022,11 +1331,14 @@ custom_filename_input = widgets.Text(
 
 # 更新保存数据功能（支持多列）
 def on_save_data_clicked(b):
-    global available_column_selector, result_data
+    global available_column_selector, result_data, result_file_path
     with step007_output:
         step007_output.clear_output()
         selected_columns = available_column_selector.value
         display(selected_columns)
+        if result_file_path is not None:
+            print(f"⚠️ 完整结果已在批量请求时自动保存到 {result_file_path}，内存中仅保留预览行，请直接使用该文件")
+            return
         if result_data is not None and selected_columns:
             try:
                 save_df = pd.DataFrame(result_data)
@@ -1220,7 +1532,7 @@ def black_tea_start():
         """),
         
         # Step002 - 读取数据
-        create_card("Step002: 读取数据", [step002_button]),
+        create_card("Step002: 读取数据", [chunked_read_checkbox, read_chunk_size_input, column_projection_checkbox, step002_button]),
         create_result_section("读取结果", step002_output),
         
         # Step003 - 数据预览
@@ -1228,7 +1540,7 @@ def black_tea_start():
         create_result_section("预览结果", step003_output),
         
         # Step004 - 列选择
-        create_card("Step004: 选择数据列", [columns_container]),
+        create_card("Step004: 选择数据列", [columns_container, passthrough_columns_selector]),
         
         # Step004.1 - 列数据展示
         create_card("Step004.1: 列数据详情", [step004_1_button]),
@@ -1249,7 +1561,7 @@ def black_tea_start():
         """),
         
         # Step005 - 批量http请求
-        create_card("Step005: 批量HTTP请求", [max_workers_selector, progress_bar, progress_text, auto_save_checkbox, step005_button]),
+        create_card("Step005: 批量HTTP请求", [max_workers_selector, engine_selector, async_concurrency_input, stream_request_checkbox, phase_timing_checkbox, inline_parse_checkbox, drop_response_text_checkbox, progress_bar, progress_text, latency_stats_html, auto_save_checkbox, auto_save_format_dropdown, auto_save_flush_interval_input, auto_save_fsync_dropdown, step005_button]),
         create_result_section("批量请求结果", step005_output),
     
         # 响应解析区域组
@@ -1267,7 +1579,7 @@ def black_tea_start():
         """),
         
         # Step005.1 - Response解析配置
-        create_card("Step005.1: Response解析配置", [add_field_button, manual_update_button, generate_result_fields_button, field_configs_container]),
+        create_card("Step005.1: Response解析配置", [add_field_button, manual_update_button, generate_result_fields_button, parsed_cache_checkbox, parallel_parse_checkbox, parse_chunk_size_input, parse_workers_input, field_configs_container]),
         create_result_section("解析配置结果", step005_1_output),
     
         # 数据保存区域组
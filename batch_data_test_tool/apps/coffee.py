@@ -1,16 +1,20 @@
 import os, time
 import logging
-import json
 import pandas as pd
 import ipywidgets as widgets
 from ..tools.data_processing import read_dataframe_from_file, clean_dataframe_for_json
 from ..tools.http_request import sync_http_request, parse_http_stream_false_response, parse_http_stream_true_response
-from ..tools.http_response import structure_request_params, parse_recall_result_special
+from ..tools.http_session import acquire_pooled_session, release_pooled_session
+from ..tools.http_response import parse_recall_result_special, iter_request_bodies
 from ..tools import DATA_PROCESSING_METHODS
 from ..tools.get_config import get_api_url_name_list, get_api_params_placeholder_list_by_name, get_api_url_by_name, get_api_headers_by_name, get_api_params_by_name, get_api_timeout_by_name
 from IPython.display import display
-from ..concurrency.multi_threading import multi_exec
+from ..concurrency.multi_threading import multi_exec_stream
 from ..tools.structured_log import structured_logging_metadata, structured_logging_row_detail
+from ..tools.result_store import ResultStore, STATUS_FAILED, STATUS_ERROR
+from ..tools.result_sink import ResultSink, IncrementalResultWriter, FSYNC_NEVER, FSYNC_WRITE, FSYNC_CLOSE
+from ..tools.metrics import RequestPhaseTimer, add_phase_columns, summarize_phase_timings
+from ..components.ui_scheduler import UIRefreshScheduler
 
 if not os.path.exists('logs'):
     os.makedirs('logs')
@@ -226,7 +230,7 @@ progress_bar = widgets.IntProgress(
     layout=widgets.Layout(width='100%')
 )
 
-# 自动保存勾选框
+# 自动保存勾选框：批量请求过程中把已完成的行按输入顺序增量追加写入结果文件
 auto_save_checkbox = widgets.Checkbox(
     value=False,
     description='自动保存',
@@ -234,6 +238,44 @@ auto_save_checkbox = widgets.Checkbox(
     style={'description_width': 'initial'}
 )
 
+# 自动保存的文件格式（xlsx无法追加写入）
+auto_save_format_dropdown = widgets.Dropdown(
+    options=[('CSV', 'csv'), ('JSONL', 'jsonl'), ('Parquet', 'parquet')],
+    value='csv',
+    description='保存格式:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 自动保存的写入间隔：距上次写入超过该秒数，或累计 AUTO_SAVE_FLUSH_ROWS 行时写入一批
+AUTO_SAVE_FLUSH_ROWS = 1000
+auto_save_flush_interval_input = widgets.BoundedFloatText(
+    value=5.0,
+    min=0.1,
+    max=3600,
+    step=1,
+    description='写入间隔(秒):',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 自动保存的落盘（fsync）策略
+auto_save_fsync_dropdown = widgets.Dropdown(
+    options=[('结束时落盘', FSYNC_CLOSE), ('每次写入落盘', FSYNC_WRITE), ('不强制落盘', FSYNC_NEVER)],
+    value=FSYNC_CLOSE,
+    description='落盘策略:',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
+# 分阶段耗时勾选框：记录每行的排队/构建/连接/首字节/下载耗时，并在结束时输出汇总
+phase_timing_checkbox = widgets.Checkbox(
+    value=False,
+    description='记录分阶段耗时',
+    disabled=False,
+    style={'description_width': 'initial'}
+)
+
 # Step005. 执行批量测试
 step005_output = widgets.Output()
 
@@ -248,6 +290,11 @@ def process_batch_http_request(
     params: str,
     timeout: float = 30
 ):
+    result_writer = None  # 自动保存时的增量结果写入器
+    ui_refresher = None  # 进度条刷新器（含定时刷新线程），结束或异常时关闭
+    # 并发数在开始时确定：请求使用的连接池会话按并发数区分，结束时释放同一个会话
+    max_workers = max_workers_selector.value
+    acquire_pooled_session(api_url, max_workers)
     try:
         columns = df.columns.tolist()
         # 保留用户选择的列
@@ -255,55 +302,97 @@ def process_batch_http_request(
         new_df[list(columns)] = df[list(columns)]
 
         # 3. 构建请求参数
-        func_params_dic = {}
-        for index, row in new_df.iterrows():
-            try:
-                # 3.1 构建参数
-                # col.description 是占位符的名字
-                # col.value 是数据中列名
-                placeholder_params_mapping_dic = {
-                    col.description: col.value
-                    for col in placeholder_params_mapping_list
-                }
-                request_params = structure_request_params(
-                    row,
-                    placeholder_params_mapping_dic,
-                    json.dumps(params)
-                )
-                # 3.1.1 字段预处理（pipeline）
-                # for data_processing_method in data_processing_methods:
-                #     # 使用前端传递的参数，如果没有则使用默认参数
-                #     method_params = data_processing_params.get(data_processing_method, DATA_PROCESSING_METHODS[data_processing_method]["params"])
-                #     input_data = DATA_PROCESSING_METHODS[data_processing_method]["object"](input_data, **method_params)
-                
-                
-                # 3.2 请求response
-                # 只构建参数列表
+        # col.description 是占位符的名字
+        # col.value 是数据中列名
+        placeholder_params_mapping_dic = {
+            col.description: col.value
+            for col in placeholder_params_mapping_list
+        }
+        use_phase_timing = phase_timing_checkbox.value
+        # 在途请求的请求体（用于记录行日志）和分阶段计时器，请求完成后移除，只保留在途的部分
+        in_flight_request_params = {}
+        phase_timers = {}
+
+        def iter_func_params():
+            """
+            按行产出请求参数：映射列整列提取一次，模板渲染出的请求体直接序列化为UTF-8字节，
+            请求体边构建边提交（multi_exec_stream按在途上限拉取），不整表预先构建
+            """
+            request_bodies = iter_request_bodies(
+                new_df,
+                placeholder_params_mapping_dic,
+                params,
+                api_name=step000_api_config_selector.value
+            )
+            build_start = time.perf_counter()
+            for position, request_params in enumerate(request_bodies):
                 func_params = {
                     'api_url': api_url,
                     'headers': headers,
                     'request_params': request_params,
-                    'timeout': timeout
+                    'timeout': timeout,
+                    'max_workers': max_workers
                 }
+                in_flight_request_params[position] = request_params
+                if use_phase_timing:
+                    # 模板渲染耗时计入build阶段，创建时记录入队时间
+                    phase_timers[position] = RequestPhaseTimer(time.perf_counter() - build_start)
+                    func_params['phase_timer'] = phase_timers[position]
+                yield position, func_params
+                build_start = time.perf_counter()
 
-                # response = sync_http_request(api_url, request_params, headers)
-                func_params_dic[index] = func_params
-
-            except Exception as e:
-                logging.error(f"构建第{index}行请求参数时出错: {e} \n\n api_url:参数{func_params}；headers:参数{headers}；request_params:参数{request_params}")
-                print(f"处理第{index}行时出错: {e}")
-                raise Exception(f"处理第{index}行时出错: {e}")
+        def run_request(**func_params):
+            func_params['phase_timer'].start()
+            return sync_http_request(**func_params)
 
 
-        # 根据构建好的参数来处理结果
-        results = multi_exec(sync_http_request, func_params_dic, max_workers=max_workers_selector.value)
-        
         # 初始化进度条
         total_rows = len(new_df)
         progress_bar.max = total_rows
         progress_bar.value = 0
+        # 进度条按节流间隔刷新，避免每完成一个请求推送一次控件更新
+        ui_refresher = UIRefreshScheduler(progress_bar=progress_bar, total=total_rows)
         
-        for index, response in results.items():
+        # 结果写入预分配的列式缓冲区，按行位置索引，结束后一次性转换为DataFrame
+        result_store = ResultStore(total_rows)
+        if use_phase_timing:
+            add_phase_columns(result_store)
+
+        # 自动保存：已完成的行边请求边按输入顺序追加写入文件，不在结束后一次性保存
+        if auto_save_checkbox.value:
+            output_dir = 'output'
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"auto_save_{timestamp}.{auto_save_format_dropdown.value}"
+            result_writer = IncrementalResultWriter(
+                ResultSink(os.path.join(output_dir, filename), fsync_policy=auto_save_fsync_dropdown.value),
+                flush_rows=AUTO_SAVE_FLUSH_ROWS,
+                flush_interval=auto_save_flush_interval_input.value
+            )
+            input_df = new_df
+            result_writer.bind(
+                result_store,
+                lambda positions: clean_dataframe_for_json(result_store.to_dataframe(input_df, positions))
+            )
+            print(f"💾 自动保存：结果将增量写入 {result_writer.sink.filepath}")
+        
+        # 根据构建好的参数来处理结果，按完成顺序逐个处理，不保留全部Response对象
+        results = multi_exec_stream(
+            run_request if use_phase_timing else sync_http_request,
+            iter_func_params(),
+            max_workers=max_workers,
+            return_exceptions=True
+        )
+        
+        for position, response in results:
+            index = new_df.index[position]
+            if use_phase_timing:
+                phase_timers.pop(position).store(result_store, position)
+            request_params = in_flight_request_params.pop(position)
+            # 构建失败的行记录错误信息
+            request_params = request_params.decode('utf-8') if isinstance(request_params, bytes) else str(request_params)
             # emmm ... 以下解析的逻辑要重写的
             # 需要实现一系列解析Response的方法组成的Pipeline
             exception_message = ''
@@ -328,25 +417,31 @@ def process_batch_http_request(
             #     new_df.loc[index, 'answer'] = None
             #     new_df.loc[index, 'recall_list'] = None
 
-            try:
-                new_df.loc[index, 'response_text'] = response.text
-                # 记录响应时间
-                if response is not None and hasattr(response, 'response_time'):
-                    new_df.loc[index, 'response_time'] = response.response_time
-                else:
-                    new_df.loc[index, 'response_time'] = None
-            except Exception as e:
-                new_df.loc[index, 'response_text'] = None
-                new_df.loc[index, 'response_time'] = None
-                exception_message = f"数据「{index}」获取response_text时错误: {str(e)}"
-                logging.error(f"数据「{index}」获取response_text时错误: {str(e)}")
+            if isinstance(response, Exception):
+                # 执行过程中抛出的异常（如该行请求参数构建失败）
+                result_store.set_result(position, status=STATUS_ERROR)
+                exception_message = f"数据「{index}」执行失败: {str(response)}"
+                logging.error(exception_message)
+                response = None
+            else:
+                try:
+                    # 记录响应内容和响应时间
+                    result_store.set_result(position, response.text, getattr(response, 'response_time', None))
+                except Exception as e:
+                    result_store.set_result(position, status=STATUS_FAILED if response is None else STATUS_ERROR)
+                    exception_message = f"数据「{index}」获取response_text时错误: {str(e)}"
+                    logging.error(f"数据「{index}」获取response_text时错误: {str(e)}")
+
+            row_detail = new_df.iloc[position].to_dict()
+            row_detail['response_text'] = result_store.response_text[position]
+            row_detail['response_time'] = result_store.response_time[position]
 
             # 每行处理完response之后落日志（只写入文件，不显示在控制台）
             if exception_message != '':
                 detailed_logger.error(structured_logging_row_detail(
                     row_index=index,
-                    row=new_df.loc[index].to_dict(),
-                    max_workers=max_workers_selector.value,
+                    row=row_detail,
+                    max_workers=max_workers,
                     api_url=api_url,
                     request_params=request_params,
                     headers=headers,
@@ -356,8 +451,8 @@ def process_batch_http_request(
             else:
                 detailed_logger.info(structured_logging_row_detail(
                     row_index=index,
-                    row=new_df.loc[index].to_dict(),
-                    max_workers=max_workers_selector.value,
+                    row=row_detail,
+                    max_workers=max_workers,
                     api_url=api_url,
                     request_params=request_params,
                     headers=headers,
@@ -366,9 +461,25 @@ def process_batch_http_request(
                 ))
             
             # 更新进度条
-            progress_bar.value += 1
+            ui_refresher.advance()
+            if result_writer is not None:
+                result_writer.poll()
+        ui_refresher.close()
+        if result_writer is not None:
+            result_writer.close()
+            if result_writer.failed:
+                print(f"❌ 自动保存失败，已写入 {result_writer.rows_written} 行到 {result_writer.sink.filepath}: {result_writer.error}")
+            else:
+                logging.info(f"✅ 自动保存完成！共写入 {result_writer.rows_written} 行，文件已保存到: {result_writer.sink.filepath}")
+                print(f"✅ 自动保存完成！共写入 {result_writer.rows_written} 行，文件已保存到: {result_writer.sink.filepath}")
+        
+        if use_phase_timing:
+            phase_summary = summarize_phase_timings(result_store)
+            logging.info(f"⏱️ 分阶段耗时汇总:\n{phase_summary}")
+            detailed_logger.info(f"分阶段耗时汇总:\n{phase_summary}")
         
-        # 清理NaN值，使其能够正确序列化为JSON
+        # 合并结果列，清理NaN值，使其能够正确序列化为JSON
+        new_df = result_store.to_dataframe(new_df)
         new_df = clean_dataframe_for_json(new_df)
         
         # 将结果转换为字典格式返回
@@ -379,35 +490,25 @@ def process_batch_http_request(
         # 更新列选择器
         update_available_columns()
         
-        # 如果勾选了自动保存，则自动保存数据
-        if auto_save_checkbox.value:
-            try:
-                # 创建output目录
-                output_dir = 'output'
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                # 生成文件名
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"auto_save_{timestamp}.xlsx"
-                filepath = os.path.join(output_dir, filename)
-                
-                # 保存所有数据
-                new_df.to_excel(filepath, index=False)
-                logging.info(f"✅ 自动保存完成！文件已保存到: {filepath}")
-                print(f"✅ 自动保存完成！文件已保存到: {filepath}")
-            except Exception as e:
-                logging.error(f"自动保存失败: {e}")
-                print(f"❌ 自动保存失败: {e}")
-        
         return result_data
         
     except Exception as e:
         logging.error(f"批量处理出错: {e}")
         print(f"❌ 批量处理出错: {e}")
+        if result_writer is not None:
+            # 已完成的行已增量写入，写出剩余的已完成行后关闭文件（写入出错时不抛出异常）
+            result_writer.close()
+            if not result_writer.failed:
+                print(f"💾 已增量保存 {result_writer.rows_written} 条数据到: {result_writer.sink.filepath}")
         return []
 
+    finally:
+        # 停止定时刷新并刷新最终进度（正常结束时已关闭，重复调用无影响）
+        if ui_refresher is not None:
+            ui_refresher.close()
+        # 批量结束后释放连接池会话（同一会话没有其他批量在使用时关闭）
+        release_pooled_session(api_url, max_workers)
+
 # 创建事件处理函数
 def on_process_batch_http_request_clicked(b):
     """批量处理http请求按钮点击事件"""
@@ -419,7 +520,8 @@ def on_process_batch_http_request_clicked(b):
         all_columns=df.columns.tolist(),
         input_columns=[column.description for column in columns_selector],
         input_shape=df.shape,
-        input_number=len(df)
+        input_number=len(df),
+        input_encoding=df.attrs.get('encoding')
     ))
     with step005_output:
         step005_output.clear_output()
@@ -626,7 +728,7 @@ def coffee_start():
         create_output_section("列数据结果", step004_1_output),
     
         # Step005 - 批量http请求
-        create_control_section("Step005: 批量http请求", [max_workers_selector, progress_bar, auto_save_checkbox, step005_button]),
+        create_control_section("Step005: 批量http请求", [max_workers_selector, phase_timing_checkbox, progress_bar, auto_save_checkbox, auto_save_format_dropdown, auto_save_flush_interval_input, auto_save_fsync_dropdown, step005_button]),
         create_output_section("批量http请求结果", step005_output),
     
         # Step006 - 选择要保存的数据列
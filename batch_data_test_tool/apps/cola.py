@@ -4,7 +4,8 @@ import json
 import pandas as pd
 import ipywidgets as widgets
 from ..tools.data_processing import read_dataframe_from_file, clean_dataframe_for_json
-from ..tools.http_request import sync_http_request, parse_http_stream_false_response, parse_http_stream_true_response
+from ..tools.http_request import sync_http_request
+from ..tools.sse_parser import parse_http_stream_response
 from ..tools.http_response import structure_request_params, parse_recall_result_special
 from ..tools import DATA_PROCESSING_METHODS
 from ..tools.get_config import get_api_url_name_list, get_api_params_placeholder_list_by_name, get_api_url_by_name, get_api_headers_by_name, get_api_params_by_name, get_api_timeout_by_name
@@ -232,13 +233,8 @@ def process_batch_http_request(
                     new_df.loc[index, 'response_time'] = None
                 
                 if stream_parser:
-                    answer = parse_http_stream_false_response(response)
-                    # 当没有召回的时候
-                    try:
-                        recall_list = parse_http_stream_true_response(response)
-                    except Exception as e:
-                        print(f"第「{index}」列的召回结果为空")
-                        recall_list = []
+                    # 单次遍历同时得到answer和召回列表
+                    answer, recall_list = parse_http_stream_response(response)
                     res = {
                         'answer': answer,
                         'recall_list': parse_recall_result_special(recall_list)
@@ -4,4 +4,8 @@
 包含可重用的UI组件和其他组件。
 """
 
-__all__ = []
+from .ui_scheduler import UIRefreshScheduler
+
+__all__ = [
+    "UIRefreshScheduler",
+]
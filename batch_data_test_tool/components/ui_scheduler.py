@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class UIRefreshScheduler:
+    """
+    节流的进度界面刷新器
+
+    每个请求完成时调用 advance 只累加计数和待输出的错误行，
+    距上次刷新超过 interval_ms 毫秒、或累计完成 every 个请求时才真正写入控件，
+    避免高吞吐时每个请求都向前端推送一次控件更新；close 时强制刷新最终状态
+    periodic为True时后台线程每隔 interval_ms 检查一次，超过间隔没有刷新时主动刷新，
+    请求很慢（长时间没有完成）时吞吐量、已用时间等统计也按固定间隔更新
+    """
+
+    def __init__(
+        self,
+        progress_bar=None,
+        progress_text=None,
+        output=None,
+        total: int = 0,
+        interval_ms: float = 200,
+        every: Optional[int] = None,
+        format_text: Optional[Callable[[int, int], str]] = None,
+        on_refresh: Optional[Callable[[], None]] = None,
+        periodic: bool = True
+    ):
+        """
+        Args:
+            progress_bar: 进度条控件，刷新时写入完成数
+            progress_text: 进度文本控件（HTML），刷新时写入 format_text(完成数, 总数)
+            output: Output控件，刷新时一次性追加期间收集的输出行
+            interval_ms: 两次刷新的最小间隔（毫秒）
+            every: 每完成多少个请求刷新一次，None表示只按时间间隔刷新
+            on_refresh: 每次刷新时额外调用（如刷新延迟统计）
+            periodic: 是否启动定时刷新线程，使用后需调用 close 停止
+        """
+        self.progress_bar = progress_bar
+        self.progress_text = progress_text
+        self.output = output
+        self.total = total
+        self.interval = interval_ms / 1000
+        self.every = every
+        self.format_text = format_text or (lambda completed, total: f"{completed}/{total}")
+        self.on_refresh = on_refresh
+        self.completed = 0
+        self._pending_lines = []
+        self._refreshed_completed = 0
+        self._refreshed_at = time.perf_counter()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._ticker = None
+        if periodic:
+            self._ticker = threading.Thread(target=self._tick, name='ui-refresh', daemon=True)
+            self._ticker.start()
+
+    def _tick(self):
+        """定时刷新：距上次刷新超过间隔时刷新一次（刷新出错时停止定时刷新，不影响批量请求）"""
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                now = time.perf_counter()
+                if now - self._refreshed_at < self.interval:
+                    continue
+                try:
+                    self._refresh(now)
+                except Exception as e:
+                    logging.error(f"界面定时刷新失败: {e}")
+                    return
+
+    def advance(self, count: int = 1, line: Optional[str] = None):
+        """记录完成的请求数，line为需要输出的行（如错误信息）"""
+        with self._lock:
+            self.completed += count
+            if line is not None:
+                self._pending_lines.append(line)
+            now = time.perf_counter()
+            due = now - self._refreshed_at >= self.interval
+            if not due and self.every is not None:
+                due = self.completed - self._refreshed_completed >= self.every
+            if due:
+                self._refresh(now)
+
+    def write(self, line: str):
+        """追加输出行，随下一次刷新一起输出"""
+        with self._lock:
+            self._pending_lines.append(line)
+
+    def flush(self):
+        """立即刷新"""
+        with self._lock:
+            self._refresh(time.perf_counter())
+
+    def close(self):
+        """结束时停止定时刷新并刷新最终状态（可重复调用）"""
+        self._closed.set()
+        if self._ticker is not None and self._ticker is not threading.current_thread():
+            self._ticker.join()
+        self.flush()
+
+    def _refresh(self, now: float):
+        self._refreshed_at = now
+        self._refreshed_completed = self.completed
+        if self.progress_bar is not None:
+            self.progress_bar.value = self.completed
+        if self.progress_text is not None:
+            self.progress_text.value = self.format_text(self.completed, self.total)
+        if self._pending_lines and self.output is not None:
+            self.output.append_stdout(''.join(self._pending_lines))
+        self._pending_lines = []
+        if self.on_refresh is not None:
+            self.on_refresh()
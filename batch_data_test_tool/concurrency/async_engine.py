@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from ..tools.http_request import clean_control_characters, clean_dict_control_characters, safe_json_dumps, RequestBuildError
+from ..tools.http_response import iter_request_bodies
+from ..tools.result_store import ResultStore, STATUS_SUCCEED, STATUS_FAILED, STATUS_ERROR
+from ..tools.sse_parser import SSEStreamRecorder, STREAM_METRIC_COLUMNS
+from ..tools.metrics import RequestPhaseTimer, add_phase_columns
+
+# 可选引入 aiohttp，asyncio 引擎依赖它发送请求
+try:
+    import aiohttp  # type: ignore
+    _AIOHTTP_AVAILABLE = True
+except Exception:  # aiohttp 未安装时 asyncio 引擎不可用
+    aiohttp = None  # type: ignore
+    _AIOHTTP_AVAILABLE = False
+
+
+def is_async_engine_available() -> bool:
+    return _AIOHTTP_AVAILABLE
+
+
+def _encode_request_body(request_params) -> bytes:
+    """
+    将请求参数编码为请求体，清理规则与sync_http_request保持一致
+    """
+    if isinstance(request_params, str):
+        return clean_control_characters(request_params).encode('utf-8')
+    if isinstance(request_params, dict):
+        return safe_json_dumps(clean_dict_control_characters(request_params), clean=False).encode('utf-8')
+    if isinstance(request_params, bytes):
+        return request_params
+    return json.dumps(request_params, ensure_ascii=False).encode('utf-8')
+
+
+def _phase_trace_config():
+    """
+    连接池排队和建立连接的耗时通过aiohttp的请求追踪回调获取，
+    累加到请求时传入的 trace_request_ctx（RequestPhaseTimer）中
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def mark_start(key):
+        async def on_start(session, context, params):
+            if context.trace_request_ctx is not None:
+                setattr(context, key, time.perf_counter())
+        return on_start
+
+    def mark_end(key, phase):
+        async def on_end(session, context, params):
+            timer = context.trace_request_ctx
+            started_at = getattr(context, key, None)
+            if timer is not None and started_at is not None:
+                timer.add(phase, time.perf_counter() - started_at)
+        return on_end
+
+    trace_config.on_connection_queued_start.append(mark_start('queued_at'))
+    trace_config.on_connection_queued_end.append(mark_end('queued_at', 'queue_wait'))
+    trace_config.on_connection_create_start.append(mark_start('connect_at'))
+    trace_config.on_connection_create_end.append(mark_end('connect_at', 'connect'))
+    return trace_config
+
+
+async def _post_one(session, api_url, headers, body, timeout, stream=False, phase_timer=None):
+    """
+    发送单个请求，返回 (response_text, response_time, stream_metrics)
+    与sync_http_request一致：非200或异常时返回 (None, None, None)
+    stream为True时按分块读取响应体并记录流式耗时指标，否则stream_metrics为None
+    传入phase_timer时记录queue_wait/connect/ttfb/download各阶段耗时
+    """
+    start_time = time.time()
+    stream_metrics = None
+    send_at = time.perf_counter()
+    try:
+        async with session.post(api_url, data=body, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout), trace_request_ctx=phase_timer) as response:
+            status = response.status
+            if phase_timer is not None:
+                headers_received_at = time.perf_counter()
+                waited = phase_timer.timings.get('phase_queue_wait', 0.0) + phase_timer.timings.get('phase_connect', 0.0)
+                phase_timer.add('ttfb', headers_received_at - send_at - waited)
+            if stream and status == 200:
+                recorder = SSEStreamRecorder(start_time)
+                recorder.mark_headers()
+                async for chunk in response.content.iter_any():
+                    recorder.feed(chunk)
+                recorder.close()
+                response_text = recorder.body.decode('utf-8', errors='replace')
+                stream_metrics = recorder.metrics()
+            else:
+                response_text = await response.text(encoding='utf-8', errors='replace')
+            if phase_timer is not None:
+                phase_timer.add('download', time.perf_counter() - headers_received_at)
+    except Exception as e:
+        logging.error(f"async_http_request 错误: {type(e).__name__}: {e}")
+        logging.error(f"请求URL: {api_url}")
+        return None, None, None
+
+    response_time = round(time.time() - start_time, 3)
+    if status != 200:
+        logging.error(f"async_http_request 错误: HTTP {status} | {response_text[:500]}")
+        logging.error(f"请求URL: {api_url}")
+        return None, None, None
+    return response_text, response_time, stream_metrics
+
+
+async def async_batch_http_request(
+    df: pd.DataFrame,
+    placeholder_params_mapping_dic: dict,
+    api_url: str,
+    headers: dict,
+    params: dict,
+    timeout: float = 30,
+    concurrency: int = 500,
+    on_result=None,
+    result_store: ResultStore = None,
+    on_response=None,
+    keep_response_text: bool = True,
+    stream: bool = False,
+    phase_timing: bool = False,
+    on_error=None
+) -> pd.DataFrame:
+    """
+    asyncio批量请求引擎：单个事件循环上同时保持concurrency个在途请求
+    输入与线程池版本一致，返回带 response_text / response_time 列的DataFrame
+    on_result(index, response_text, response_time) 在每个请求完成时回调，可用于更新进度
+    传入result_store时结果同时写入该缓冲区（按行位置）
+    on_response(position, response_text) 在每个成功响应到达时于线程池中执行（如边收边解析），
+    不阻塞事件循环；keep_response_text为False时不保留原始响应文本
+    stream为True时流式读取响应体，STREAM_METRIC_COLUMNS中的指标作为额外结果列写入
+    phase_timing为True时记录分阶段耗时列（见PHASE_COLUMNS），queue_wait为等待连接池空闲连接的时间
+    某行请求参数构建失败时该行记为STATUS_ERROR且不发送请求，回调 on_error(index, 错误信息)，
+    未传入on_error时按请求失败回调on_result
+    """
+    if not _AIOHTTP_AVAILABLE:
+        raise ImportError("asyncio引擎需要安装aiohttp: pip install aiohttp")
+
+    headers = dict(headers or {})
+    headers.setdefault('Content-Type', 'application/json')
+
+    total_rows = len(df)
+    if result_store is None:
+        result_store = ResultStore(total_rows)
+    if stream:
+        for name in STREAM_METRIC_COLUMNS:
+            result_store.add_float_column(name)
+    if phase_timing:
+        add_phase_columns(result_store)
+    # 按行位置逐个消费，所有worker共享同一个迭代器（单事件循环内无需加锁）
+    request_bodies = iter_request_bodies(df, placeholder_params_mapping_dic, params)
+    rows = enumerate(zip(df.index, request_bodies))
+
+    loop = asyncio.get_running_loop()
+
+    async def worker(session):
+        while True:
+            build_start = time.perf_counter()
+            try:
+                position, (index, request_params) = next(rows)
+            except StopIteration:
+                return
+            if isinstance(request_params, RequestBuildError):
+                logging.error(f"async_http_request 错误: {request_params}")
+                result_store.set_result(position, status=STATUS_ERROR)
+                if on_error is not None:
+                    on_error(index, str(request_params))
+                elif on_result is not None:
+                    on_result(index, None, None)
+                continue
+            body = _encode_request_body(request_params)
+            phase_timer = None
+            if phase_timing:
+                phase_timer = RequestPhaseTimer(time.perf_counter() - build_start)
+                phase_timer.add('queue_wait', 0.0)
+                phase_timer.add('connect', 0.0)
+            response_text, response_time, stream_metrics = await _post_one(session, api_url, headers, body, timeout, stream, phase_timer)
+            if stream_metrics is not None:
+                for name, value in stream_metrics.items():
+                    result_store.set_value(name, position, value)
+            if response_text is None:
+                result_store.set_result(position, None, response_time, STATUS_FAILED)
+            else:
+                if on_response is not None:
+                    parse_start = time.perf_counter()
+                    await loop.run_in_executor(None, on_response, position, response_text)
+                    if phase_timer is not None:
+                        phase_timer.add('parse', time.perf_counter() - parse_start)
+                result_store.set_result(position, response_text if keep_response_text else None, response_time, STATUS_SUCCEED)
+            if phase_timer is not None:
+                phase_timer.store(result_store, position)
+            if on_result is not None:
+                on_result(index, response_text, response_time)
+
+    concurrency = max(1, min(int(concurrency), max(total_rows, 1)))
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    trace_configs = [_phase_trace_config()] if phase_timing else None
+    async with aiohttp.ClientSession(connector=connector, trace_configs=trace_configs) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+
+    return result_store.to_dataframe(df)
+
+
+def run_async_batch_http_request(*args, **kwargs) -> pd.DataFrame:
+    """
+    同步入口，参数同 async_batch_http_request
+    普通Python中直接运行事件循环；Jupyter等已有运行中事件循环的环境下，在独立线程中运行
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(async_batch_http_request(*args, **kwargs))
+
+    outcome = {}
+
+    def runner():
+        try:
+            outcome['result'] = asyncio.run(async_batch_http_request(*args, **kwargs))
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
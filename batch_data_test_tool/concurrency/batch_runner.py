@@ -0,0 +1,225 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+import pandas as pd
+
+from .multi_threading import multi_exec_stream
+from .async_engine import run_async_batch_http_request
+from ..tools.http_request import sync_http_request
+from ..tools.http_response import iter_request_bodies
+from ..tools.result_store import ResultStore, STATUS_FAILED, STATUS_ERROR
+from ..tools.sse_parser import STREAM_METRIC_COLUMNS
+from ..tools.metrics import RequestPhaseTimer, add_phase_columns
+from ..tools.field_extractor import FieldExtractor
+
+# 与界面模块共用的详细日志（只写入文件）
+detailed_logger = logging.getLogger('detailed')
+
+
+@dataclass
+class BatchRequestConfig:
+    """
+    一次批量请求的配置，各分块共用
+    inline_extractor 不为None时开启请求时解析，解析字段作为额外结果列；
+    drop_response_text 为True时解析后不保留原始响应文本
+    """
+    api_url: str
+    headers: dict
+    params: Any
+    placeholder_params_mapping_dic: dict
+    timeout: float = 30
+    max_workers: int = 4
+    api_name: Optional[str] = None
+    use_async_engine: bool = False
+    async_concurrency: int = 500
+    stream: bool = False
+    phase_timing: bool = False
+    inline_extractor: Optional[FieldExtractor] = None
+    drop_response_text: bool = False
+
+    def create_result_store(self, size: int) -> ResultStore:
+        """预分配的列式结果缓冲区，按行位置索引，包含请求时解析、流式指标和分阶段耗时列"""
+        store = ResultStore(size)
+        if self.inline_extractor is not None:
+            for field_name in self.inline_extractor.field_names:
+                store.add_object_column(field_name)
+        if self.stream:
+            for metric_name in STREAM_METRIC_COLUMNS:
+                store.add_float_column(metric_name)
+        if self.phase_timing:
+            add_phase_columns(store)
+        return store
+
+
+def iter_request_params(chunk_df: pd.DataFrame, config: BatchRequestConfig, with_position: bool = False):
+    """按行产出 (行位置, sync_http_request参数)：映射列整列提取一次，请求体边构建边提交"""
+    request_bodies = iter_request_bodies(
+        chunk_df,
+        config.placeholder_params_mapping_dic,
+        config.params,
+        api_name=config.api_name
+    )
+    build_start = time.perf_counter()
+    for position, request_params in enumerate(request_bodies):
+        func_params = {
+            'api_url': config.api_url,
+            'headers': config.headers,
+            'request_params': request_params,
+            'timeout': config.timeout,
+            'max_workers': config.max_workers
+        }
+        if config.stream:
+            func_params['stream'] = True
+        if config.phase_timing:
+            # 模板渲染耗时计入build阶段，创建时记录入队时间
+            func_params['phase_timer'] = RequestPhaseTimer(time.perf_counter() - build_start)
+        if with_position:
+            func_params['position'] = position
+        yield position, func_params
+        build_start = time.perf_counter()
+
+
+class RowRequestWorker:
+    """
+    单个分块的逐行请求处理
+
+    - __call__ 在工作线程中发送请求：开启请求时解析时响应到达后立即解析，解析与其他请求的网络等待重叠；
+      开启分阶段计时时由该线程写入该行的耗时列
+    - extract 解析单个响应并写入解析字段列（每个位置只写一次）
+    - handle_result 由唯一的结果消费者调用，写入该行结果并返回 (错误信息, 响应时间)
+    """
+
+    def __init__(self, config: BatchRequestConfig, result_store: ResultStore, index_labels):
+        self.config = config
+        self.result_store = result_store
+        self.index_labels = index_labels
+
+    def extract(self, position: int, response_text):
+        extractor = self.config.inline_extractor
+        try:
+            values = extractor.extract(response_text)
+        except Exception as e:
+            detailed_logger.error(f"行{self.index_labels[position]}: 请求时解析失败 - {str(e)}")
+            return
+        for field_name, value in zip(extractor.field_names, values):
+            self.result_store.set_value(field_name, position, value)
+
+    def __call__(self, position: int, **func_params):
+        phase_timer = func_params.get('phase_timer')
+        if phase_timer is not None:
+            phase_timer.start()
+        response = sync_http_request(**func_params)
+        if response is not None and self.config.inline_extractor is not None:
+            try:
+                response_text = response.text
+            except Exception:
+                # 读取失败由handle_result统一处理
+                response_text = None
+            if response_text is not None:
+                parse_start = time.perf_counter()
+                self.extract(position, response_text)
+                if phase_timer is not None:
+                    phase_timer.add('parse', time.perf_counter() - parse_start)
+        if phase_timer is not None:
+            phase_timer.store(self.result_store, position)
+        return response
+
+    def handle_result(self, position: int, response):
+        """处理单个请求的结果，成功时错误信息为None"""
+        index = self.index_labels[position]
+        # 执行过程中抛出的异常
+        if isinstance(response, Exception):
+            self.result_store.set_result(position, status=STATUS_ERROR)
+            detailed_logger.error(f"行{index}: 执行失败 - {str(response)}")
+            return f"执行失败 - {str(response)}", None
+
+        # 如果response为None（请求失败），直接处理
+        if response is None:
+            self.result_store.set_result(position, status=STATUS_FAILED)
+            return "请求失败", None
+
+        response_time = getattr(response, 'response_time', None)
+        try:
+            # 记录响应内容和响应时间
+            response_text = None if self.config.drop_response_text else response.text
+            self.result_store.set_result(position, response_text, response_time)
+            # 流式请求的耗时指标
+            stream_metrics = getattr(response, 'stream_metrics', None)
+            if stream_metrics is not None:
+                for metric_name, value in stream_metrics.items():
+                    self.result_store.set_value(metric_name, position, value)
+        except Exception as e:
+            self.result_store.set_result(position, status=STATUS_ERROR)
+            exception_message = f"数据「{index}」获取response_text时错误: {str(e)}"
+            detailed_logger.error(exception_message)
+            return exception_message, None
+        return None, response_time
+
+
+def run_request_chunk(
+    chunk_df: pd.DataFrame,
+    result_store: ResultStore,
+    config: BatchRequestConfig,
+    on_progress: Callable[[Any, Optional[str], Optional[float]], None]
+):
+    """
+    执行一个分块的全部请求，结果写入result_store
+    每行完成时回调 on_progress(行索引, 错误信息或None, 响应时间)；线程池引擎由当前线程作为唯一的消费者按完成顺序处理结果
+    """
+    worker = RowRequestWorker(config, result_store, chunk_df.index)
+    if config.use_async_engine:
+        run_async_batch_http_request(
+            chunk_df,
+            config.placeholder_params_mapping_dic,
+            config.api_url,
+            config.headers,
+            config.params,
+            config.timeout,
+            concurrency=config.async_concurrency,
+            on_result=lambda index, response_text, response_time: on_progress(
+                index, "请求失败" if response_text is None else None, response_time
+            ),
+            on_error=lambda index, error_message: on_progress(index, f"执行失败 - {error_message}", None),
+            result_store=result_store,
+            on_response=worker.extract if config.inline_extractor is not None else None,
+            keep_response_text=not config.drop_response_text,
+            stream=config.stream,
+            phase_timing=config.phase_timing
+        )
+        return
+
+    # 请求时解析或分阶段计时需要在工作线程中包装请求
+    use_request_wrapper = config.inline_extractor is not None or config.phase_timing
+    completions = multi_exec_stream(
+        worker if use_request_wrapper else sync_http_request,
+        iter_request_params(chunk_df, config, with_position=use_request_wrapper),
+        max_workers=config.max_workers,
+        return_exceptions=True
+    )
+    for position, response in completions:
+        error_message, response_time = worker.handle_result(position, response)
+        on_progress(chunk_df.index[position], error_message, response_time)
+
+
+def run_request_chunks(
+    input_chunks: Iterable[pd.DataFrame],
+    columns: list,
+    config: BatchRequestConfig,
+    on_progress: Callable[[Any, Optional[str], Optional[float]], None],
+    on_chunk_start: Optional[Callable[[pd.DataFrame, ResultStore], None]] = None
+):
+    """
+    逐块执行批量请求的生成器：每块只保留columns中的列，请求全部完成后产出 (分块DataFrame, 结果缓冲区)
+    on_chunk_start(分块DataFrame, 结果缓冲区) 在该块开始请求前调用（如绑定增量结果写入器）
+    """
+    for chunk in input_chunks:
+        # 保留用户选择的列
+        chunk_df = pd.DataFrame()
+        chunk_df[columns] = chunk[columns]
+        result_store = config.create_result_store(len(chunk_df))
+        if on_chunk_start is not None:
+            on_chunk_start(chunk_df, result_store)
+        run_request_chunk(chunk_df, result_store, config, on_progress)
+        yield chunk_df, result_store
@@ -1,4 +1,4 @@
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 def multi_exec(func, kwargs: dict, max_workers: int = 4):
     """
     :param max_workers: 最大并发数
@@ -12,4 +12,49 @@ def multi_exec(func, kwargs: dict, max_workers: int = 4):
         futures = {index: executor.submit(func, **args) for index, args in kwargs.items()}
         for index, future in futures.items():
             results[index] = future.result()
-        return results
\ No newline at end of file
+        return results
+
+
+def multi_exec_stream(func, kwargs_iter, max_workers: int = 4, max_in_flight: int = None, return_exceptions: bool = False):
+    """
+    :param func: 函数
+    :param kwargs_iter: 参数迭代器, 每个元素是 (索引, 参数字典)
+    :param max_workers: 最大并发数
+    :param max_in_flight: 最多同时提交的任务数（背压），默认为 max_workers 的2倍
+    :param return_exceptions: 为True时把异常作为结果返回，否则直接抛出
+    :return: 生成器, 按完成顺序产出 (索引, 结果)
+    流式线程池执行：参数按需从迭代器读取，内存占用只与在途任务数有关，与输入总量无关
+    """
+    if max_in_flight is None:
+        max_in_flight = max_workers * 2
+    max_in_flight = max(max_in_flight, max_workers, 1)
+
+    kwargs_iter = iter(kwargs_iter)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        exhausted = False
+        while True:
+            # 补充任务直到达到在途上限
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    index, args = next(kwargs_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(func, **args)] = index
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        for pending in in_flight:
+                            pending.cancel()
+                        raise
+                    result = e
+                yield index, result
@@ -4,10 +4,16 @@
 包含数据处理、HTTP请求和响应处理等核心功能。
 """
 
-from .data_processing import read_dataframe_from_file, clean_dataframe_for_json, join_list_with_delimiter
+from .data_processing import read_dataframe_from_file, clean_dataframe_for_json, join_list_with_delimiter, normalize_nulls, iter_dataframe_chunks, ChunkedDataFile, DEFAULT_CHUNK_SIZE, detect_file_encoding, FILE_FORMATS, get_file_format, arrow_table_to_dataframe
 from .http_request import sync_http_request, parse_http_stream_false_response, parse_http_stream_true_response
-from .http_response import structure_request_params, parse_recall_result_special, parse_recall_result
-from .parser import get_json_field_value, get_all_json_keys
+from .sse_parser import SSEStreamParser, SSEStreamRecorder, STREAM_METRIC_COLUMNS, parse_http_stream_response
+from .http_session import get_pooled_session, acquire_pooled_session, release_pooled_session, close_pooled_sessions
+from .http_response import structure_request_params, parse_recall_result_special, parse_recall_result, RequestTemplate, compile_request_params, get_request_template, iter_request_bodies, structure_request_params_batch
+from .parser import get_json_field_value, get_all_json_keys, CompiledJsonPath, compile_json_path
+from .field_extractor import FieldSpec, FieldExtractor, ParsedDocumentCache, extract_fields, extract_fields_parallel, RESPONSE_PARSING_METHODS
+from .metrics import PHASE_COLUMNS, RequestPhaseTimer, add_phase_columns, summarize_phase_timings, LatencyHistogram, LiveBatchStats
+from .result_sink import ResultSink, IncrementalResultWriter, RESULT_SINK_FORMATS, FSYNC_NEVER, FSYNC_WRITE, FSYNC_CLOSE
+from .get_config import ApiConfig, ConfigRegistry, get_config_registry, get_api_config
 
 # 数据预处理方法配置
 DATA_PROCESSING_METHODS = {
@@ -19,30 +25,62 @@ DATA_PROCESSING_METHODS = {
     }
 }
 
-# Response解析方法配置
-RESPONSE_PARSING_METHODS = {
-    "get_field_value": {
-        "method": get_json_field_value,
-        "method_name": "获取指定字段值"
-    },
-    "get_all_keys": {
-        "method": get_all_json_keys,
-        "method_name": "获取所有字段路径"
-    }
-}
-
 __all__ = [
     "read_dataframe_from_file",
     "clean_dataframe_for_json", 
+    "normalize_nulls",
+    "iter_dataframe_chunks",
+    "ChunkedDataFile",
+    "DEFAULT_CHUNK_SIZE",
+    "detect_file_encoding",
+    "FILE_FORMATS",
+    "get_file_format",
+    "arrow_table_to_dataframe",
     "join_list_with_delimiter",
     "sync_http_request",
     "parse_http_stream_false_response",
     "parse_http_stream_true_response",
+    "SSEStreamParser",
+    "SSEStreamRecorder",
+    "STREAM_METRIC_COLUMNS",
+    "parse_http_stream_response",
+    "get_pooled_session",
+    "acquire_pooled_session",
+    "release_pooled_session",
+    "close_pooled_sessions",
     "structure_request_params",
     "parse_recall_result_special",
     "parse_recall_result",
+    "RequestTemplate",
+    "compile_request_params",
+    "get_request_template",
+    "iter_request_bodies",
+    "structure_request_params_batch",
     "get_json_field_value",
     "get_all_json_keys",
+    "CompiledJsonPath",
+    "compile_json_path",
+    "FieldSpec",
+    "FieldExtractor",
+    "ParsedDocumentCache",
+    "extract_fields",
+    "extract_fields_parallel",
+    "PHASE_COLUMNS",
+    "RequestPhaseTimer",
+    "add_phase_columns",
+    "summarize_phase_timings",
+    "LatencyHistogram",
+    "LiveBatchStats",
+    "ResultSink",
+    "IncrementalResultWriter",
+    "RESULT_SINK_FORMATS",
+    "FSYNC_NEVER",
+    "FSYNC_WRITE",
+    "FSYNC_CLOSE",
+    "ApiConfig",
+    "ConfigRegistry",
+    "get_config_registry",
+    "get_api_config",
     "DATA_PROCESSING_METHODS",
     "RESPONSE_PARSING_METHODS"
 ]
@@ -1,42 +1,578 @@
+import os
+import codecs
+import logging
+import datetime
+import decimal
 import pandas as pd
-import numpy as np
 from ..status import Status
 
+# 可选引入 pyarrow，Parquet 和 Feather(Arrow IPC) 文件的读取依赖它
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.feather as pa_feather  # type: ignore
+    import pyarrow.ipc as pa_ipc  # type: ignore
+    import pyarrow.parquet as pa_parquet  # type: ignore
+    _PYARROW_AVAILABLE = True
+except Exception:  # pyarrow 未安装时只能读取CSV/xlsx/JSONL
+    pa = pa_feather = pa_ipc = pa_parquet = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
+# 分块读取的默认行数
+DEFAULT_CHUNK_SIZE = 10000
+
+# 按扩展名识别的输入文件格式
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+# CSV尝试的编码顺序
+CSV_ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'latin-1']
+
+# 编码检测读取的文件开头字节数
+ENCODING_SAMPLE_SIZE = 1024 * 1024
+
+# BOM与对应编码（UTF-32 LE的BOM以UTF-16 LE的BOM开头，需先判断）
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _scan_file_encoding(filepath, encodings=CSV_ENCODINGS, block_size: int = ENCODING_SAMPLE_SIZE) -> str:
+    """
+    逐块严格解码整个文件，返回第一个能完整解码的编码（内存占用只与block_size有关）
+    开头全部为ASCII的部分任何候选编码都能解码，从第一个含非ASCII字节的块开始检查
+    """
+    with open(filepath, 'rb') as f:
+        start = 0
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return encodings[0]
+            if not block.isascii():
+                break
+            start += len(block)
+
+        for encoding in encodings:
+            f.seek(start)
+            decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+            try:
+                while True:
+                    block = f.read(block_size)
+                    decoder.decode(block, final=not block)
+                    if not block:
+                        return encoding
+            except UnicodeDecodeError:
+                continue
+    raise ValueError(f"无法使用常见编码（{', '.join(encodings)}）读取文件: {filepath}")
+
+
+def detect_file_encoding(filepath, sample_size: int = ENCODING_SAMPLE_SIZE, encodings=CSV_ENCODINGS, verify: bool = False) -> str:
+    """
+    根据文件开头的字节样本检测编码，不解析整个文件
+    有BOM时按BOM确定；否则按 encodings 顺序严格解码样本，返回第一个解码成功的编码
+    样本截断处的不完整多字节字符不视为错误
+    样本全部为ASCII时无法区分编码，verify为True且文件超出样本时扫描整个文件确定编码
+    （分块读取时已发送的分块无法撤回，需要在读取前确定整个文件的编码）
+    """
+    with open(filepath, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in _BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    if verify and len(sample) == sample_size and sample.isascii():
+        return _scan_file_encoding(filepath, encodings, sample_size)
+
+    # 样本未读满说明已到文件末尾，此时末尾的不完整字符是错误
+    is_complete = len(sample) < sample_size
+    for encoding in encodings:
+        try:
+            codecs.getincrementaldecoder(encoding)(errors='strict').decode(sample, final=is_complete)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    raise ValueError(f"无法使用常见编码（{', '.join(encodings)}）读取文件: {filepath}")
+
+
+def normalize_nulls(df):
+    """
+    将DataFrame中的空值（NaN/None/NaT/NA）统一为None
+    只转换含空值的列（转为object列），不含空值的列原样保留，不复制整表
+    """
+    df = df.copy(deep=False)
+    for column_index in range(df.shape[1]):
+        column = df.iloc[:, column_index]
+        null_mask = column.isna()
+        if null_mask.any():
+            df.isetitem(column_index, column.astype(object).where(~null_mask, None))
+    return df
+
+
 def clean_dataframe_for_json(df):
     """
     清理DataFrame中的NaN值，使其能够正确序列化为JSON
     """
     # 将NaN值替换为None，这样JSON序列化时会被转换为null
-    df = df.where(pd.notnull(df), None)
-    
-    # 处理numpy的NaN值
-    df = df.replace([np.nan], [None])
-    
+    return normalize_nulls(df)
+
+
+def get_file_format(filepath):
+    """
+    按扩展名识别文件格式（见 FILE_FORMATS），无法识别时返回None
+    兼容旧的判断方式：扩展名不在 FILE_FORMATS 中时，文件名包含csv/xlsx仍按CSV/xlsx读取
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in FILE_FORMATS:
+        return FILE_FORMATS[extension]
+    if 'csv' in filepath:
+        return 'csv'
+    if 'xlsx' in filepath:
+        return 'xlsx'
+    return None
+
+
+def _require_pyarrow(file_format):
+    if not _PYARROW_AVAILABLE:
+        raise ImportError(f"读取{file_format}文件需要安装pyarrow: pip install pyarrow")
+
+
+def _to_json_value(value, arrow_type=None):
+    """
+    将Arrow列中的Python取值转换为可直接JSON序列化的值（递归处理嵌套的list/dict）：
+    日期/时间为ISO格式字符串，Decimal和时间间隔为字符串，二进制按UTF-8解码
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if arrow_type is not None and pa.types.is_map(arrow_type):
+        # map 的 to_pylist 结果为 [(key, value), ...]
+        item_type = arrow_type.item_type
+        return {key: _to_json_value(item, item_type) for key, item in value}
+    if isinstance(value, dict):
+        field_types = {}
+        if arrow_type is not None and pa.types.is_struct(arrow_type):
+            field_types = {field.name: field.type for field in arrow_type}
+        return {key: _to_json_value(item, field_types.get(key)) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        item_type = getattr(arrow_type, 'value_type', None)
+        return [_to_json_value(item, item_type) for item in value]
+    if isinstance(value, (datetime.date, datetime.time)):
+        # pd.Timestamp 是 datetime 的子类，同样输出ISO格式
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, datetime.timedelta)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def _needs_python_values(arrow_type, null_count: int) -> bool:
+    """
+    是否需要逐值转换为Python原生取值：
+    嵌套、日期时间、Decimal、二进制列，以及含空值的整数列（to_pandas会转换为float，1变为1.0）
+    """
+    return (
+        pa.types.is_nested(arrow_type)
+        or pa.types.is_temporal(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+        or pa.types.is_binary(arrow_type)
+        or pa.types.is_large_binary(arrow_type)
+        or pa.types.is_fixed_size_binary(arrow_type)
+        or (pa.types.is_integer(arrow_type) and null_count > 0)
+    )
+
+
+def arrow_table_to_dataframe(table, offset: int = 0):
+    """
+    将Arrow的Table/RecordBatch转换为DataFrame，行索引从offset开始
+    取值均为可直接JSON序列化的Python值，作为整值占位符的取值时原样传入请求参数：
+    list/struct/map等嵌套列转换为list/dict（而不是numpy数组），不需要再json.loads；
+    日期/时间列为ISO格式字符串，Decimal列为字符串，含空值的整数列保持为int（空值为None）
+    """
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if _needs_python_values(column.type, column.null_count):
+            values = [_to_json_value(value, column.type) for value in column.to_pylist()]
+            columns[name] = pd.Series(values, dtype=object)
+        else:
+            columns[name] = column.to_pandas()
+    df = pd.DataFrame(columns)
+    df.index = pd.RangeIndex(offset, offset + table.num_rows)
     return df
 
-def read_dataframe_from_file(filepath):
+
+def _read_arrow_table(filepath, file_format, columns=None):
     """
-    从文件中读取df
+    以内存映射方式读取Parquet/Feather文件为Arrow表（未压缩的Feather/Arrow IPC为零拷贝）
+    columns不为None时只读取这些列
+    """
+    _require_pyarrow(file_format)
+    if file_format == 'parquet':
+        return pa_parquet.read_table(filepath, columns=columns, memory_map=True)
+    return pa_feather.read_table(filepath, columns=columns, memory_map=True)
+
+
+def _open_feather_file(source, columns=None):
+    """打开Feather V2/Arrow IPC文件；columns不为None时只读取（解压）这些列，Feather V1文件返回None"""
+    try:
+        reader = pa_ipc.open_file(source)
+    except pa.ArrowInvalid:
+        return None
+    if columns is not None:
+        included_fields = sorted(reader.schema.get_field_index(name) for name in columns)
+        reader = pa_ipc.open_file(source, options=pa_ipc.IpcReadOptions(included_fields=included_fields))
+    return reader
+
+
+def _iter_feather_batches(filepath, chunk_size, columns=None):
+    """
+    Feather V2/Arrow IPC文件内存映射后逐个读取记录批次，每次只解压一个批次，
+    超过chunk_size的批次再切片（零拷贝）；Feather V1文件没有记录批次，整表读取后切片
+    """
+    with pa.memory_map(filepath) as source:
+        reader = _open_feather_file(source, columns)
+        if reader is None:
+            yield from _read_arrow_table(filepath, 'feather', columns).to_batches(max_chunksize=chunk_size)
+            return
+        for batch_index in range(reader.num_record_batches):
+            batch = reader.get_batch(batch_index)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(start, chunk_size)
+
+
+def _count_feather_rows(filepath):
+    """Feather文件的行数，V2/Arrow IPC文件只读取记录批次的元数据"""
+    with pa.memory_map(filepath) as source:
+        reader = _open_feather_file(source)
+        if reader is None:
+            return _read_arrow_table(filepath, 'feather').num_rows
+        return reader.count_rows()
+
+
+def _iter_arrow_chunks(filepath, file_format, chunk_size, columns=None):
+    """Parquet按记录批次流式读取；Feather/Arrow IPC按记录批次读取（见 _iter_feather_batches）"""
+    _require_pyarrow(file_format)
+    if file_format == 'parquet':
+        batches = pa_parquet.ParquetFile(filepath, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns)
+    else:
+        batches = _iter_feather_batches(filepath, chunk_size, columns)
+    offset = 0
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        yield arrow_table_to_dataframe(batch, offset)
+        offset += batch.num_rows
+
+
+def _read_jsonl(filepath, **read_json_kwargs):
+    """
+    读取JSONL（每行一个JSON对象），嵌套的list/dict保持原样
+    不做类型和日期推断，取值与JSON中的一致
+    """
+    return pd.read_json(filepath, lines=True, dtype=False, convert_dates=False, encoding='utf-8', **read_json_kwargs)
+
+
+def _select_jsonl_columns(df, usecols):
+    """JSONL每行都需要完整解析，只能在解析后选取列；某些行缺少的键取值为空"""
+    return df if usecols is None else df.reindex(columns=usecols)
+
+
+def _iter_jsonl_chunks(filepath, chunk_size, usecols=None):
+    """
+    按 chunk_size 行分块读取JSONL
+    每块的列只来自该块中出现的键，统一按usecols（未指定时为第一个分块的列）对齐，
+    缺少的键取值为空，第一个分块之后才出现的键不读取
+    """
+    columns = usecols
+    with _read_jsonl(filepath, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if columns is None:
+                columns = chunk.columns.tolist()
+            yield chunk.reindex(columns=columns)
+
+
+def _make_unique_header(header):
+    """与pandas.read_excel一致：空列名为 "Unnamed: i"，重复列名追加 ".n" 后缀"""
+    columns = []
+    seen = {}
+    for column_index, name in enumerate(header):
+        name = f"Unnamed: {column_index}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            unique_name = f"{name}.{seen[name]}"
+            while unique_name in seen:
+                seen[name] += 1
+                unique_name = f"{name}.{seen[name]}"
+            name = unique_name
+        seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _iter_excel_chunks(filepath, chunk_size, usecols=None):
+    """
+    以openpyxl只读模式逐行读取xlsx第一个工作表，每 chunk_size 行组成一个DataFrame
+    与pandas.read_excel一致：首行为列名，中间的空行保留，末尾的空行丢弃
+    usecols不为None时每行只保留这些列的取值
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _make_unique_header(header)
+        column_count = len(columns)
+        empty_row = (None,) * column_count
+        # 是否为空行按整行判断，只保留选中列的取值
+        if usecols is None:
+            selected_indices = list(range(column_count))
+        else:
+            selected_indices = [columns.index(name) for name in usecols]
+        selected_columns = [columns[column_index] for column_index in selected_indices]
+        selected_empty_row = (None,) * len(selected_indices)
+
+        batch = []
+        offset = 0
+        pending_empty_rows = 0
+        for row in rows:
+            row = tuple(row[:column_count]) + (None,) * (column_count - len(row))
+            if row == empty_row:
+                # 空行先计数，后面出现非空行时才补上
+                pending_empty_rows += 1
+                continue
+            while pending_empty_rows:
+                batch.append(selected_empty_row)
+                pending_empty_rows -= 1
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame(batch, columns=selected_columns, index=pd.RangeIndex(offset, offset + len(batch)))
+                    offset += len(batch)
+                    batch = []
+            batch.append(tuple(row[column_index] for column_index in selected_indices))
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=selected_columns, index=pd.RangeIndex(offset, offset + len(batch)))
+                offset += len(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=selected_columns, index=pd.RangeIndex(offset, offset + len(batch)))
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(filepath, chunk_size, encoding, **read_csv_kwargs):
+    """按 chunk_size 行分块读取CSV，行索引在分块间连续"""
+    with pd.read_csv(filepath, encoding=encoding, chunksize=chunk_size, **read_csv_kwargs) as reader:
+        try:
+            yield from reader
+        except UnicodeDecodeError as e:
+            # 已产出的分块无法撤回，只能报错（可改用整表读取，会自动尝试其他编码）
+            raise ValueError(f"文件无法使用检测到的编码 {encoding} 完整解码: {filepath}（{e}）") from e
+
+
+def iter_dataframe_chunks(filepath, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None, usecols: list = None):
+    """
+    分块读取CSV/xlsx/Parquet/Feather/JSONL文件，逐块产出已清理空值的DataFrame
+    内存占用只与 chunk_size 有关，与文件大小无关；行索引在分块间连续（从0开始）
+    CSV未指定encoding时根据文件开头的字节样本检测
+    usecols为列名列表时只读取这些列（CSV/xlsx/Parquet/Feather在读取时裁剪，JSONL在解析后选取）
+    """
+    chunk_size = max(1, int(chunk_size))
+    file_format = get_file_format(filepath)
+    if file_format == 'csv':
+        chunks = _iter_csv_chunks(filepath, chunk_size, encoding or detect_file_encoding(filepath, verify=True), usecols=usecols)
+    elif file_format == 'xlsx':
+        chunks = _iter_excel_chunks(filepath, chunk_size, usecols)
+    elif file_format in ('parquet', 'feather'):
+        chunks = _iter_arrow_chunks(filepath, file_format, chunk_size, usecols)
+    elif file_format == 'jsonl':
+        chunks = _iter_jsonl_chunks(filepath, chunk_size, usecols)
+    else:
+        raise ValueError(f"不支持分块读取的文件类型: {filepath}")
+    for chunk in chunks:
+        yield normalize_nulls(chunk)
+
+
+class ChunkedDataFile:
+    """
+    分块读取的数据文件，不整表加载到内存
+
+    columns / head() / first_chunk() 只读取第一个分块；count_rows() 分块遍历一次文件计数（结果缓存）；
+    iter_chunks() 每次调用都从头分块读取，可直接作为批量请求的输入；read() 整表读取
+    两者都可以通过 usecols 只读取需要的列（列裁剪），projection_savings() 估算裁剪节省的数据量
+    """
+
+    def __init__(self, filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.filepath = filepath
+        self.chunk_size = max(1, int(chunk_size))
+        self.file_format = get_file_format(filepath)
+        # CSV的编码只检测一次（其他格式为None），开头全部为ASCII时扫描整个文件确认
+        self.encoding = detect_file_encoding(filepath, verify=True) if self.file_format == 'csv' else None
+        self._preview = None
+        self._row_count = None
+        self._column_bytes = None
+
+    def first_chunk(self) -> pd.DataFrame:
+        """第一个分块（缓存），用于预览和选择列"""
+        if self._preview is None:
+            chunks = iter_dataframe_chunks(self.filepath, self.chunk_size, self.encoding)
+            try:
+                self._preview = next(chunks, None)
+            finally:
+                chunks.close()
+            if self._preview is None:
+                self._preview = pd.DataFrame()
+        return self._preview
+
+    @property
+    def columns(self) -> list:
+        return self.first_chunk().columns.tolist()
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        return self.first_chunk().head(n)
+
+    def count_rows(self) -> int:
+        """数据行数（不含表头）"""
+        if self._row_count is None:
+            if self.file_format == 'parquet':
+                # 直接读取文件元数据中的行数
+                _require_pyarrow(self.file_format)
+                self._row_count = pa_parquet.ParquetFile(self.filepath).metadata.num_rows
+                return self._row_count
+            if self.file_format == 'feather':
+                _require_pyarrow(self.file_format)
+                self._row_count = _count_feather_rows(self.filepath)
+                return self._row_count
+            if self.file_format == 'csv':
+                # 只解析第一列计数
+                chunks = _iter_csv_chunks(self.filepath, max(self.chunk_size, 100000), self.encoding, usecols=[0])
+            else:
+                chunks = iter_dataframe_chunks(self.filepath, self.chunk_size, self.encoding)
+            self._row_count = sum(len(chunk) for chunk in chunks)
+        return self._row_count
+
+    def __len__(self):
+        return self.count_rows()
+
+    @property
+    def shape(self) -> tuple:
+        return (self.count_rows(), len(self.columns))
+
+    def _check_columns(self, columns):
+        """包含文件中不存在的列时报错（不依赖各格式读取库的报错信息）"""
+        missing = set(columns).difference(self.columns)
+        if missing:
+            raise ValueError(f"数据文件中不存在列: {sorted(missing)}")
+
+    def select_columns(self, columns) -> list:
+        """按文件中的列顺序去重，返回要读取的列名；包含文件中不存在的列时报错"""
+        self._check_columns(columns)
+        wanted = set(columns)
+        return [name for name in self.columns if name in wanted]
+
+    def column_bytes(self) -> dict:
+        """
+        各列的数据量（字节，结果缓存）
+        Parquet为文件元数据中各列压缩后的大小，即实际读取的I/O量；
+        其他格式按第一个分块中各列的内存占用，按总行数等比例推算
+        """
+        if self._column_bytes is None:
+            if self.file_format == 'parquet':
+                _require_pyarrow(self.file_format)
+                metadata = pa_parquet.ParquetFile(self.filepath).metadata
+                sizes = dict.fromkeys(self.columns, 0)
+                for row_group_index in range(metadata.num_row_groups):
+                    row_group = metadata.row_group(row_group_index)
+                    for column_index in range(row_group.num_columns):
+                        column_chunk = row_group.column(column_index)
+                        # 嵌套列的叶子路径形如 "tags.list.element"，计入顶层列
+                        path = column_chunk.path_in_schema
+                        name = next((name for name in sizes if path == name or path.startswith(f"{name}.")), None)
+                        if name is not None:
+                            sizes[name] += column_chunk.total_compressed_size
+            else:
+                preview = self.first_chunk()
+                scale = self.count_rows() / len(preview) if len(preview) else 0
+                usage = preview.memory_usage(deep=True, index=False)
+                sizes = {name: int(usage[name] * scale) for name in preview.columns}
+            self._column_bytes = sizes
+        return self._column_bytes
+
+    def projection_savings(self, usecols) -> tuple:
+        """只读取usecols时节省的数据量，返回 (节省的字节数, 全部列的字节数)"""
+        sizes = self.column_bytes()
+        total = sum(sizes.values())
+        kept = sum(sizes.get(name, 0) for name in usecols)
+        return total - kept, total
+
+    def iter_chunks(self, usecols: list = None):
+        if usecols is not None:
+            self._check_columns(usecols)
+        return iter_dataframe_chunks(self.filepath, self.chunk_size, self.encoding, usecols)
+
+    def read(self, usecols: list = None) -> pd.DataFrame:
+        """整表读取（可只读取usecols中的列）"""
+        if usecols is not None:
+            self._check_columns(usecols)
+        return read_dataframe_from_file(self.filepath, usecols=usecols)
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+
+def _read_csv_with_detected_encoding(filepath, usecols=None):
+    """
+    按检测到的编码只解析一次CSV，返回 (df, encoding)
+    样本之后才出现的解码错误（检测结果不适用于整个文件）时，依次改用其余编码
+    """
+    detected_encoding = detect_file_encoding(filepath)
+    encodings = [detected_encoding] + [encoding for encoding in CSV_ENCODINGS if encoding != detected_encoding]
+    for encoding in encodings:
+        try:
+            return pd.read_csv(filepath, encoding=encoding, usecols=usecols), encoding
+        except UnicodeDecodeError as e:
+            logging.warning(f"使用编码 {encoding} 读取 {filepath} 失败，尝试其他编码: {e}")
+    raise ValueError(f"无法使用常见编码（{', '.join(CSV_ENCODINGS)}）读取文件: {filepath}")
+
+
+def read_dataframe_from_file(filepath, usecols: list = None):
+    """
+    从文件中读取df，按扩展名选择读取方式（见 FILE_FORMATS）
+    Parquet/Feather/JSONL中的嵌套列保持为list/dict；CSV的编码记录在 df.attrs['encoding'] 中
+    usecols为列名列表时只读取这些列（列裁剪）
     """
     df = None
+    encoding = None
     # 判断文件类型
-    if 'csv' in filepath:
-        # 尝试多种编码方式读取CSV文件
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1']
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(filepath, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        if df is None:
-            raise ValueError(f"无法使用常见编码（{', '.join(encodings)}）读取文件: {filepath}")
-    elif 'xlsx' in filepath:
-        df = pd.read_excel(filepath)
+    file_format = get_file_format(filepath)
+    if file_format == 'csv':
+        df, encoding = _read_csv_with_detected_encoding(filepath, usecols=usecols)
+    elif file_format == 'xlsx':
+        df = pd.read_excel(filepath, usecols=usecols)
+    elif file_format in ('parquet', 'feather'):
+        df = arrow_table_to_dataframe(_read_arrow_table(filepath, file_format, usecols))
+    elif file_format == 'jsonl':
+        df = _select_jsonl_columns(_read_jsonl(filepath), usecols)
     
     # 清理NaN值，避免JSON序列化问题
     if df is not None:
         df = clean_dataframe_for_json(df)
+        df.attrs['encoding'] = encoding
     
     return df
 
@@ -0,0 +1,221 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .parser import get_json_field_value, get_all_json_keys, compile_json_path
+
+# 解析失败的占位标记（缓存中区分"解析失败"与"解析结果为None"）
+_PARSE_FAILED = object()
+
+# Response解析方法配置
+# 定义在不依赖apps的模块中：spawn方式启动的解析子进程只导入本模块，不会执行界面模块的初始化
+RESPONSE_PARSING_METHODS = {
+    "get_field_value": {
+        "method": get_json_field_value,
+        "method_name": "获取指定字段值"
+    },
+    "get_all_keys": {
+        "method": get_all_json_keys,
+        "method_name": "获取所有字段路径"
+    }
+}
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    单个解析字段的配置
+    method 为 RESPONSE_PARSING_METHODS 中的解析方法，调用方式为 method(response_json, field_path)
+    """
+    field_name: str
+    field_path: str
+    method: Callable = get_json_field_value
+
+
+def _compile_field_spec(spec: FieldSpec) -> Callable[[Any], Any]:
+    """
+    将字段配置编译为只接收已解析文档的求值函数
+    get_json_field_value 直接使用编译后的路径，跳过每次调用时的路径解析
+    """
+    if spec.method is get_json_field_value:
+        if not spec.field_path:
+            return lambda document: None
+        compiled_path = compile_json_path(spec.field_path)
+
+        def evaluate(document):
+            # 与 get_json_field_value 一致：空文档返回None，字符串文档（响应为二次编码的JSON）再解析一次，异常返回None
+            if document is None:
+                return None
+            try:
+                if isinstance(document, str):
+                    document = json.loads(document)
+                return compiled_path.search(document)
+            except Exception:
+                return None
+        return evaluate
+
+    method = spec.method
+    field_path = spec.field_path
+    return lambda document: method(document, field_path)
+
+
+class ParsedDocumentCache:
+    """
+    已解析响应的缓存，按行位置存储
+    命中条件为同一位置的响应文本未变化（先比较对象身份，再比较内容），
+    修改字段配置后重新生成时不需要再次json.loads
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get(self, position: int, response_text):
+        """返回解析后的文档；解析失败时抛出原始异常"""
+        entry = self._entries.get(position)
+        if entry is not None:
+            cached_text, document = entry
+            if cached_text is response_text or cached_text == response_text:
+                if isinstance(document, Exception):
+                    raise document
+                return document
+
+        try:
+            document = json.loads(response_text)
+        except Exception as e:
+            self._entries[position] = (response_text, e.with_traceback(None))
+            raise
+        self._entries[position] = (response_text, document)
+        return document
+
+
+class FieldExtractor:
+    """
+    编译后的多字段提取器：字段配置只编译一次，可在多个线程中并发调用
+    extract(response_text) 解析一次响应并按 field_names 的顺序返回所有字段值
+    """
+
+    def __init__(self, field_specs: List[FieldSpec]):
+        # 同名字段以最后一个配置为准（与逐行赋值的覆盖顺序一致）
+        evaluators = {}
+        for spec in field_specs:
+            evaluators[spec.field_name] = _compile_field_spec(spec)
+        self.field_names = list(evaluators)
+        self._evaluators = list(evaluators.values())
+
+    def extract_document(self, document) -> list:
+        """对已解析的文档求值全部字段"""
+        return [evaluate(document) for evaluate in self._evaluators]
+
+    def extract(self, response_text) -> list:
+        """解析响应文本并求值全部字段，解析失败时抛出异常"""
+        return self.extract_document(json.loads(response_text))
+
+
+def extract_fields(
+    response_texts: Iterable,
+    field_specs: List[FieldSpec],
+    cache: Optional[ParsedDocumentCache] = None,
+    on_error: Optional[Callable[[int, Exception], None]] = None
+) -> Dict[str, list]:
+    """
+    一次遍历为所有配置的字段生成结果列
+
+    每条响应只解析一次（传入cache时跨多次调用复用解析结果），再依次求值全部字段；
+    某行解析或求值出错时该行所有字段为None，并调用 on_error(position, exception)
+
+    Returns:
+        {field_name: [每行的结果, ...]}，行顺序与response_texts一致
+    """
+    extractor = FieldExtractor(field_specs)
+    columns = {field_name: [] for field_name in extractor.field_names}
+    appenders = [columns[field_name].append for field_name in extractor.field_names]
+    empty_values = [None] * len(appenders)
+
+    for position, response_text in enumerate(response_texts):
+        try:
+            if cache is not None:
+                values = extractor.extract_document(cache.get(position, response_text))
+            else:
+                values = extractor.extract(response_text)
+        except Exception as e:
+            if on_error is not None:
+                on_error(position, e)
+            values = empty_values
+
+        for append, value in zip(appenders, values):
+            append(value)
+
+    return columns
+
+
+def _method_key(method: Callable) -> str:
+    """在 RESPONSE_PARSING_METHODS 中查找解析方法对应的键名"""
+    for key, config in RESPONSE_PARSING_METHODS.items():
+        if config['method'] is method:
+            return key
+    raise ValueError(f"解析方法未在RESPONSE_PARSING_METHODS中注册，无法用于多进程解析: {method}")
+
+
+def _extract_fields_chunk(response_texts: list, spec_items: List[Tuple[str, str, str]]):
+    """
+    子进程中执行：按 (字段名, 字段路径, 解析方法键名) 重建字段配置并解析一个分块
+    返回 (列结果, [(分块内行位置, 错误信息), ...])
+    """
+    field_specs = [
+        FieldSpec(field_name, field_path, RESPONSE_PARSING_METHODS[method_key]['method'])
+        for field_name, field_path, method_key in spec_items
+    ]
+    errors = []
+    columns = extract_fields(
+        response_texts,
+        field_specs,
+        on_error=lambda position, e: errors.append((position, str(e)))
+    )
+    return columns, errors
+
+
+def extract_fields_parallel(
+    response_texts: Iterable,
+    field_specs: List[FieldSpec],
+    chunk_size: int = 5000,
+    max_workers: Optional[int] = None,
+    on_error: Optional[Callable[[int, Exception], None]] = None
+) -> Dict[str, list]:
+    """
+    多进程版本的 extract_fields，适用于大批量响应的纯CPU解析
+
+    响应文本按 chunk_size 分块发送到进程池，字段配置以可序列化的
+    (字段名, 字段路径, RESPONSE_PARSING_METHODS键名) 传递，结果按行顺序拼接；
+    数据量不足两个分块或只有一个进程时直接在当前进程中解析
+    子进程中的错误以 on_error(position, Exception(错误信息)) 回传
+    """
+    response_texts = list(response_texts)
+    chunk_size = max(1, int(chunk_size))
+    max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+
+    if max_workers == 1 or len(response_texts) <= chunk_size:
+        return extract_fields(response_texts, field_specs, on_error=on_error)
+
+    spec_items = [(spec.field_name, spec.field_path, _method_key(spec.method)) for spec in field_specs]
+    chunks = [response_texts[start:start + chunk_size] for start in range(0, len(response_texts), chunk_size)]
+
+    columns = {spec.field_name: [] for spec in field_specs}
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        # map 按提交顺序返回结果，分块依次拼接即为原始行顺序
+        results = executor.map(_extract_fields_chunk, chunks, [spec_items] * len(chunks))
+        for chunk_index, (chunk_columns, errors) in enumerate(results):
+            offset = chunk_index * chunk_size
+            for field_name, values in chunk_columns.items():
+                columns[field_name].extend(values)
+            if on_error is not None:
+                for position, message in errors:
+                    on_error(offset + position, Exception(message))
+    return columns
@@ -1,87 +1,184 @@
+import os
 import re
 import json
-from typing import List
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Tuple
 
-def get_api_url_name_list(config_file_path: str = 'config.json') -> List[str]:
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    return [config['api_name'] for config in configs]
-    
-def get_api_params_placeholder_list_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> List[str]:
+_PLACEHOLDER_RE = re.compile(r'\${([^}]+)}')
+
+DEFAULT_TIMEOUT = 30
+
+
+def _freeze(value):
+    """递归转换为只读结构：dict -> MappingProxyType，list -> tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """_freeze 的逆操作，返回可以修改的dict/list副本"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class ApiConfig:
+    """
+    单个API的配置（只读）
+    headers / params 为递归只读的结构（MappingProxyType和tuple），缓存的配置被共享，
+    需要修改或作为请求参数使用时通过 get_api_headers_by_name / get_api_params_by_name 获取副本
+    placeholders 为加载时从params中提取的占位符（去重并保持顺序）
+    """
+    api_name: str
+    api_url: Optional[str]
+    headers: Optional[Mapping[str, Any]]
+    params: Any
+    timeout: float = DEFAULT_TIMEOUT
+    placeholders: Tuple[str, ...] = ()
+
+
+def extract_params_placeholders(params) -> List[str]:
     """
     递归解析嵌套参数结构中的占位符
     支持多层嵌套的字典和列表结构
     """
     placeholder_list = []
-    
-    def extract_placeholders_recursive(data, path=""):
+
+    def extract_placeholders_recursive(data):
         """递归提取占位符"""
         if isinstance(data, dict):
-            for key, value in data.items():
-                current_path = f"{path}.{key}" if path else key
-                extract_placeholders_recursive(value, current_path)
+            for value in data.values():
+                extract_placeholders_recursive(value)
         elif isinstance(data, list):
-            for i, item in enumerate(data):
-                current_path = f"{path}[{i}]" if path else f"[{i}]"
-                extract_placeholders_recursive(item, current_path)
+            for item in data:
+                extract_placeholders_recursive(item)
         elif isinstance(data, str):
             # 查找字符串中的所有占位符
-            matches = re.findall(r'\${([^}]+)}', data)
-            for match in matches:
-                placeholder_list.append(match)
-    
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    
-    # 根据api_name获取配置
-    for config in configs:
-        if config['api_name'] == api_name:
-            params = config['params']
-            extract_placeholders_recursive(params)
-            break
-    
+            placeholder_list.extend(_PLACEHOLDER_RE.findall(data))
+
+    extract_placeholders_recursive(params)
+
     # 去重并保持顺序
-    seen = set()
-    unique_placeholders = []
-    for placeholder in placeholder_list:
-        if placeholder not in seen:
-            seen.add(placeholder)
-            unique_placeholders.append(placeholder)
-    
-    return unique_placeholders
+    return list(dict.fromkeys(placeholder_list))
+
+
+class ConfigRegistry:
+    """
+    config.json 注册表
+    文件只解析一次并按 api_name 建立索引；每次访问时检查文件的 mtime/size，发生变化才重新加载
+    """
+
+    def __init__(self, config_file_path: str = 'config.json'):
+        self.config_file_path = config_file_path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._names = []
+        self._configs = {}
+
+    def _file_signature(self) -> tuple:
+        stat = os.stat(self.config_file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        with open(self.config_file_path, 'r', encoding='utf-8') as f:
+            configs = json.load(f)
+
+        names = []
+        index = {}
+        for config in configs:
+            api_name = config['api_name']
+            names.append(api_name)
+            # 与原先的线性查找一致，同名配置以第一个为准
+            if api_name in index:
+                continue
+            params = config.get('params')
+            index[api_name] = ApiConfig(
+                api_name=api_name,
+                api_url=config.get('api_url'),
+                headers=_freeze(config.get('headers')),
+                params=_freeze(params),
+                timeout=config.get('timeout', DEFAULT_TIMEOUT),
+                placeholders=tuple(extract_params_placeholders(params)),
+            )
+        return names, index
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature != self._signature:
+                self._names, self._configs = self._load()
+                self._signature = signature
+
+    def names(self) -> List[str]:
+        self._refresh()
+        return list(self._names)
+
+    def get(self, api_name: str) -> Optional[ApiConfig]:
+        self._refresh()
+        return self._configs.get(api_name)
+
+
+# 按配置文件路径缓存的注册表
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_config_registry(config_file_path: str = 'config.json') -> ConfigRegistry:
+    key = os.path.abspath(config_file_path)
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(key, ConfigRegistry(config_file_path))
+    return registry
+
+
+def get_api_config(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> Optional[ApiConfig]:
+    """
+    获取API配置对象，找不到时返回None
+    返回的对象为共享的只读对象，其中的headers/params不能修改
+    """
+    return get_config_registry(config_file_path).get(api_name)
+
+
+def get_api_url_name_list(config_file_path: str = 'config.json') -> List[str]:
+    return get_config_registry(config_file_path).names()
+
+def get_api_params_placeholder_list_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> List[str]:
+    """
+    获取参数中的占位符列表（加载配置时已提取）
+    """
+    config = get_api_config(config_file_path, api_name)
+    if config is None:
+        return []
+    return list(config.placeholders)
 
 def get_api_url_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> str:
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    for config in configs:
-        if config['api_name'] == api_name:
-            return config['api_url']
-    return None
+    config = get_api_config(config_file_path, api_name)
+    return config.api_url if config is not None else None
 
 def get_api_params_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> dict:
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    for config in configs:
-        if config['api_name'] == api_name:
-            return config['params']
-    return None
+    # 返回副本，调用方修改不影响缓存的配置
+    config = get_api_config(config_file_path, api_name)
+    return _thaw(config.params) if config is not None else None
 
 def get_api_headers_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> dict:
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    for config in configs:
-        if config['api_name'] == api_name:
-            return config['headers']
-    return None
+    config = get_api_config(config_file_path, api_name)
+    return _thaw(config.headers) if config is not None else None
 
 def get_api_timeout_by_name(config_file_path: str = 'config.json', api_name: str = 'test_api_name') -> float:
     """
     获取 API 配置的超时时间（秒）
     如果配置中没有设置 timeout，默认返回 30 秒
     """
-    with open(config_file_path, 'r', encoding='utf-8') as f:
-        configs = json.load(f)
-    for config in configs:
-        if config['api_name'] == api_name:
-            return config.get('timeout', 30)
-    return 30
\ No newline at end of file
+    config = get_api_config(config_file_path, api_name)
+    return config.timeout if config is not None else DEFAULT_TIMEOUT
@@ -3,43 +3,51 @@ import json
 import requests
 import re
 import time
+from functools import partial
+from .http_session import get_pooled_session, reset_connect_time, pop_connect_time
+from .sse_parser import SSEStreamParser, SSEStreamRecorder
+
+# 按顺序替换的控制字符 (字符, 替换文本)：制表符替换为4个空格，回车/换行替换为转义字符
+# 替换文本为多个字符，逐个str.replace，不是str.translate的转换表
+_CONTROL_CHARACTER_REPLACEMENTS = (
+    ('\t', '    '),
+    ('\r', '\\r'),
+    ('\n', '\\n'),
+)
+# 其余ASCII/C1控制字符和零宽字符直接移除
+_REMOVED_CHARACTERS_RE = re.compile('[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F\u200B-\u200D\uFEFF]')
+
 
 def clean_control_characters(text):
     """
     清理字符串中的控制字符，将特殊字符转换为安全格式
+    可打印字符串（绝大多数情况）直接原样返回，不产生新对象；
+    否则只对实际出现的字符做转换，再用一次正则移除其余控制字符
     """
     if not isinstance(text, str):
         return text
     
-    # 先处理特殊字符的转换
-    cleaned = text
-    
-    # 制表符转换为4个空格
-    cleaned = cleaned.replace('\t', '    ')
-    
-    # 回车符转换为转义字符
-    cleaned = cleaned.replace('\r', '\\r')
-    
-    # 换行符转换为转义字符
-    cleaned = cleaned.replace('\n', '\\n')
-    
-    # 清理其他控制字符（保留已转换的字符）
-    # 移除ASCII控制字符（除了已处理的制表符、回车符、换行符）
-    cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', cleaned)
-    
-    # 额外清理：移除其他可能导致JSON问题的字符
-    # 移除零宽字符和其他不可见字符
-    cleaned = re.sub(r'[\u200B-\u200D\uFEFF]', '', cleaned)
+    # 需要处理的字符都属于不可打印字符，isprintable为True时无需清理
+    if text.isprintable():
+        return text
     
-    return cleaned
+    cleaned = text
+    for char, replacement in _CONTROL_CHARACTER_REPLACEMENTS:
+        if char in cleaned:
+            cleaned = cleaned.replace(char, replacement)
+    return _REMOVED_CHARACTERS_RE.sub('', cleaned)
 
-def safe_json_dumps(data, ensure_ascii=False):
+def safe_json_dumps(data, ensure_ascii=False, clean=True, validate=False):
     """
     安全的JSON序列化，处理控制字符
+    clean为False表示调用方已清理过控制字符，不再重复遍历
+    validate为True时回读校验生成的JSON并在无效时严格清理后重试（调试用，会使序列化开销翻倍）
     """
     try:
         # 如果数据是字符串，先清理控制字符
-        if isinstance(data, str):
+        if not clean:
+            pass
+        elif isinstance(data, str):
             data = clean_control_characters(data)
         elif isinstance(data, dict):
             # 递归清理字典中的字符串值
@@ -48,6 +56,9 @@ def safe_json_dumps(data, ensure_ascii=False):
         # 使用更严格的JSON序列化设置
         json_str = json.dumps(data, ensure_ascii=ensure_ascii, separators=(',', ':'), allow_nan=False)
         
+        if not validate:
+            return json_str
+        
         # 验证生成的JSON是否有效
         try:
             json.loads(json_str)
@@ -64,6 +75,22 @@ def safe_json_dumps(data, ensure_ascii=False):
         logging.error(f"JSON序列化失败: {e}")
         raise
 
+class RequestBuildError(ValueError):
+    """
+    单行请求参数构建失败（如整值占位符的取值为NaN/Infinity等无法序列化为JSON的值）
+    由 iter_request_bodies 代替该行的请求体产出，发送时该行直接失败，不影响其他行
+    """
+
+
+def dumps_request_body(data) -> bytes:
+    """
+    可信序列化：一次性生成UTF-8编码的请求体，不做回读校验
+    用于编译模板渲染出的参数（结构来自config.json，取值来自数据列），
+    序列化后的JSON文本中只可能残留未转义的C1控制字符和零宽字符，清理后直接编码
+    """
+    json_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    return clean_control_characters(json_str).encode('utf-8')
+
 def strict_clean_dict(data):
     """
     更严格的字典清理，移除所有可能有问题的字符
@@ -92,19 +119,53 @@ def clean_dict_control_characters(data):
     else:
         return data
 
-def sync_http_request(api_url=None, request_params=None, headers=None, timeout=30):
+def sync_http_request(api_url=None, request_params=None, headers=None, timeout=30, max_workers=None, stream=False, phase_timer=None):
     """
     请求 http 的数据
+    传入max_workers时使用按host和并发数共享的keep-alive连接池，否则每次新建连接
+    stream为True时边接收边解析SSE事件，并在response.stream_metrics中记录
+    首字节时间、首个事件时间、事件间隔和总耗时（见STREAM_METRIC_COLUMNS）
+    传入phase_timer（RequestPhaseTimer）时记录build/connect/ttfb/download各阶段耗时，
+    连接耗时只在使用连接池会话（传入max_workers）时可测
+    request_params为RequestBuildError时（该行请求参数构建失败）直接抛出，不发送请求
     """
+    if isinstance(request_params, RequestBuildError):
+        raise request_params
+
     # 记录请求开始时间
     start_time = time.time()
+    build_start = time.perf_counter()
+    headers_received_at = None
     
     try:
-        # 设置默认headers
+        # 选择发送方式：连接池会话或一次性请求
+        if max_workers is not None:
+            http_post = get_pooled_session(api_url, max_workers).post
+        else:
+            http_post = requests.post
+        if stream or phase_timer is not None:
+            # 分阶段计时需要在响应头到达时返回，单独计量响应体下载时间
+            http_post = partial(http_post, stream=True)
+        if phase_timer is not None:
+            send_post = http_post
+
+            def http_post(**kwargs):
+                nonlocal headers_received_at
+                send_at = time.perf_counter()
+                phase_timer.add('build', send_at - build_start)
+                reset_connect_time()
+                response = send_post(**kwargs)
+                headers_received_at = time.perf_counter()
+                connect_time = pop_connect_time()
+                phase_timer.add('connect', connect_time)
+                phase_timer.add('ttfb', headers_received_at - send_at - connect_time)
+                return response
+        
+        # 设置默认headers（不修改调用方传入的headers，其可能是共享的配置）
         if headers is None:
             headers = {'Content-Type': 'application/json'}
         elif 'Content-Type' not in headers:
-            headers['Content-Type'] = 'application/json'
+            headers = {**headers, 'Content-Type': 'application/json'}
         
         # 处理请求参数
         if isinstance(request_params, str):
@@ -118,11 +179,11 @@ def sync_http_request(api_url=None, request_params=None, headers=None, timeout=3
                 json_data = json.loads(cleaned_params)
                 logging.debug(f"JSON解析成功: {type(json_data)}")
                 # 使用json参数发送请求
-                response = requests.post(url=api_url, json=json_data, headers=headers, timeout=timeout)
+                response = http_post(url=api_url, json=json_data, headers=headers, timeout=timeout)
             except json.JSONDecodeError as e:
                 logging.debug(f"JSON解析失败，作为普通字符串发送: {e}")
                 # 如果不是有效的JSON，作为普通字符串发送
-                response = requests.post(url=api_url, data=cleaned_params.encode('utf-8'), headers=headers, timeout=timeout)
+                response = http_post(url=api_url, data=cleaned_params.encode('utf-8'), headers=headers, timeout=timeout)
         elif isinstance(request_params, dict):
             # 清理字典中的控制字符并序列化
             cleaned_params = clean_dict_control_characters(request_params)
@@ -130,32 +191,45 @@ def sync_http_request(api_url=None, request_params=None, headers=None, timeout=3
             logging.debug(f"字典参数清理后: {str(cleaned_params)[:200]}")
             
             # 先尝试手动序列化以检查是否有问题
+            # 取值已在上面一次遍历中清理，json.dumps会转义其余ASCII控制字符，不再对序列化结果重复清理
             try:
-                json_str = safe_json_dumps(cleaned_params)
+                json_str = safe_json_dumps(cleaned_params, clean=False)
                 logging.debug(f"JSON序列化成功，长度: {len(json_str)}")
                 
-                # 最终验证：确保JSON字符串不包含控制字符
-                final_json = clean_control_characters(json_str)
-                if final_json != json_str:
-                    logging.warning(f"JSON字符串中仍有控制字符，已清理")
-                    json_str = final_json
-                
                 # 使用data参数发送已验证的JSON字符串
-                response = requests.post(url=api_url, data=json_str.encode('utf-8'), headers=headers, timeout=timeout)
+                response = http_post(url=api_url, data=json_str.encode('utf-8'), headers=headers, timeout=timeout)
             except Exception as e:
                 logging.error(f"JSON序列化失败: {e}")
                 # 如果序列化失败，使用严格清理
                 try:
                     strict_cleaned = strict_clean_dict(cleaned_params)
                     json_str = json.dumps(strict_cleaned, ensure_ascii=True, separators=(',', ':'))
-                    response = requests.post(url=api_url, data=json_str.encode('utf-8'), headers=headers, timeout=timeout)
+                    response = http_post(url=api_url, data=json_str.encode('utf-8'), headers=headers, timeout=timeout)
                 except Exception as e2:
                     logging.error(f"严格清理后仍然失败: {e2}")
                     return None
+        elif isinstance(request_params, (bytes, bytearray)):
+            # 已序列化的请求体（编译模板路径，见dumps_request_body），直接发送
+            response = http_post(url=api_url, data=request_params, headers=headers, timeout=timeout)
         else:
             # 其他类型直接发送
             logging.debug(f"其他类型参数: {type(request_params)}")
-            response = requests.post(url=api_url, data=request_params, headers=headers, timeout=timeout)
+            response = http_post(url=api_url, data=request_params, headers=headers, timeout=timeout)
+        
+        if stream and response.status_code == 200:
+            # 流式读取响应体：分块到达即解析，记录各事件的到达时间
+            recorder = SSEStreamRecorder(start_time)
+            recorder.mark_headers()
+            for chunk in response.iter_content(chunk_size=None):
+                recorder.feed(chunk)
+            recorder.close()
+            response._content = recorder.body
+            response.stream_metrics = recorder.metrics()
+        elif phase_timer is not None:
+            # 读取完整响应体
+            response.content
+        if headers_received_at is not None:
+            phase_timer.add('download', time.perf_counter() - headers_received_at)
         
         # 记录请求结束时间并计算响应时间（秒）
         end_time = time.time()
@@ -223,60 +297,16 @@ def sync_http_request(api_url=None, request_params=None, headers=None, timeout=3
 def parse_http_stream_false_response(http_response):
     """
     解析 http stream false response
-    这个方法的实现具有较强的复杂性
-    将http解析成特定的格式
+    返回所有 finish=False 事件拼接成的answer（见SSEStreamParser）
+    需要同时获取召回列表时使用 parse_http_stream_response，只解析一遍
     """
-    response_text = http_response.text
-    # 用data: 来分割
-    try:
-        stream_data = response_text.split('data:')
-        print(stream_data)
-    except Exception as e:
-        raise Exception(f"分割数据时错误：{e}: Response: {response_text}")
-    # 构建answer
-    answer = ''
-    for row in stream_data:
-        try:
-            # 列表中可能有空值
-            row_dict = json.loads(row)
-            # 拼接 answer
-            if ('finish' in row_dict and not row_dict['finish']):
-                answer += str(row_dict['content'][0].get("content"))
-            elif ('finish' in row_dict['data'] and not row_dict['data']['finish']):
-                answer += str(row_dict['content'][0].get("content"))
-        except Exception as e:
-            print(f"parse_http_stream_false_response 错误：{e}: Row: {row}")
-
-    # 返回answer
-    return answer
+    return SSEStreamParser.from_response(http_response).answer
 
 
 def parse_http_stream_true_response(http_response):
     """
     解析 http stream true response
-    这个方法的实现具有较强的复杂性
-    将http解析成特定的格式
+    返回最后一个 finish=True 事件中的召回列表（见SSEStreamParser）
+    需要同时获取answer时使用 parse_http_stream_response，只解析一遍
     """
-    response_text = http_response.text
-    # 用data: 来分割
-    try:
-        stream_data = response_text.split('data:')
-    except Exception as e:
-        raise Exception(f"分割数据时错误：{e}: Response: {response_text}")
-    # 构建answer
-    recall_list = []
-    for row in stream_data:
-        # 先加载成json对象
-        try:
-            # 列表中可能有空值
-            row_dict = json.loads(row)
-            # 拼接 answer
-            if ('finish' in row_dict and row_dict['finish']):
-                recall_list = row_dict["content"][1].get("content")
-            elif ('finish' in row_dict['data'] and row_dict['data']['finish']):
-                recall_list = row_dict['data']['content'][1].get("content")
-        except Exception as e:
-            print(f"parse_http_stream_true_response 错误：{e}: Row: {row}")
-        
-    # 返回召回 列表
-    return recall_list
\ No newline at end of file
+    return SSEStreamParser.from_response(http_response).recall_list
@@ -1,5 +1,8 @@
 import json
 import re
+import threading
+from functools import lru_cache
+from .http_request import dumps_request_body, RequestBuildError
 
 def parse_http_nostream_response(http_response):
     """
@@ -8,81 +11,222 @@ def parse_http_nostream_response(http_response):
     """
     pass
 
+# 占位符格式：${变量名}
+_PLACEHOLDER_RE = re.compile(r'\${([^}]+)}')
+_FULL_PLACEHOLDER_RE = re.compile(r'^\${([^}]+)}$')
+
+# json.loads 可能成功解析的字符串首字符（对象、数组、字符串、数字、true/false/null、NaN/Infinity）
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI')
+# 以这些字符开头的字符串一定不是JSON，整值占位符渲染时可直接跳过解析（空串除外）
+_PLAIN_TEXT_START_CHARS = frozenset(chr(code) for code in range(0x21, 0x7F)) - _JSON_START_CHARS
+
+
+def _loads_placeholder_value(col_value):
+    """整值占位符的取值规则：list/dict原样返回，JSON字符串解析为对象，其余原样返回"""
+    if isinstance(col_value, str):
+        head = col_value.lstrip()[:1]
+        if head and head in _JSON_START_CHARS:
+            try:
+                return json.loads(col_value)
+            except (json.JSONDecodeError, TypeError):
+                return col_value
+    return col_value
+
+
+class RequestTemplate:
+    """
+    预编译的请求参数模板
+
+    编译时一次性解析params结构并定位占位符：
+    - 整值占位符（如 "${message}"）渲染时保持数据类型
+    - 内嵌占位符（如 "prefix_${message}"）预先拆分为字符串模板
+    - 不含占位符的子结构作为常量直接复用（只读，渲染结果不应被原地修改）
+    渲染每行数据时只填充占位符，不再重复解析JSON和匹配正则
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.placeholders = []
+        is_const, value = self._compile(params)
+        self._render = (lambda values: value) if is_const else value
+
+    def _add_placeholder(self, name):
+        if name not in self.placeholders:
+            self.placeholders.append(name)
+
+    def _compile(self, data):
+        """返回 (是否常量, 常量值或渲染函数)"""
+        if isinstance(data, dict):
+            items = [(key,) + self._compile(value) for key, value in data.items()]
+            if all(is_const for _, is_const, _ in items):
+                return True, data
+            items = tuple((key, None if is_const else value, value if is_const else None) for key, is_const, value in items)
+
+            def render_dict(values):
+                return {key: (const if render is None else render(values)) for key, render, const in items}
+            return False, render_dict
+
+        if isinstance(data, list):
+            items = [self._compile(item) for item in data]
+            if all(is_const for is_const, _ in items):
+                return True, data
+            items = tuple((None if is_const else value, value if is_const else None) for is_const, value in items)
+
+            def render_list(values):
+                return [(const if render is None else render(values)) for render, const in items]
+            return False, render_list
+
+        if isinstance(data, str):
+            full_match = _FULL_PLACEHOLDER_RE.match(data)
+            if full_match:
+                name = full_match.group(1)
+                self._add_placeholder(name)
+
+                def render_full(values):
+                    if name not in values:
+                        return data  # 占位符未找到映射，保持原样
+                    col_value = values[name]
+                    if isinstance(col_value, str) and col_value[:1] not in _PLAIN_TEXT_START_CHARS:
+                        return _loads_placeholder_value(col_value)
+                    return col_value
+                return False, render_full
+
+            matches = _PLACEHOLDER_RE.findall(data)
+            if matches:
+                for name in matches:
+                    self._add_placeholder(name)
+                names = tuple((name, f"${{{name}}}") for name in dict.fromkeys(matches))
+
+                def render_interpolated(values):
+                    result = data
+                    for name, token in names:
+                        if name in values:
+                            result = result.replace(token, str(values[name]))
+                    return result
+                return False, render_interpolated
+
+        return True, data
+
+    def render(self, values: dict):
+        """按 占位符->取值 的映射渲染参数对象"""
+        return self._render(values)
+
+    def render_row(self, row, placeholder_params_mapping_dic: dict):
+        """按 占位符->数据列名 的映射，从一行数据中取值并渲染"""
+        values = {
+            placeholder: row[col_name]
+            for placeholder, col_name in placeholder_params_mapping_dic.items()
+        }
+        return self._render(values)
+
+    def render_json(self, values: dict) -> str:
+        """渲染并序列化为JSON字符串（与structure_request_params的输出格式一致）"""
+        return json.dumps(self._render(values), ensure_ascii=False)
+
+
+def compile_request_params(params) -> RequestTemplate:
+    """编译请求参数模板，params为dict/list对象或JSON字符串"""
+    if isinstance(params, str):
+        params = json.loads(params)
+    return RequestTemplate(params)
+
+
+@lru_cache(maxsize=128)
+def _compile_params_string(params: str):
+    try:
+        return compile_request_params(params)
+    except json.JSONDecodeError:
+        return None
+
+
+# 按api_name缓存的编译模板：api_name -> (params序列化结果, 模板)
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def get_request_template(params, api_name: str = None) -> RequestTemplate:
+    """
+    获取编译后的请求模板，按api_name缓存
+    同一api_name的params发生变化时重新编译
+    """
+    params_key = params if isinstance(params, str) else json.dumps(params, sort_keys=True, ensure_ascii=False)
+    cache_key = api_name if api_name is not None else params_key
+    with _template_cache_lock:
+        cached = _template_cache.get(cache_key)
+        if cached is not None and cached[0] == params_key:
+            return cached[1]
+    template = compile_request_params(params)
+    with _template_cache_lock:
+        _template_cache[cache_key] = (params_key, template)
+    return template
+
+
 def structure_request_params(row, placeholder_params_mapping_dic: dict, params: str):
     """
     构建请求参数，支持嵌套字典和列表结构
     解析params中的占位符，保持数据类型（支持list、dict等）
+    params字符串首次使用时编译为RequestTemplate并缓存，之后每行只填充占位符
     """
-    
-    # 将params字符串解析为Python对象
-    try:
-        params_obj = json.loads(params)
-    except json.JSONDecodeError:
+    template = _compile_params_string(params)
+    if template is None:
         # 如果解析失败，回退到原来的字符串替换方式
         for placeholder, col_name in placeholder_params_mapping_dic.items():
             col_value = row[col_name]
             params = params.replace(f"${{{str(placeholder)}}}", str(col_value))
         return params
     
-    def replace_placeholders_recursive(data):
-        """递归替换占位符，保持数据类型"""
-        if isinstance(data, dict):
-            result = {}
-            for key, value in data.items():
-                result[key] = replace_placeholders_recursive(value)
-            return result
-        elif isinstance(data, list):
-            return [replace_placeholders_recursive(item) for item in data]
-        elif isinstance(data, str):
-            # 检查是否是占位符
-            placeholder_pattern = r'\${([^}]+)}'
-            matches = re.findall(placeholder_pattern, data)
-            
-            if matches:
-                # 如果字符串完全匹配占位符格式（如 "${message}"），则替换为实际值
-                if re.match(r'^\${([^}]+)}$', data):
-                    placeholder = matches[0]
-                    if placeholder in placeholder_params_mapping_dic:
-                        col_name = placeholder_params_mapping_dic[placeholder]
-                        col_value = row[col_name]
-                        
-                        # 如果col_value已经是list或dict类型，直接返回
-                        if isinstance(col_value, (list, dict)):
-                            return col_value
-                        
-                        # 如果col_value是字符串，尝试解析为JSON（可能是JSON字符串）
-                        if isinstance(col_value, str):
-                            try:
-                                parsed_value = json.loads(col_value)
-                                return parsed_value  # 返回解析后的对象（可能是list、dict等）
-                            except (json.JSONDecodeError, TypeError):
-                                # 如果不是JSON字符串，直接返回原值
-                                return col_value
-                        else:
-                            # 其他类型（int、float、bool等），直接返回
-                            return col_value
-                    else:
-                        return data  # 占位符未找到映射，保持原样
-                else:
-                    # 字符串中包含占位符但不是完全匹配（如 "prefix_${message}_suffix"）
-                    # 进行字符串替换
-                    result = data
-                    for placeholder in matches:
-                        if placeholder in placeholder_params_mapping_dic:
-                            col_name = placeholder_params_mapping_dic[placeholder]
-                            col_value = row[col_name]
-                            result = result.replace(f"${{{placeholder}}}", str(col_value))
-                    return result
+    # 替换占位符并重新序列化为JSON字符串
+    return json.dumps(template.render_row(row, placeholder_params_mapping_dic), ensure_ascii=False)
+
+def _iter_placeholder_values(df, placeholder_params_mapping_dic: dict):
+    """
+    按行产出 占位符->取值 的字典
+    每个映射列只提取一次（tolist转换为Python原生类型），不再逐行构造Series
+    """
+    placeholders = list(placeholder_params_mapping_dic.keys())
+    if not placeholders:
+        for _ in range(len(df)):
+            yield {}
+        return
+    columns = [df[col_name].tolist() for col_name in placeholder_params_mapping_dic.values()]
+    for row_values in zip(*columns):
+        yield dict(zip(placeholders, row_values))
+
+
+def iter_request_bodies(df, placeholder_params_mapping_dic: dict, params, api_name: str = None, as_bytes: bool = True):
+    """
+    整表构建请求体的生成器，按行顺序产出
+    as_bytes为True时经可信序列化（dumps_request_body）产出可直接发送的UTF-8 bytes，
+    否则产出JSON字符串（与structure_request_params一致）
+    某行构建失败时该位置产出RequestBuildError（不抛出），后续行继续构建
+    """
+    template = get_request_template(params, api_name=api_name)
+    render = template.render
+    for position, values in enumerate(_iter_placeholder_values(df, placeholder_params_mapping_dic)):
+        try:
+            if as_bytes:
+                body = dumps_request_body(render(values))
             else:
-                return data  # 没有占位符，直接返回
-        else:
-            return data  # 其他类型（int、float、bool等），直接返回
-    
-    # 递归替换占位符
-    params_obj = replace_placeholders_recursive(params_obj)
-    
-    # 重新序列化为JSON字符串
-    return json.dumps(params_obj, ensure_ascii=False)
+                body = json.dumps(render(values), ensure_ascii=False)
+        except Exception as e:
+            error = RequestBuildError(f"构建第{position}行请求参数时出错: {e}")
+            error.__cause__ = e
+            body = error
+        yield body
+
+
+def structure_request_params_batch(df, placeholder_params_mapping_dic: dict, params, api_name: str = None) -> list:
+    """
+    整表构建请求参数，返回与df行顺序一致的JSON字符串列表
+    结果等价于对每一行调用structure_request_params，某行构建失败时抛出RequestBuildError
+    """
+    bodies = []
+    for body in iter_request_bodies(df, placeholder_params_mapping_dic, params, api_name=api_name, as_bytes=False):
+        if isinstance(body, RequestBuildError):
+            raise body
+        bodies.append(body)
+    return bodies
+
 
 # 解析recall_result
 def parse_recall_result(recall_result):
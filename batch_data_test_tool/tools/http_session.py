@@ -0,0 +1,158 @@
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 连接池会话注册表：key 为 (scheme, host, 并发数)，value 为 requests.Session
+_sessions = {}
+# 会话的使用计数：key 同上，由 acquire_pooled_session / release_pooled_session 维护
+_session_refs = {}
+_sessions_lock = threading.Lock()
+
+
+# 当前线程中建立连接（TCP + TLS握手）的累计耗时，用于分阶段计时
+_connect_timing = threading.local()
+
+
+def reset_connect_time():
+    """清零当前线程的连接耗时计数，在发送请求前调用"""
+    _connect_timing.seconds = 0.0
+
+
+def pop_connect_time() -> float:
+    """取出并清零当前线程的连接耗时（秒），复用keep-alive连接时为0"""
+    seconds = getattr(_connect_timing, 'seconds', 0.0)
+    _connect_timing.seconds = 0.0
+    return seconds
+
+
+def _timed_connect(connect):
+    def timed(self):
+        start = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            _connect_timing.seconds = getattr(_connect_timing, 'seconds', 0.0) + time.perf_counter() - start
+    return timed
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """新建连接时记录连接耗时的适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+def _session_key(api_url: str, max_workers: int) -> tuple:
+    parts = urlsplit(api_url or '')
+    return (parts.scheme.lower(), parts.netloc.lower(), int(max_workers))
+
+
+def _get_or_create_session(key: tuple) -> requests.Session:
+    """在持有 _sessions_lock 时调用"""
+    session = _sessions.get(key)
+    if session is None:
+        pool_size = max(1, key[2])
+        session = requests.Session()
+        # 批量测试中每行数据相互独立，不在请求之间携带cookie
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = _TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions[key] = session
+    return session
+
+
+def get_pooled_session(api_url: str, max_workers: int = 4) -> requests.Session:
+    """
+    获取共享的keep-alive会话（线程安全）
+    同一host、同一并发数复用同一个Session，连接池大小与并发数一致，
+    避免每个请求都重新建立TCP/TLS连接
+    """
+    key = _session_key(api_url, max_workers)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        return _get_or_create_session(key)
+
+
+def acquire_pooled_session(api_url: str, max_workers: int = 4) -> requests.Session:
+    """
+    批量处理开始时调用：获取会话并登记一次使用
+    须与 release_pooled_session 成对调用，同一会话被多个批量同时使用时，最后一个结束的批量才关闭它
+    """
+    key = _session_key(api_url, max_workers)
+    with _sessions_lock:
+        session = _get_or_create_session(key)
+        _session_refs[key] = _session_refs.get(key, 0) + 1
+    return session
+
+
+def release_pooled_session(api_url: str, max_workers: int = 4) -> bool:
+    """
+    批量处理结束时调用：释放一次使用，没有其他批量在使用时关闭该会话
+    返回是否关闭了会话
+    """
+    key = _session_key(api_url, max_workers)
+    with _sessions_lock:
+        count = _session_refs.get(key, 0)
+        if count > 1:
+            _session_refs[key] = count - 1
+            return False
+        if count == 0:
+            # 未登记使用（或已被close_pooled_sessions关闭）
+            return False
+        del _session_refs[key]
+        session = _sessions.pop(key, None)
+    if session is None:
+        return False
+    session.close()
+    return True
+
+
+def close_pooled_sessions(api_url: str = None) -> int:
+    """
+    强制关闭连接池会话（不论是否仍有批量在使用）
+    指定api_url时只关闭该host下的会话，否则关闭全部；批量处理结束时应使用 release_pooled_session
+    返回关闭的会话数量
+    """
+    with _sessions_lock:
+        if api_url is None:
+            keys = list(_sessions.keys())
+        else:
+            scheme, netloc, _ = _session_key(api_url, 0)
+            keys = [key for key in _sessions if key[0] == scheme and key[1] == netloc]
+        sessions = [_sessions.pop(key) for key in keys]
+        for key in keys:
+            _session_refs.pop(key, None)
+
+    for session in sessions:
+        session.close()
+    return len(sessions)
@@ -0,0 +1,198 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+# 单行请求的分阶段耗时列（单位：秒）
+#   phase_queue_wait: 参数构建完成到开始执行的等待时间（线程池排队 / asyncio连接池排队）
+#   phase_build:      请求体构建时间（模板渲染 + 清理/序列化）
+#   phase_connect:    建立TCP/TLS连接的时间，复用keep-alive连接时为0
+#   phase_ttfb:       连接就绪后发送请求到收到响应头的时间（服务端处理时间）
+#   phase_download:   收到响应头到响应体读取完成的时间
+#   phase_parse:      请求时解析字段的时间（未开启请求时解析时为空）
+PHASE_COLUMNS = (
+    'phase_queue_wait',
+    'phase_build',
+    'phase_connect',
+    'phase_ttfb',
+    'phase_download',
+    'phase_parse',
+)
+
+
+class RequestPhaseTimer:
+    """
+    单行请求的分阶段计时器
+
+    在提交任务前创建（记录入队时间），随请求参数传入工作线程，
+    各阶段耗时累加到 timings 中，最后由工作线程写入该行的ResultStore列
+    """
+
+    __slots__ = ('timings', '_enqueued_at')
+
+    def __init__(self, build_time: float = 0.0):
+        self.timings = {'phase_build': build_time}
+        self._enqueued_at = time.perf_counter()
+
+    def start(self):
+        """任务开始执行时调用，记录排队等待时间"""
+        self.timings['phase_queue_wait'] = time.perf_counter() - self._enqueued_at
+
+    def add(self, phase: str, seconds: float):
+        """累加某个阶段的耗时，phase 可省略 "phase_" 前缀"""
+        if not phase.startswith('phase_'):
+            phase = f'phase_{phase}'
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def store(self, result_store, position: int):
+        """写入结果缓冲区（列需已通过 add_phase_columns 创建）"""
+        for phase, seconds in self.timings.items():
+            result_store.set_value(phase, position, round(seconds, 4))
+
+
+def add_phase_columns(result_store):
+    """为结果缓冲区添加分阶段耗时列"""
+    for phase in PHASE_COLUMNS:
+        result_store.add_float_column(phase)
+
+
+def summarize_phase_timings(result_store) -> str:
+    """
+    批量分阶段耗时汇总
+    每个阶段输出样本数、平均值、P50、P90、最大值（毫秒）和在总耗时中的占比
+    result_store 也可以是 {阶段列名: [耗时数组, ...]} 的字典（分块执行时逐块收集）
+    """
+    float_columns = result_store if isinstance(result_store, dict) else result_store.float_columns
+    totals = {}
+    lines = []
+    for phase in PHASE_COLUMNS:
+        values = float_columns.get(phase)
+        if values is None:
+            continue
+        if isinstance(values, list):
+            values = np.concatenate(values) if values else np.empty(0)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        totals[phase] = (values, float(values.sum()))
+
+    grand_total = sum(total for _, total in totals.values())
+    if not totals:
+        return "暂无分阶段耗时数据"
+
+    lines.append(f"{'阶段':<18}{'样本数':>8}{'平均(ms)':>12}{'P50(ms)':>12}{'P90(ms)':>12}{'最大(ms)':>12}{'占比':>8}")
+    for phase, (values, total) in totals.items():
+        p50, p90 = np.percentile(values, [50, 90])
+        share = total / grand_total if grand_total > 0 else 0.0
+        lines.append(
+            f"{phase:<18}{len(values):>8}{values.mean() * 1000:>12.1f}{p50 * 1000:>12.1f}"
+            f"{p90 * 1000:>12.1f}{values.max() * 1000:>12.1f}{share:>8.1%}"
+        )
+    return '\n'.join(lines)
+
+
+class LatencyHistogram:
+    """
+    对数分桶的流式延迟直方图（HDR风格）
+
+    桶边界按 (1 + precision) 等比增长，分位数的相对误差不超过 precision；
+    内存只与取值范围和精度有关（默认约1800个桶），与样本数无关，记录一个样本为O(1)
+    """
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 3600.0, precision: float = 0.01):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._growth = 1.0 + precision
+        self._log_growth = math.log(self._growth)
+        self._counts = [0] * (int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def record(self, value):
+        """记录一个样本（秒），None/NaN忽略"""
+        if value is None or value != value:
+            return
+        if value <= self.min_value:
+            bucket = 0
+        else:
+            bucket = min(int(math.log(value / self.min_value) / self._log_growth), len(self._counts) - 1)
+        self._counts[bucket] += 1
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentiles(self, percents=(50, 90, 99)) -> dict:
+        """
+        一次扫描计算多个分位数，返回 {百分位: 秒}；取桶上界，且不超过实际最大值
+        超出max_value的样本计入最后一个桶，该桶的上界按实际最大值计
+        """
+        if self.count == 0:
+            return {percent: None for percent in percents}
+        targets = sorted((max(1, math.ceil(percent / 100 * self.count)), percent) for percent in percents)
+        results = {}
+        cumulative = 0
+        target_index = 0
+        last_bucket = len(self._counts) - 1
+        for bucket, bucket_count in enumerate(self._counts):
+            if not bucket_count:
+                continue
+            cumulative += bucket_count
+            while target_index < len(targets) and cumulative >= targets[target_index][0]:
+                if bucket == last_bucket:
+                    upper_bound = self.max
+                else:
+                    upper_bound = min(self.min_value * self._growth ** (bucket + 1), self.max)
+                results[targets[target_index][1]] = upper_bound
+                target_index += 1
+            if target_index == len(targets):
+                break
+        return results
+
+    def percentile(self, percent: float):
+        return self.percentiles((percent,))[percent]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class LiveBatchStats:
+    """
+    批量请求的实时统计：延迟分位数、吞吐量和错误率
+    由唯一的结果消费者在每个请求完成时调用 record，snapshot 可在其他线程（如界面定时刷新）中读取
+    """
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.histogram = LatencyHistogram()
+        self.completed = 0
+        self.errors = 0
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, response_time=None, success: bool = True):
+        with self._lock:
+            self.completed += 1
+            if success:
+                self.histogram.record(response_time)
+            else:
+                self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.start_time
+            percentiles = self.histogram.percentiles((50, 90, 99))
+            return {
+                'completed': self.completed,
+                'total': self.total,
+                'p50': percentiles[50],
+                'p90': percentiles[90],
+                'p99': percentiles[99],
+                'max': self.histogram.max,
+                'throughput': self.completed / elapsed if elapsed > 0 else 0.0,
+                'error_rate': self.errors / self.completed if self.completed else 0.0,
+                'elapsed': elapsed,
+            }
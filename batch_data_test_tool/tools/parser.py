@@ -14,15 +14,203 @@ except Exception:  # jmespath 未安装时回退到内置解析
 # 负索引检测，用于决定是否交给 jmespath 处理
 _NEGATIVE_INDEX_RE = re.compile(r"\[-\d+\]")
 
+# 旧版路径分割规则：字段名、数组索引[0]、范围[0:3]、负数索引[-1]
+_PATH_PART_RE = re.compile(r'([^\.\[\]]+|\[\d+\]|\[-\d+\]|\[\d+:\d+\])')
+
+# 深度通配符搜索的默认最大深度
+_DEEP_SEARCH_MAX_DEPTH = 100
+
+# 编译后的路径步骤类型
+STEP_KEY = 'key'              # 对象字段: ('key', name)
+STEP_INDEX = 'index'          # 数组索引: ('index', i)
+STEP_NEGATIVE_INDEX = 'neg'   # 负数索引: ('neg', i)
+STEP_SLICE = 'slice'          # 范围选择: ('slice', start, end)
+STEP_WILDCARD = 'wildcard'    # 通配符: ('wildcard',)
+STEP_DEEP = 'deep'            # 深度通配符: ('deep', field_name)
+
 
 def _contains_negative_index(path: str) -> bool:
     return bool(_NEGATIVE_INDEX_RE.search(path))
 
 
-@lru_cache(maxsize=256)
-def _compile_jmespath(expression: str):
-    # 仅在 jmespath 可用时调用
-    return jmespath.compile(expression)  # type: ignore
+def _compile_steps(path: str) -> tuple:
+    """将不含通配符的路径片段编译为步骤元组"""
+    steps = []
+    for part in _PATH_PART_RE.findall(path):
+        if part.startswith('[') and part.endswith(']'):
+            index_expr = part[1:-1]
+            if ':' in index_expr:
+                start, end = map(int, index_expr.split(':'))
+                steps.append((STEP_SLICE, start, end))
+            elif index_expr.startswith('-'):
+                steps.append((STEP_NEGATIVE_INDEX, int(index_expr)))
+            else:
+                steps.append((STEP_INDEX, int(index_expr)))
+        else:
+            steps.append((STEP_KEY, part))
+    return tuple(steps)
+
+
+def _apply_steps(data: Any, steps: tuple) -> Any:
+    """按步骤逐级取值，任一步不匹配时返回None"""
+    for step in steps:
+        kind = step[0]
+        if kind is STEP_KEY:
+            if isinstance(data, dict) and step[1] in data:
+                data = data[step[1]]
+            else:
+                return None
+        elif kind is STEP_INDEX:
+            index = step[1]
+            if isinstance(data, list) and 0 <= index < len(data):
+                data = data[index]
+            else:
+                return None
+        elif kind is STEP_NEGATIVE_INDEX:
+            index = step[1]
+            if isinstance(data, list) and -index <= len(data):
+                data = data[index]
+            else:
+                return None
+        else:
+            if not isinstance(data, list):
+                return None
+            data = data[step[1]:step[2]]
+    return data
+
+
+def _lookup(data: Any, steps: tuple) -> Any:
+    """通配符展开后的子路径取值：字符串元素会先尝试按JSON解析"""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except Exception:
+            return None
+    return _apply_steps(data, steps)
+
+
+class CompiledJsonPath:
+    """
+    编译后的字段路径
+
+    路径只解析一次，得到：
+        - jmespath 表达式（jmespath 可用、路径不含负索引且能被其编译时）
+        - 步骤列表 steps（key/index/neg/slice/wildcard/deep），作为 jmespath 无结果时的回退
+    同一路径可反复用于不同文档，求值时不再扫描路径字符串
+    """
+
+    __slots__ = ('path', 'steps', 'jmespath_expression', '_segments', '_deep_field')
+
+    def __init__(self, field_path: str):
+        self.path = field_path
+        self.jmespath_expression = None
+        self._deep_field = None
+        self._segments = None
+
+        # 深度通配符：与旧逻辑一致，去掉 "**." 后按字段名深度搜索
+        if '**' in field_path:
+            self._deep_field = field_path.replace('**.', '')
+            self.steps = ((STEP_DEEP, self._deep_field),)
+            return
+
+        # 注意：jmespath 不支持负索引，且不支持 "**" 深度通配，因此这些场景只走步骤求值
+        if _JMESPATH_AVAILABLE and not _contains_negative_index(field_path):
+            try:
+                self.jmespath_expression = jmespath.compile(field_path)  # type: ignore
+            except Exception:
+                # 表达式不被 jmespath 支持时只走步骤求值
+                self.jmespath_expression = None
+
+        if '*' not in field_path:
+            self.steps = _compile_steps(field_path)
+            return
+
+        # 通配符路径按 "*" 切分为若干段，每段之间展开一次当前节点的全部子节点
+        # 段为None表示该段路径为空：中间段不取值，末尾段直接收集当前节点
+        segments = []
+        steps = []
+        pattern = field_path
+        while True:
+            next_star = pattern.find('*')
+            if next_star == -1:
+                break
+            before_star = pattern[:next_star].rstrip('.')
+            segment = _compile_steps(before_star) if before_star else None
+            segments.append(segment)
+            steps.extend(segment or ())
+            steps.append((STEP_WILDCARD,))
+            pattern = pattern[next_star + 1:].lstrip('.')
+        segment = _compile_steps(pattern) if pattern else None
+        segments.append(segment)
+        steps.extend(segment or ())
+        self._segments = tuple(segments)
+        self.steps = tuple(steps)
+
+    def __repr__(self):
+        return f"CompiledJsonPath({self.path!r}, steps={self.steps!r})"
+
+    def search(self, json_data: Any) -> Any:
+        """
+        在已解析的数据上求值，语义与 get_json_field_value 一致
+        """
+        if self._deep_field is not None:
+            return _deep_search(json_data, self._deep_field)
+
+        if self.jmespath_expression is not None:
+            try:
+                result = self.jmespath_expression.search(json_data)
+                if result is not None:
+                    return result
+            except Exception:
+                # 运行时异常时回退到步骤求值
+                pass
+
+        if self._segments is None:
+            return _apply_steps(json_data, self.steps)
+        return self._search_wildcard(json_data)
+
+    def _search_wildcard(self, data: Any) -> List[Any]:
+        """处理通配符搜索，显式栈先序展开，结果顺序与逐层递归一致"""
+        results = []
+        segments = self._segments
+        last = len(segments) - 1
+        stack = [(data, 0)]
+        while stack:
+            current_data, i = stack.pop()
+            segment = segments[i]
+            if i == last:
+                if segment is None:
+                    results.append(current_data)
+                else:
+                    value = _lookup(current_data, segment)
+                    if value is not None:
+                        results.append(value)
+                continue
+
+            if segment is not None:
+                current_data = _lookup(current_data, segment)
+                if current_data is None:
+                    continue
+
+            if isinstance(current_data, dict):
+                children = list(current_data.values())
+            elif isinstance(current_data, list):
+                children = current_data
+            else:
+                continue
+            for child in reversed(children):
+                stack.append((child, i + 1))
+        return results
+
+
+@lru_cache(maxsize=1024)
+def compile_json_path(field_path: str) -> CompiledJsonPath:
+    """
+    编译字段路径（带缓存），返回可对多个文档重复求值的 CompiledJsonPath
+    """
+    return CompiledJsonPath(field_path)
 
 
 def get_json_field_value(json_data: Any, field_path: str) -> Any:
@@ -53,78 +241,8 @@ def get_json_field_value(json_data: Any, field_path: str) -> Any:
         if isinstance(json_data, str):
             json_data = json.loads(json_data)
         
-        # 处理深度通配符
-        if '**' in field_path:
-            return _deep_search(json_data, field_path.replace('**.', ''))
-        
-        # 优先使用 jmespath（若可用），对常见路径/通配/切片具备更强表达力
-        # 注意：jmespath 不支持负索引，且不支持 "**" 深度通配，因此这些场景回退到旧逻辑
-        if _JMESPATH_AVAILABLE and not _contains_negative_index(field_path):
-            try:
-                result = _compile_jmespath(field_path).search(json_data)  # type: ignore
-                if result is not None:
-                    return result
-            except Exception:
-                # 表达式不被 jmespath 支持或运行时异常时，回退到旧逻辑
-                pass
-
-        # 处理通配符路径
-        if '*' in field_path:
-            return _wildcard_search(json_data, field_path)
-        
-        current_data = json_data
-        
-        # 使用正则表达式分割路径，正确处理各种复杂情况
-        # 匹配模式：字段名、数组索引[0]、范围[0:3]、负数索引[-1]
-        pattern = r'([^\.\[\]]+|\[\d+\]|\[-\d+\]|\[\d+:\d+\])'
-        parts = re.findall(pattern, field_path)
-        
-        for part in parts:
-            if part.startswith('[') and part.endswith(']'):
-                # 处理数组相关操作
-                index_expr = part[1:-1]
-                
-                # 处理范围选择 [0:3]
-                if ':' in index_expr:
-                    if not isinstance(current_data, list):
-                        return None
-                    try:
-                        start, end = map(int, index_expr.split(':'))
-                        current_data = current_data[start:end]
-                    except (ValueError, IndexError):
-                        return None
-                
-                # 处理负数索引 [-1]
-                elif index_expr.startswith('-'):
-                    if not isinstance(current_data, list):
-                        return None
-                    try:
-                        index = int(index_expr)
-                        if abs(index) <= len(current_data):
-                            current_data = current_data[index]
-                        else:
-                            return None
-                    except (ValueError, IndexError):
-                        return None
-                
-                # 处理普通索引 [0]
-                else:
-                    try:
-                        index = int(index_expr)
-                        if isinstance(current_data, list) and 0 <= index < len(current_data):
-                            current_data = current_data[index]
-                        else:
-                            return None
-                    except (ValueError, IndexError):
-                        return None
-            else:
-                # 处理对象字段
-                if isinstance(current_data, dict) and part in current_data:
-                    current_data = current_data[part]
-                else:
-                    return None
-        
-        return current_data
+        # 路径编译结果带缓存，同一路径只解析一次
+        return compile_json_path(field_path).search(json_data)
         
     except (json.JSONDecodeError, Exception):
         return None
@@ -188,63 +306,72 @@ def get_all_json_keys(json_data: Any, parent_path: str = "", max_depth: int = 10
     return keys
 
 
-def _wildcard_search(data: Any, pattern: str) -> List[Any]:
-    """处理通配符搜索"""
-    results = []
-    
-    def _search_recursive(current_data: Any, current_pattern: str, current_path: str = ""):
-        if not current_pattern:
-            results.append(current_data)
-            return
-        
-        # 获取下一个路径段
-        next_star = current_pattern.find('*')
-        if next_star == -1:
-            # 没有通配符，直接查找
-            value = get_json_field_value(current_data, current_pattern)
-            if value is not None:
-                results.append(value)
-            return
-        
-        # 获取通配符前的部分
-        before_star = current_pattern[:next_star].rstrip('.')
-        
-        if before_star:
-            current_data = get_json_field_value(current_data, before_star)
-            if current_data is None:
-                return
-        
-        # 处理通配符匹配
-        remaining_pattern = current_pattern[next_star + 1:].lstrip('.')
-        
-        if isinstance(current_data, dict):
-            for key, value in current_data.items():
-                _search_recursive(value, remaining_pattern, f"{current_path}.{key}")
-        elif isinstance(current_data, list):
-            for i, item in enumerate(current_data):
-                _search_recursive(item, remaining_pattern, f"{current_path}[{i}]")
-    
-    _search_recursive(data, pattern)
-    return results
+def _build_deep_search_path(node) -> str:
+    """由 (父节点, 路径段) 链表还原路径字符串，仅对命中结果调用"""
+    steps = []
+    while node is not None:
+        node, step = node
+        steps.append(step)
+    path = ''
+    for step in reversed(steps):
+        if isinstance(step, int):
+            path += f"[{step}]"
+        else:
+            safe_key = str(step).replace('.', '\\.')
+            path = f"{path}.{safe_key}" if path else safe_key
+    return path
+
+
+def _deep_search(
+    data: Any,
+    field_name: str,
+    max_results: Optional[int] = None,
+    max_depth: int = _DEEP_SEARCH_MAX_DEPTH,
+    with_paths: bool = False
+) -> List[Any]:
+    """
+    深度搜索指定字段名
 
+    使用显式栈迭代遍历（先序，结果顺序与递归版本一致），每个节点只访问一次，
+    不会对子树做字符串化；路径只在 with_paths=True 时为命中项构建
 
-def _deep_search(data: Any, field_name: str) -> List[Any]:
-    """深度搜索指定字段名"""
+    Args:
+        max_results: 最多返回的结果数，None 表示不限制
+        max_depth: 最大搜索深度，超过该深度的节点不再展开
+        with_paths: 为True时返回 [(路径, 值), ...]
+    """
     results = []
-    
-    def _search_recursive(current_data: Any, path: str = ""):
+    if max_results is not None and max_results <= 0:
+        return results
+
+    # 栈元素：(节点, 深度, 路径节点)；路径节点为 (父路径节点, 键或索引)，不需要路径时始终为None
+    stack = [(data, 0, None)]
+    while stack:
+        current_data, depth, path_node = stack.pop()
+
         if isinstance(current_data, dict):
             # 检查当前层级是否有目标字段
             if field_name in current_data:
-                results.append(current_data[field_name])
-            
-            # 继续递归搜索
-            for value in current_data.values():
-                _search_recursive(value, f"{path}.{value}")
-                
+                if with_paths:
+                    results.append((_build_deep_search_path((path_node, field_name)), current_data[field_name]))
+                else:
+                    results.append(current_data[field_name])
+                if max_results is not None and len(results) >= max_results:
+                    break
+            if depth >= max_depth:
+                continue
+            # 逆序入栈，保证出栈顺序与原先的遍历顺序一致
+            children = list(current_data.items())
+            for key, value in reversed(children):
+                if isinstance(value, (dict, list)):
+                    stack.append((value, depth + 1, (path_node, key) if with_paths else None))
+
         elif isinstance(current_data, list):
-            for item in current_data:
-                _search_recursive(item, f"{path}[{item}]")
-    
-    _search_recursive(data)
-    return results
\ No newline at end of file
+            if depth >= max_depth:
+                continue
+            for i in range(len(current_data) - 1, -1, -1):
+                item = current_data[i]
+                if isinstance(item, (dict, list)):
+                    stack.append((item, depth + 1, (path_node, i) if with_paths else None))
+
+    return results
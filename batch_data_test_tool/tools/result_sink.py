@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .result_store import STATUS_PENDING
+
+# 可选引入 pyarrow，Parquet结果文件依赖它
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pa_parquet  # type: ignore
+    _PYARROW_AVAILABLE = True
+except Exception:  # pyarrow 未安装时只能写出CSV/JSONL
+    pa = pa_parquet = None  # type: ignore
+    _PYARROW_AVAILABLE = False
+
+# 支持的结果文件格式（扩展名 -> 格式）
+RESULT_SINK_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.parquet': 'parquet',
+}
+
+# fsync策略
+FSYNC_NEVER = 'never'    # 只写入操作系统缓冲区，进程崩溃不丢数据，断电可能丢失
+FSYNC_WRITE = 'write'    # 每次写入后fsync，最安全，写入开销最大
+FSYNC_CLOSE = 'close'    # 关闭文件时fsync一次
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_WRITE, FSYNC_CLOSE)
+
+# Parquet列的取值类型：第一批写入前确定，之后每批都转换为相同类型，保证各row group的schema一致
+COLUMN_KIND_STRING = 'string'   # 字符串；非字符串的值（list/dict/数字等）写为JSON文本
+COLUMN_KIND_FLOAT = 'float'
+COLUMN_KIND_INT = 'int'
+COLUMN_KIND_BOOL = 'bool'
+
+
+def infer_column_kind(column: pd.Series) -> str:
+    """按列的dtype（object列按非空值的类型）推断Parquet列的取值类型，无法确定时为字符串"""
+    kind = column.dtype.kind
+    if kind == 'b':
+        return COLUMN_KIND_BOOL
+    if kind in 'iu':
+        return COLUMN_KIND_INT
+    if kind == 'f':
+        return COLUMN_KIND_FLOAT
+    if kind != 'O':
+        return COLUMN_KIND_STRING
+    values = [value for value in column if value is not None]
+    if not values:
+        return COLUMN_KIND_STRING
+    if all(isinstance(value, (bool, np.bool_)) for value in values):
+        return COLUMN_KIND_BOOL
+    if any(isinstance(value, (bool, np.bool_)) for value in values):
+        return COLUMN_KIND_STRING
+    if all(isinstance(value, (int, np.integer)) for value in values):
+        return COLUMN_KIND_INT
+    if all(isinstance(value, (int, float, np.integer, np.floating)) for value in values):
+        return COLUMN_KIND_FLOAT
+    return COLUMN_KIND_STRING
+
+
+def _to_json_text(value):
+    """字符串列的取值：None和字符串原样保留，其他值写为JSON文本"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    elif not isinstance(value, (list, tuple, dict)):
+        if pd.isna(value):
+            return None
+        if isinstance(value, np.generic):
+            value = value.item()
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class ResultSink:
+    """
+    追加写入的结果文件
+
+    write(df) 把一批行追加到文件末尾并立即写入操作系统，按 fsync_policy 决定何时落盘：
+        - csv:     首次写入时写表头，之后只追加数据行
+        - jsonl:   每行一个JSON对象，嵌套的list/dict原样写出
+        - parquet: 每批写为一个row group；列类型（见 COLUMN_KIND_*）由 column_kinds 声明，
+                   未声明的列按第一批推断，之后每批转换为相同类型，object列中的list/dict等写为JSON文本；
+                   文件尾在close时写入，进程异常退出时Parquet文件不完整，需要崩溃保护时应使用CSV/JSONL
+    """
+
+    def __init__(self, filepath: str, file_format: str = None, fsync_policy: str = FSYNC_CLOSE, column_kinds: dict = None):
+        if file_format is None:
+            file_format = RESULT_SINK_FORMATS.get(os.path.splitext(filepath)[1].lower())
+        if file_format not in RESULT_SINK_FORMATS.values():
+            raise ValueError(f"不支持的结果文件格式: {file_format}（支持: {', '.join(RESULT_SINK_FORMATS.values())}）")
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"不支持的fsync策略: {fsync_policy}（支持: {', '.join(FSYNC_POLICIES)}）")
+        if file_format == 'parquet' and not _PYARROW_AVAILABLE:
+            raise ImportError("写出Parquet结果文件需要安装pyarrow: pip install pyarrow")
+
+        self.filepath = filepath
+        self.file_format = file_format
+        self.fsync_policy = fsync_policy
+        self.rows_written = 0
+        self.closed = False
+        self._columns = None
+        self._column_kinds = dict(column_kinds or {})
+        self._parquet_writer = None
+        if file_format == 'parquet':
+            self._file = open(filepath, 'wb')
+        else:
+            self._file = open(filepath, 'w', encoding='utf-8', newline='')
+
+    def declare_column_kinds(self, column_kinds: dict):
+        """声明列的取值类型（Parquet），只对尚未开始写入的文件生效"""
+        if self._parquet_writer is None:
+            self._column_kinds.update(column_kinds)
+
+    def write(self, df: pd.DataFrame):
+        """追加一批行（列以第一批为准，之后缺少的列为空、多出的列忽略）"""
+        if self.closed:
+            raise ValueError(f"结果文件已关闭: {self.filepath}")
+        if len(df) == 0:
+            return
+        if self._columns is None:
+            self._columns = list(df.columns)
+        elif list(df.columns) != self._columns:
+            df = df.reindex(columns=self._columns)
+
+        if self.file_format == 'csv':
+            df.to_csv(self._file, header=self.rows_written == 0, index=False)
+        elif self.file_format == 'jsonl':
+            text = df.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+            self._file.write(text if text.endswith('\n') else text + '\n')
+        else:
+            self._write_parquet(df)
+
+        self._file.flush()
+        if self.fsync_policy == FSYNC_WRITE:
+            os.fsync(self._file.fileno())
+        self.rows_written += len(df)
+
+    def _write_parquet(self, df):
+        if self._parquet_writer is None:
+            arrow_types = {
+                COLUMN_KIND_STRING: pa.string(),
+                COLUMN_KIND_FLOAT: pa.float64(),
+                COLUMN_KIND_INT: pa.int64(),
+                COLUMN_KIND_BOOL: pa.bool_(),
+            }
+            for column in self._columns:
+                if column not in self._column_kinds:
+                    self._column_kinds[column] = infer_column_kind(df[column])
+            schema = pa.schema([
+                pa.field(str(column), arrow_types[self._column_kinds[column]]) for column in self._columns
+            ])
+            self._parquet_writer = pa_parquet.ParquetWriter(self._file, schema)
+
+        schema = self._parquet_writer.schema
+        arrays = []
+        for column, field in zip(self._columns, schema):
+            values = df[column]
+            if self._column_kinds[column] == COLUMN_KIND_STRING:
+                values = [_to_json_text(value) for value in values]
+            elif values.dtype.kind == 'O':
+                values = list(values)
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        self._parquet_writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+            self._file.flush()
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class IncrementalResultWriter:
+    """
+    批量请求过程中把已完成的行增量写入ResultSink
+
+    按行顺序提交：只写出从上次写出位置开始、连续已完成（ResultStore.status非PENDING）的行，
+    输出文件的行顺序与输入一致；在途请求有上限，未写出的行数也因此有上限
+    可写出的行数达到 flush_rows，或距上次写出超过 flush_interval 秒时写出一批
+    poll() 应由唯一的结果消费者在每个请求完成后调用
+    写入结果文件出错时记录日志并停止自动保存（error 为出错的异常），不中断批量请求；
+    之后的 poll/flush/bind 不再写入，调用方需要自行保留未写出的结果
+    """
+
+    def __init__(self, sink: ResultSink, flush_rows: int = 1000, flush_interval: float = 5.0, clock=time.monotonic):
+        self.sink = sink
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._result_store = None
+        self._build_rows = None
+        self._written_position = 0   # 当前分块中已写出的行数
+        self._ready_position = 0     # 当前分块中连续已完成的行数
+        self._flushed_at = clock()
+        self.error = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def bind(self, result_store, build_rows):
+        """
+        开始写出新的一块结果：先写完上一块，再切换到新的结果缓冲区
+        build_rows(positions) 返回这些行位置对应的结果DataFrame（如输入列+结果列并清理空值）
+        """
+        with self._lock:
+            self._flush(include_pending=True)
+            if self.error is not None:
+                return
+            self._result_store = result_store
+            self.sink.declare_column_kinds(result_store.column_kinds())
+            self._build_rows = build_rows
+            self._written_position = 0
+            self._ready_position = 0
+
+    def poll(self):
+        """请求完成后调用，到达写出条件时写出连续已完成的行"""
+        with self._lock:
+            if self._result_store is None or self.error is not None:
+                return
+            status = self._result_store.status
+            size = len(status)
+            while self._ready_position < size and status[self._ready_position] != STATUS_PENDING:
+                self._ready_position += 1
+            ready_rows = self._ready_position - self._written_position
+            if ready_rows <= 0:
+                return
+            if ready_rows >= self.flush_rows or self._clock() - self._flushed_at >= self.flush_interval:
+                self._flush()
+
+    def flush(self, include_pending: bool = False):
+        """
+        立即写出连续已完成的行
+        include_pending为True时（分块结束或异常中止），之后已完成但不连续的行也一并写出
+        """
+        with self._lock:
+            self._flush(include_pending)
+
+    def _flush(self, include_pending: bool = False):
+        self._flushed_at = self._clock()
+        if self._result_store is None or self.error is not None:
+            return
+        status = self._result_store.status
+        while self._ready_position < len(status) and status[self._ready_position] != STATUS_PENDING:
+            self._ready_position += 1
+        if include_pending:
+            tail = np.flatnonzero(status[self._ready_position:] != STATUS_PENDING) + self._ready_position
+            positions = np.concatenate([np.arange(self._written_position, self._ready_position), tail])
+            self._ready_position = len(status)
+        else:
+            positions = np.arange(self._written_position, self._ready_position)
+        self._written_position = self._ready_position
+        if len(positions):
+            try:
+                self.sink.write(self._build_rows(positions))
+            except Exception as e:
+                self._fail(e)
+
+    def _fail(self, error: Exception):
+        """写入出错：停止自动保存并关闭文件（Parquet会写入文件尾，已写出的row group仍可读取）"""
+        self.error = error
+        self._result_store = None
+        logging.error(f"自动保存写入失败，已停止自动保存（已写入 {self.sink.rows_written} 行到 {self.sink.filepath}）: {error}")
+        try:
+            self.sink.close()
+        except Exception as e:
+            logging.error(f"关闭自动保存文件失败: {e}")
+
+    @property
+    def rows_written(self) -> int:
+        return self.sink.rows_written
+
+    def close(self):
+        """写出剩余的已完成行并关闭结果文件"""
+        with self._lock:
+            self._flush(include_pending=True)
+            self._result_store = None
+            if self.sink.closed:
+                return
+            try:
+                self.sink.close()
+            except Exception as e:
+                self.error = e
+                logging.error(f"关闭自动保存文件失败: {e}")
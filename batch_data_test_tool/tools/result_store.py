@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# 行状态码
+STATUS_PENDING = 0  # 尚未完成
+STATUS_SUCCEED = 1  # 请求成功
+STATUS_FAILED = 2   # 请求失败（非200或返回None）
+STATUS_ERROR = 3    # 执行或读取结果时异常
+
+
+class ResultStore:
+    """
+    预分配的列式结果缓冲区
+
+    按行位置（0..size-1）写入，每个位置只由一个消费者写入一次，写入为O(1)且无需加锁；
+    批量结束后通过 to_dataframe 一次性合并为输出DataFrame
+    """
+
+    def __init__(self, size: int, float_columns=(), object_columns=()):
+        self.size = size
+        self.response_text = np.full(size, None, dtype=object)
+        self.response_time = np.full(size, np.nan, dtype=np.float64)
+        self.status = np.zeros(size, dtype=np.int8)
+        self.float_columns = {}
+        self.object_columns = {}
+        for name in float_columns:
+            self.add_float_column(name)
+        for name in object_columns:
+            self.add_object_column(name)
+
+    def add_float_column(self, name: str):
+        """新增一个float64结果列（如耗时指标）"""
+        if name not in self.float_columns:
+            self.float_columns[name] = np.full(self.size, np.nan, dtype=np.float64)
+        return self.float_columns[name]
+
+    def add_object_column(self, name: str):
+        """新增一个object结果列（如解析出的字段）"""
+        if name not in self.object_columns:
+            self.object_columns[name] = np.full(self.size, None, dtype=object)
+        return self.object_columns[name]
+
+    def set_result(self, position: int, response_text=None, response_time=None, status: int = STATUS_SUCCEED):
+        """写入一行请求结果"""
+        self.response_text[position] = response_text
+        self.response_time[position] = np.nan if response_time is None else response_time
+        self.status[position] = status
+
+    def set_value(self, name: str, position: int, value):
+        """写入一行的附加列值"""
+        if name in self.float_columns:
+            self.float_columns[name][position] = np.nan if value is None else value
+        else:
+            self.object_columns[name][position] = value
+
+    def column_kinds(self) -> dict:
+        """结果列的取值类型（见 result_sink.COLUMN_KIND_*），用于固定结果文件的列类型"""
+        kinds = {'response_text': 'string', 'response_time': 'float'}
+        kinds.update({name: 'string' for name in self.object_columns})
+        kinds.update({name: 'float' for name in self.float_columns})
+        return kinds
+
+    @property
+    def completed_count(self) -> int:
+        return int(np.count_nonzero(self.status))
+
+    @property
+    def success_count(self) -> int:
+        return int(np.count_nonzero(self.status == STATUS_SUCCEED))
+
+    def to_dataframe(self, base_df: pd.DataFrame = None, positions=None) -> pd.DataFrame:
+        """
+        将结果缓冲区转换为DataFrame
+        传入base_df时，结果列追加在输入列之后（行顺序与base_df一致）
+        传入positions（行位置数组）时只转换这些行，用于增量写出已完成的行
+        """
+        columns = {
+            'response_text': self.response_text,
+            'response_time': self.response_time,
+        }
+        columns.update(self.object_columns)
+        columns.update(self.float_columns)
+        if positions is not None:
+            columns = {name: values[positions] for name, values in columns.items()}
+            if base_df is not None:
+                base_df = base_df.iloc[positions]
+
+        if base_df is None:
+            return pd.DataFrame(columns)
+
+        result_df = pd.DataFrame(columns, index=base_df.index)
+        base_columns = [col for col in base_df.columns if col not in result_df.columns]
+        return pd.concat([base_df[base_columns], result_df], axis=1)
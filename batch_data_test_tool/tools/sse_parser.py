@@ -0,0 +1,220 @@
+import json
+import logging
+import time
+
+
+class SSEStreamParser:
+    """
+    增量SSE流解析器
+
+    逐行读取 "data:" 事件，每个事件只做一次json.loads，同一遍中同时得到：
+        - answer: 所有 finish=False 事件的 content[0].content 依次拼接
+        - recall_list: 最后一个 finish=True 事件的 content[1].content
+    事件格式支持 {"finish": ..., "content": [...]} 和 {"data": {"finish": ..., "content": [...]}}
+    answer片段先收集到列表中，读取answer时才拼接
+    """
+
+    def __init__(self):
+        self._answer_parts = []
+        self._data_lines = []
+        self.recall_list = []
+        self.event_count = 0
+        self.error_count = 0
+
+    @property
+    def answer(self) -> str:
+        return ''.join(self._answer_parts)
+
+    def feed_line(self, line):
+        """
+        输入一行（不含换行符，str或bytes）
+        空行表示一个事件结束；同一事件的多行data按SSE规范以换行符连接
+        部分服务端的data行之间没有空行：新的data行到达时，若已缓存的内容已是完整JSON则先作为一个事件处理
+        """
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line:
+            self._dispatch()
+            return
+        if line.startswith('data:'):
+            data = line[5:]
+            if data.startswith(' '):
+                data = data[1:]
+            if self._data_lines:
+                self._dispatch_if_complete()
+            self._data_lines.append(data)
+        # event/id/retry 及注释行（以":"开头）与解析结果无关，忽略
+
+    def close(self):
+        """流结束：处理最后一个没有以空行结尾的事件"""
+        self._dispatch()
+        return self
+
+    def _dispatch(self):
+        if not self._data_lines:
+            return
+        data = '\n'.join(self._data_lines)
+        self._data_lines = []
+        self.feed_event(data)
+
+    def _dispatch_if_complete(self):
+        """缓存的data内容能解析为JSON时作为一个事件处理（解析结果直接复用，不再重复json.loads）"""
+        data = '\n'.join(self._data_lines)
+        try:
+            row_dict = json.loads(data)
+        except ValueError:
+            return
+        self._data_lines = []
+        self.event_count += 1
+        self._handle_event(row_dict, data)
+
+    def feed_event(self, data: str):
+        """处理一个完整事件的data内容"""
+        self.event_count += 1
+        try:
+            row_dict = json.loads(data)
+        except ValueError as e:
+            # 如 "[DONE]" 等非JSON事件
+            self.error_count += 1
+            logging.debug(f"SSE事件解析错误：{e}: Data: {data[:200]}")
+            return
+        self._handle_event(row_dict, data)
+
+    def _handle_event(self, row_dict, data: str):
+        try:
+            if 'finish' in row_dict:
+                finish = row_dict['finish']
+                content = row_dict['content']
+            elif 'finish' in row_dict['data']:
+                finish = row_dict['data']['finish']
+                content = row_dict['data']['content']
+            else:
+                return
+            if not finish:
+                # 拼接 answer
+                self._answer_parts.append(str(content[0].get("content")))
+            else:
+                # 召回列表
+                self.recall_list = content[1].get("content")
+        except Exception as e:
+            # 结构不符合预期的事件
+            self.error_count += 1
+            logging.debug(f"SSE事件解析错误：{e}: Data: {data[:200]}")
+
+    def feed_response(self, http_response):
+        """
+        从 requests.Response 增量读取所有行
+        按字节分行再解码，避免内容中的 U+2028 等字符被当作换行
+        """
+        for line in http_response.iter_lines():
+            self.feed_line(line)
+        return self.close()
+
+    @classmethod
+    def from_response(cls, http_response) -> 'SSEStreamParser':
+        return cls().feed_response(http_response)
+
+
+def parse_http_stream_response(http_response):
+    """
+    单次遍历解析SSE响应
+    返回 (answer, recall_list)
+    """
+    parser = SSEStreamParser.from_response(http_response)
+    return parser.answer, parser.recall_list
+
+
+# 流式请求记录的耗时指标（单位：秒，均从请求开始计时；event_count为事件数）
+STREAM_METRIC_COLUMNS = (
+    'ttfb',
+    'time_to_first_event',
+    'inter_event_gap_avg',
+    'inter_event_gap_max',
+    'total_duration',
+    'event_count',
+)
+
+
+class SSEStreamRecorder:
+    """
+    流式读取SSE响应体并记录时间点
+
+    按到达顺序输入响应体分块（feed），分块内按字节切分行后交给SSEStreamParser，
+    每个事件记录其最后一个data行的到达时间（data行之间没有空行、事件在下一行到达或结束时才完成，
+    也按数据本身的到达时间计）；结束后通过 metrics() 得到
+    首字节时间、首个事件时间、事件间隔（平均/最大）和总耗时
+    """
+
+    def __init__(self, start_time: float = None, clock=time.time):
+        self._clock = clock
+        self.start_time = clock() if start_time is None else start_time
+        self.parser = SSEStreamParser()
+        self._chunks = []
+        self._pending = b''
+        self.ttfb = None
+        self.total_duration = None
+        self.event_times = []
+        self._data_time = None  # 缓存中最后一个data行的到达时间
+
+    def mark_headers(self):
+        """响应头到达时调用，记录首字节时间"""
+        if self.ttfb is None:
+            self.ttfb = self._clock() - self.start_time
+
+    def feed(self, chunk: bytes):
+        """输入一个响应体分块"""
+        if not chunk:
+            return
+        now = self._clock()
+        if self.ttfb is None:
+            self.ttfb = now - self.start_time
+        self._chunks.append(chunk)
+
+        lines = (self._pending + chunk).splitlines(keepends=True)
+        # 最后一行没有以\n结尾时留到下一个分块拼接（\r\n可能被分块拆开）
+        if lines and not lines[-1].endswith(b'\n'):
+            self._pending = lines.pop()
+        else:
+            self._pending = b''
+        self._feed_lines(lines, now)
+
+    def close(self):
+        """响应体读取结束"""
+        now = self._clock()
+        if self._pending:
+            self._feed_lines([self._pending], now)
+            self._pending = b''
+        event_count = self.parser.event_count
+        self.parser.close()
+        self.event_times.extend([self._data_time] * (self.parser.event_count - event_count))
+        self.total_duration = now - self.start_time
+        return self
+
+    def _feed_lines(self, lines, now):
+        parser = self.parser
+        for line in lines:
+            event_count = parser.event_count
+            parser.feed_line(line.rstrip(b'\r\n'))
+            if parser.event_count != event_count:
+                # 本行结束（或因新data行到达而结束）的事件按其最后一个data行的到达时间记录
+                self.event_times.extend([self._data_time] * (parser.event_count - event_count))
+            if line.startswith(b'data:'):
+                self._data_time = now
+
+    @property
+    def body(self) -> bytes:
+        return b''.join(self._chunks)
+
+    def metrics(self) -> dict:
+        """返回 STREAM_METRIC_COLUMNS 中的各项指标，保留3位小数（与response_time一致）"""
+        gaps = [later - earlier for earlier, later in zip(self.event_times, self.event_times[1:])]
+        values = {
+            'ttfb': self.ttfb,
+            'time_to_first_event': self.event_times[0] - self.start_time if self.event_times else None,
+            'inter_event_gap_avg': sum(gaps) / len(gaps) if gaps else None,
+            'inter_event_gap_max': max(gaps) if gaps else None,
+            'total_duration': self.total_duration,
+        }
+        metrics = {name: None if value is None else round(value, 3) for name, value in values.items()}
+        metrics['event_count'] = len(self.event_times)
+        return metrics
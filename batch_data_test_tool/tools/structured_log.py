@@ -4,10 +4,11 @@ def structured_logging_metadata(
     all_columns: list,
     input_columns: list,
     input_shape: tuple,
-    input_number: int
+    input_number: int,
+    input_encoding: str = None
 ):
     """
-    MetaData 数据输入文件名称、数据列、数据形状、数据数量等
+    MetaData 数据输入文件名称、数据列、数据形状、数据数量、文件编码等
     """
     return json.dumps({
         "metadata": {
@@ -15,7 +16,8 @@ def structured_logging_metadata(
             "文件所含列": all_columns,
             "输入数据列": input_columns,
             "输入数据形状": input_shape,
-            "输入数据数量": input_number
+            "输入数据数量": input_number,
+            "输入文件编码": input_encoding
         }
     }, ensure_ascii=False)
 
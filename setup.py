@@ -54,6 +54,12 @@ setup(
     python_requires=">=3.8",
     install_requires=read_requirements(),
     extras_require={
+        "async": [
+            "aiohttp",
+        ],
+        "columnar": [
+            "pyarrow",
+        ],
         "dev": [
             "pytest",
             "pytest-cov",
@@ -0,0 +1,105 @@
+"""
+控制字符清理微基准
+
+对比旧的清理链路（3次str.replace + 2次re.sub，safe_json_dumps重复清理，序列化后再清理一次）
+与当前实现（可打印字符串快速路径 + 单个移除正则，序列化链路只清理一次）
+
+运行方式：
+    python tests/bench_control_characters.py
+"""
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_data_test_tool.tools.http_request import (  # noqa: E402
+    clean_control_characters,
+    clean_dict_control_characters,
+    safe_json_dumps,
+)
+
+
+def legacy_clean_control_characters(text):
+    """旧实现：多次replace和re.sub"""
+    if not isinstance(text, str):
+        return text
+    cleaned = text
+    cleaned = cleaned.replace('\t', '    ')
+    cleaned = cleaned.replace('\r', '\\r')
+    cleaned = cleaned.replace('\n', '\\n')
+    cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', cleaned)
+    cleaned = re.sub(r'[\u200B-\u200D\uFEFF]', '', cleaned)
+    return cleaned
+
+
+def legacy_clean_dict(data):
+    if isinstance(data, dict):
+        return {key: legacy_clean_dict(value) for key, value in data.items()}
+    elif isinstance(data, list):
+        return [legacy_clean_dict(item) for item in data]
+    elif isinstance(data, str):
+        return legacy_clean_control_characters(data)
+    return data
+
+
+def legacy_chain(params):
+    """旧的sync_http_request字典参数链路"""
+    cleaned = legacy_clean_dict(params)
+    cleaned = legacy_clean_dict(cleaned)  # safe_json_dumps 内部再次清理
+    json_str = json.dumps(cleaned, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    json.loads(json_str)
+    return legacy_clean_control_characters(json_str)
+
+
+def current_chain(params):
+    """当前的sync_http_request字典参数链路"""
+    cleaned = clean_dict_control_characters(params)
+    json_str = safe_json_dumps(cleaned, clean=False)
+    return clean_control_characters(json_str)
+
+
+def build_payloads():
+    clean_text = "请帮我查询一下订单状态，订单号为 1234567890，谢谢。" * 8
+    # 常见情况：长文本中夹杂少量换行、制表符和零宽字符
+    dirty_text = ("请帮我查询一下订单状态，订单号为 1234567890，谢谢。\n\t" * 8) + "\u200b"
+    # 最坏情况：控制字符密集
+    dense_text = "第一行\n第二行\t缩进\r\n\x00\x1f\x85零宽\u200b字符\ufeff" * 8
+    payload = {
+        "conversation_text": clean_text,
+        "sessionId": "session_123",
+        "history": [{"role": "user", "content": clean_text} for _ in range(10)],
+        "meta": {f"field_{i}": f"value {i}" for i in range(20)},
+    }
+    dirty_payload = dict(payload, conversation_text=dirty_text)
+    return {
+        "clean_str": clean_text,
+        "dirty_str": dirty_text,
+        "dense_str": dense_text,
+        "clean_payload": payload,
+        "dirty_payload": dirty_payload,
+    }
+
+
+def main(number=2000):
+    payloads = build_payloads()
+
+    for name in ("clean_str", "dirty_str", "dense_str"):
+        text = payloads[name]
+        assert clean_control_characters(text) == legacy_clean_control_characters(text)
+        legacy = timeit.timeit(lambda: legacy_clean_control_characters(text), number=number)
+        current = timeit.timeit(lambda: clean_control_characters(text), number=number)
+        print(f"{name:<14} legacy {legacy * 1e6 / number:8.2f}us  current {current * 1e6 / number:8.2f}us  x{legacy / current:.1f}")
+
+    for name in ("clean_payload", "dirty_payload"):
+        params = payloads[name]
+        assert current_chain(params) == legacy_chain(params)
+        legacy = timeit.timeit(lambda: legacy_chain(params), number=number)
+        current = timeit.timeit(lambda: current_chain(params), number=number)
+        print(f"{name:<14} legacy {legacy * 1e6 / number:8.2f}us  current {current * 1e6 / number:8.2f}us  x{legacy / current:.1f}")
+
+
+if __name__ == '__main__':
+    main()
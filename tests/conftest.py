@@ -0,0 +1,60 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# /sse 返回的事件：两个answer片段和一个召回列表
+SSE_EVENTS = [
+    b'data: {"finish": false, "content": [{"content": "he"}]}\n\n',
+    b'data: {"finish": false, "content": [{"content": "llo"}]}\n\n',
+    b'data: {"finish": true, "content": [{"content": ""}, {"content": [{"id": 1}]}]}\n\n',
+]
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """
+    本地测试接口（keep-alive）：
+        /echo  返回 {"data": {"echo": 请求体JSON}}
+        /fail  返回HTTP 500
+        /sse   分块返回 SSE_EVENTS，事件之间间隔10ms
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/sse"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in SSE_EVENTS:
+                time.sleep(0.01)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if self.path.startswith("/fail"):
+            out = b'{"error": 1}'
+            self.send_response(500)
+        else:
+            out = json.dumps({"data": {"echo": json.loads(body)}}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+@pytest.fixture
+def api_server():
+    """启动本地测试接口，返回基础URL（如 http://127.0.0.1:12345）"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
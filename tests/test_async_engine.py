@@ -0,0 +1,86 @@
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from batch_data_test_tool.concurrency.async_engine import run_async_batch_http_request
+from batch_data_test_tool.tools.result_store import ResultStore, STATUS_ERROR, STATUS_FAILED, STATUS_SUCCEED
+from batch_data_test_tool.tools.sse_parser import STREAM_METRIC_COLUMNS
+
+pytest.importorskip("aiohttp")
+
+PARAMS = {"query": "${query}", "n": "${n}"}
+MAPPING = {"query": "q", "n": "n"}
+
+
+def _frame(values):
+    return pd.DataFrame({"q": values, "n": list(range(len(values)))}, index=[f"r{i}" for i in range(len(values))])
+
+
+def test_result_columns_follow_input_rows(api_server):
+    df = _frame([f"text\t{i}" for i in range(20)])
+    completed = []
+    result = run_async_batch_http_request(
+        df, MAPPING, api_server + "/echo", {}, PARAMS, timeout=5, concurrency=4,
+        on_result=lambda index, response_text, response_time: completed.append(index)
+    )
+
+    assert list(result.columns) == ["q", "n", "response_text", "response_time"]
+    assert list(result.index) == list(df.index)
+    echoed = [json.loads(text)["data"]["echo"] for text in result["response_text"]]
+    # 与线程池版本发送相同的请求体（dumps_request_body），制表符按JSON转义原样传递
+    assert echoed == [{"query": f"text\t{i}", "n": i} for i in range(20)]
+    assert (result["response_time"] >= 0).all()
+    assert sorted(completed) == sorted(df.index)
+
+
+def test_build_error_fails_only_its_row(api_server):
+    df = _frame(["a", "NaN", "b", "Infinity"])
+    store = ResultStore(len(df))
+    errors, completed = [], []
+    result = run_async_batch_http_request(
+        df, MAPPING, api_server + "/echo", {}, PARAMS, timeout=5, concurrency=2,
+        on_result=lambda index, response_text, response_time: completed.append(index),
+        on_error=lambda index, message: errors.append(index),
+        result_store=store
+    )
+
+    assert list(store.status) == [STATUS_SUCCEED, STATUS_ERROR, STATUS_SUCCEED, STATUS_ERROR]
+    assert sorted(errors) == ["r1", "r3"]
+    assert sorted(completed) == ["r0", "r2"]
+    assert result["response_text"].isna().tolist() == [False, True, False, True]
+
+
+def test_non_200_marks_row_failed(api_server):
+    store = ResultStore(2)
+    result = run_async_batch_http_request(_frame(["a", "b"]), MAPPING, api_server + "/fail", {}, PARAMS, timeout=5, result_store=store)
+    assert list(store.status) == [STATUS_FAILED, STATUS_FAILED]
+    assert result["response_text"].isna().all()
+
+
+def test_stream_metrics_columns(api_server):
+    result = run_async_batch_http_request(_frame(["a", "b", "c"]), MAPPING, api_server + "/sse", {}, PARAMS, timeout=5, stream=True)
+
+    for name in STREAM_METRIC_COLUMNS:
+        assert name in result.columns
+    assert result["event_count"].tolist() == [3, 3, 3]
+    assert (result["time_to_first_event"] >= result["ttfb"]).all()
+    assert (result["total_duration"] >= result["time_to_first_event"]).all()
+    assert result["response_text"].str.contains('"finish": true').all()
+
+
+def test_runs_in_worker_thread_inside_running_event_loop(api_server):
+    # Jupyter中已有运行中的事件循环：同步入口在独立线程中运行新的事件循环
+    callback_threads = set()
+
+    async def main():
+        return run_async_batch_http_request(
+            _frame(["a", "b"]), MAPPING, api_server + "/echo", {}, PARAMS, timeout=5,
+            on_result=lambda index, response_text, response_time: callback_threads.add(threading.get_ident())
+        )
+
+    result = asyncio.run(main())
+    assert result["response_text"].notna().all()
+    assert callback_threads and threading.get_ident() not in callback_threads
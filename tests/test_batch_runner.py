@@ -0,0 +1,106 @@
+import json
+
+import pandas as pd
+import pytest
+
+from batch_data_test_tool.concurrency.async_engine import is_async_engine_available
+from batch_data_test_tool.concurrency.batch_runner import BatchRequestConfig, run_request_chunks
+from batch_data_test_tool.tools.field_extractor import FieldExtractor, FieldSpec
+from batch_data_test_tool.tools.metrics import PHASE_COLUMNS
+from batch_data_test_tool.tools.result_store import STATUS_ERROR, STATUS_SUCCEED
+
+PARAMS = {"query": "${query}", "n": "${n}"}
+MAPPING = {"query": "q", "n": "n"}
+
+
+@pytest.fixture(params=[False, True], ids=["threads", "asyncio"])
+def use_async_engine(request):
+    if request.param and not is_async_engine_available():
+        pytest.skip("aiohttp未安装")
+    return request.param
+
+
+def _chunks(values, chunk_size):
+    df = pd.DataFrame(
+        {"q": values, "n": list(range(len(values))), "extra": "x"},
+        index=[f"r{i}" for i in range(len(values))]
+    )
+    return [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+
+def _run(api_url, chunks, columns=("q", "n"), **config_kwargs):
+    config = BatchRequestConfig(
+        api_url=api_url, headers={}, params=PARAMS, placeholder_params_mapping_dic=MAPPING,
+        timeout=5, max_workers=3, async_concurrency=3, **config_kwargs
+    )
+    progress, started = [], []
+    results = [
+        store.to_dataframe(chunk_df)
+        for chunk_df, store in run_request_chunks(
+            chunks, list(columns), config,
+            lambda index, error_message, response_time: progress.append((index, error_message)),
+            lambda chunk_df, store: started.append(len(chunk_df))
+        )
+    ]
+    return pd.concat(results), progress, started
+
+
+def test_inline_parse_result_columns(api_server, use_async_engine):
+    extractor = FieldExtractor([FieldSpec("echo_query", "data.echo.query"), FieldSpec("echo_n", "data.echo.n")])
+    values = [f"问题{i}" for i in range(7)]
+    result, progress, started = _run(
+        api_server + "/echo", _chunks(values, 3), use_async_engine=use_async_engine, inline_extractor=extractor
+    )
+
+    assert started == [3, 3, 1]
+    assert list(result.index) == [f"r{i}" for i in range(7)]
+    # 只保留选择的列，解析字段列在结果列之后
+    assert list(result.columns) == ["q", "n", "response_text", "response_time", "echo_query", "echo_n"]
+    assert result["echo_query"].tolist() == values
+    assert result["echo_n"].tolist() == list(range(7))
+    assert [json.loads(text)["data"]["echo"]["query"] for text in result["response_text"]] == values
+    assert sorted(index for index, _ in progress) == sorted(result.index)
+    assert all(error_message is None for _, error_message in progress)
+
+
+def test_drop_response_text_keeps_parsed_fields(api_server, use_async_engine):
+    extractor = FieldExtractor([FieldSpec("echo_query", "data.echo.query")])
+    result, _, _ = _run(
+        api_server + "/echo", _chunks(["a", "b", "c", "d"], 2),
+        use_async_engine=use_async_engine, inline_extractor=extractor, drop_response_text=True
+    )
+
+    assert result["echo_query"].tolist() == ["a", "b", "c", "d"]
+    assert result["response_text"].isna().all()
+    assert result["response_time"].notna().all()
+
+
+def test_phase_timing_columns(api_server, use_async_engine):
+    extractor = FieldExtractor([FieldSpec("echo_query", "data.echo.query")])
+    result, _, _ = _run(
+        api_server + "/echo", _chunks(["a", "b", "c"], 2),
+        use_async_engine=use_async_engine, inline_extractor=extractor, phase_timing=True
+    )
+
+    for phase in PHASE_COLUMNS:
+        assert phase in result.columns
+        assert (result[phase] >= 0).all()
+
+
+def test_build_error_reports_only_its_row(api_server, use_async_engine):
+    chunk = _chunks(["a", "NaN", "b"], 3)[0]
+    config = BatchRequestConfig(
+        api_url=api_server + "/echo", headers={}, params=PARAMS, placeholder_params_mapping_dic=MAPPING,
+        timeout=5, use_async_engine=use_async_engine
+    )
+    progress = []
+    (chunk_df, store), = run_request_chunks(
+        [chunk], ["q", "n"], config,
+        lambda index, error_message, response_time: progress.append((index, error_message))
+    )
+
+    assert list(chunk_df.columns) == ["q", "n"]
+    assert list(store.status) == [STATUS_SUCCEED, STATUS_ERROR, STATUS_SUCCEED]
+    errors = dict(progress)
+    assert errors["r0"] is None and errors["r2"] is None
+    assert errors["r1"].startswith("执行失败")
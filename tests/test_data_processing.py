@@ -0,0 +1,279 @@
+import datetime
+import decimal
+import json
+
+import pandas as pd
+import pytest
+
+from batch_data_test_tool.tools.data_processing import (
+    ChunkedDataFile, arrow_table_to_dataframe, detect_file_encoding, iter_dataframe_chunks, read_dataframe_from_file
+)
+from batch_data_test_tool.tools.http_request import dumps_request_body
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = pa_feather = pa_parquet = None
+
+requires_pyarrow = pytest.mark.skipif(pa is None, reason="需要安装pyarrow")
+
+
+def make_typed_table():
+    return pa.table({
+        "id": pa.array([1, None, 3], type=pa.int64()),
+        "day": pa.array([datetime.date(2024, 1, 2), None, datetime.date(2024, 3, 4)]),
+        "at": pa.array([datetime.datetime(2024, 1, 2, 3, 4, 5), None, None], type=pa.timestamp("us")),
+        "price": pa.array([decimal.Decimal("1.50"), None, decimal.Decimal("-2.25")], type=pa.decimal128(5, 2)),
+        "tags": pa.array([["a"], [], None], type=pa.list_(pa.string())),
+        "info": pa.array([{"when": datetime.date(2024, 1, 2), "n": 1}, None, {"when": None, "n": None}]),
+        "score": pa.array([0.5, 1.5, None], type=pa.float64()),
+    })
+
+
+@requires_pyarrow
+def test_arrow_columns_become_json_safe_python_values():
+    df = arrow_table_to_dataframe(make_typed_table(), offset=10)
+
+    assert list(df.index) == [10, 11, 12]
+    assert df["id"].tolist()[0] == 1 and isinstance(df["id"].tolist()[0], int)
+    assert df["id"].tolist()[1] is None
+    assert df["day"].tolist() == ["2024-01-02", None, "2024-03-04"]
+    assert df["at"].tolist()[0] == "2024-01-02T03:04:05"
+    assert df["price"].tolist() == ["1.50", None, "-2.25"]
+    assert df["tags"].tolist() == [["a"], [], None]
+    assert df["info"].tolist()[0] == {"when": "2024-01-02", "n": 1}
+    # 每行都可以直接作为整值占位符的取值序列化
+    for row in df.to_dict("records"):
+        json.loads(dumps_request_body({key: value for key, value in row.items() if key != "score"}))
+
+
+@requires_pyarrow
+def test_integer_column_without_nulls_keeps_numpy_dtype():
+    df = arrow_table_to_dataframe(pa.table({"n": pa.array([1, 2], type=pa.int32())}))
+    assert df["n"].dtype.kind == "i"
+
+
+@requires_pyarrow
+def test_feather_chunks_follow_record_batches(tmp_path):
+    path = tmp_path / "input.feather"
+    table = pa.table({"n": list(range(25)), "text": [f"t{i}" for i in range(25)]})
+    pa_feather.write_feather(table, str(path), chunksize=10)
+
+    chunks = list(iter_dataframe_chunks(str(path), chunk_size=4, usecols=["n"]))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2, 4, 4, 2, 4, 1]
+    combined = pd.concat(chunks)
+    assert combined["n"].tolist() == list(range(25))
+    assert list(combined.index) == list(range(25))
+    assert list(combined.columns) == ["n"]
+    assert ChunkedDataFile(str(path), chunk_size=4).count_rows() == 25
+
+
+@requires_pyarrow
+def test_parquet_read_matches_chunked_read(tmp_path):
+    path = tmp_path / "input.parquet"
+    pa_parquet.write_table(make_typed_table(), str(path))
+
+    whole = read_dataframe_from_file(str(path))
+    chunked = pd.concat(iter_dataframe_chunks(str(path), chunk_size=2))
+    assert whole.to_dict("records") == chunked.to_dict("records")
+    assert whole["day"].tolist() == ["2024-01-02", None, "2024-03-04"]
+
+
+def test_jsonl_chunks_share_first_chunk_columns(tmp_path):
+    path = tmp_path / "input.jsonl"
+    rows = [{"q": f"q{i}", "extra": i} if i < 2 else {"q": f"q{i}"} for i in range(5)]
+    rows[4]["late"] = "ignored"
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+
+    chunks = list(iter_dataframe_chunks(str(path), chunk_size=2))
+    assert [chunk.columns.tolist() for chunk in chunks] == [["q", "extra"]] * 3
+    combined = pd.concat(chunks)
+    assert combined["q"].tolist() == [f"q{i}" for i in range(5)]
+    assert combined["extra"].tolist() == [0, 1, None, None, None]
+    assert list(combined.index) == list(range(5))
+
+    projected = list(iter_dataframe_chunks(str(path), chunk_size=2, usecols=["extra"]))
+    assert all(chunk.columns.tolist() == ["extra"] for chunk in projected)
+
+
+@pytest.mark.parametrize("encoding, expected", [
+    ("utf-8-sig", "utf-8-sig"),
+    ("utf-16", "utf-16"),
+    ("utf-32", "utf-32"),
+    ("gbk", "gbk"),
+    ("utf-8", "utf-8"),
+])
+def test_detect_file_encoding(tmp_path, encoding, expected):
+    path = tmp_path / "input.csv"
+    path.write_bytes("q,n\n你好,1\n".encode(encoding))
+    assert detect_file_encoding(str(path)) == expected
+
+
+def test_detect_file_encoding_ignores_character_cut_by_sample(tmp_path):
+    path = tmp_path / "input.csv"
+    content = "q\n" + "中文\n" * 10
+    path.write_bytes(content.encode("utf-8"))
+    # 样本在多字节字符中间截断
+    assert detect_file_encoding(str(path), sample_size=4) == "utf-8"
+
+
+def test_ascii_sample_is_verified_against_whole_file(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_bytes(("q,n\n" + "hello,1\n" * 200 + "你好,2\n").encode("gbk"))
+
+    assert detect_file_encoding(str(path), sample_size=64) == "utf-8"
+    assert detect_file_encoding(str(path), sample_size=64, verify=True) == "gbk"
+
+
+def test_chunked_csv_reads_late_non_ascii_rows(tmp_path):
+    # 开头超过检测样本大小（1MiB）的部分全部为ASCII
+    path = tmp_path / "input.csv"
+    path.write_bytes(("q,n\n" + "hello,1\n" * 150000 + "你好,2\n").encode("gbk"))
+
+    source = ChunkedDataFile(str(path), chunk_size=50000)
+    assert source.encoding == "gbk"
+    last_chunk = list(source.iter_chunks())[-1]
+    assert last_chunk["q"].tolist()[-1] == "你好"
+    assert read_dataframe_from_file(str(path))["q"].tolist()[-1] == "你好"
+
+
+def _write_projection_input(tmp_path, file_format):
+    df = pd.DataFrame({
+        "id": list(range(6)),
+        "q": [f"问题{i}" for i in range(6)],
+        "text": ["长文本" * 200 + str(i) for i in range(6)],
+    })
+    path = tmp_path / f"input.{file_format}"
+    if file_format == "csv":
+        df.to_csv(path, index=False)
+    else:
+        pa_parquet.write_table(pa.Table.from_pandas(df, preserve_index=False), str(path), row_group_size=4)
+    return str(path)
+
+
+@pytest.fixture(params=["csv", pytest.param("parquet", marks=requires_pyarrow)])
+def projection_input(request, tmp_path):
+    return _write_projection_input(tmp_path, request.param)
+
+
+@pytest.fixture
+def read_columns_spy(monkeypatch):
+    """记录CSV/Parquet读取库实际被要求读取的列"""
+    requested = []
+    read_csv = pd.read_csv
+
+    def spy_read_csv(*args, **kwargs):
+        requested.append(kwargs.get("usecols"))
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", spy_read_csv)
+    if pa_parquet is not None:
+        iter_batches = pa_parquet.ParquetFile.iter_batches
+        read_table = pa_parquet.read_table
+
+        def spy_iter_batches(self, *args, **kwargs):
+            requested.append(kwargs.get("columns"))
+            return iter_batches(self, *args, **kwargs)
+
+        def spy_read_table(*args, **kwargs):
+            requested.append(kwargs.get("columns"))
+            return read_table(*args, **kwargs)
+
+        monkeypatch.setattr(pa_parquet.ParquetFile, "iter_batches", spy_iter_batches)
+        monkeypatch.setattr(pa_parquet, "read_table", spy_read_table)
+    return requested
+
+
+def test_projection_reads_only_selected_columns(projection_input, read_columns_spy):
+    source = ChunkedDataFile(projection_input, chunk_size=4)
+    assert source.columns == ["id", "q", "text"]
+    # 按文件中的列顺序去重
+    usecols = source.select_columns(["q", "id", "q"])
+    assert usecols == ["id", "q"]
+
+    read_columns_spy.clear()
+    chunks = list(source.iter_chunks(usecols))
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert all(chunk.columns.tolist() == ["id", "q"] for chunk in chunks)
+    assert pd.concat(chunks)["q"].tolist() == [f"问题{i}" for i in range(6)]
+
+    whole = source.read(usecols)
+    assert whole.columns.tolist() == ["id", "q"]
+    assert read_columns_spy == [["id", "q"], ["id", "q"]]
+
+
+def test_projection_unknown_column_raises(projection_input):
+    source = ChunkedDataFile(projection_input, chunk_size=4)
+    with pytest.raises(ValueError, match=r"数据文件中不存在列: \['missing'\]"):
+        source.select_columns(["q", "missing"])
+    with pytest.raises(ValueError, match="数据文件中不存在列"):
+        source.iter_chunks(["missing"])
+    with pytest.raises(ValueError, match="数据文件中不存在列"):
+        source.read(["q", "missing"])
+
+
+def test_projection_savings_from_column_bytes(projection_input):
+    source = ChunkedDataFile(projection_input, chunk_size=2)
+    sizes = source.column_bytes()
+    assert list(sizes) == ["id", "q", "text"]
+    assert all(size > 0 for size in sizes.values())
+    assert sizes["text"] > sizes["q"] + sizes["id"]
+
+    saved, total = source.projection_savings(["id", "q"])
+    assert total == sum(sizes.values())
+    assert saved == sizes["text"]
+    assert source.projection_savings(source.columns) == (0, total)
+
+
+@requires_pyarrow
+def test_parquet_column_bytes_match_metadata(tmp_path):
+    path = _write_projection_input(tmp_path, "parquet")
+    metadata = pa_parquet.ParquetFile(path).metadata
+    expected = {}
+    for row_group_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(row_group_index)
+        for column_index in range(row_group.num_columns):
+            column_chunk = row_group.column(column_index)
+            expected[column_chunk.path_in_schema] = expected.get(column_chunk.path_in_schema, 0) + column_chunk.total_compressed_size
+
+    assert metadata.num_row_groups == 2
+    assert ChunkedDataFile(path).column_bytes() == expected
+
+
+def test_csv_column_bytes_scale_first_chunk_to_row_count(tmp_path):
+    path = _write_projection_input(tmp_path, "csv")
+    source = ChunkedDataFile(path, chunk_size=2)
+    usage = source.first_chunk().memory_usage(deep=True, index=False)
+    assert source.column_bytes() == {name: int(usage[name] * 3) for name in ["id", "q", "text"]}
+
+
+def test_xlsx_chunks_smaller_than_sheet(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "input.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["q", "n", "q"])
+    for i in range(7):
+        sheet.append([f"问题{i}", i, f"重复{i}"])
+    # 中间的空行保留，末尾的空行丢弃
+    sheet.append([None, None, None])
+    sheet.append(["last", 7, None])
+    sheet.append([None, None, None])
+    workbook.save(path)
+
+    chunks = list(iter_dataframe_chunks(str(path), chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3]
+    combined = pd.concat(chunks)
+    assert list(combined.index) == list(range(9))
+    # 与整表读取一致
+    whole = read_dataframe_from_file(str(path))
+    assert combined.columns.tolist() == whole.columns.tolist() == ["q", "n", "q.1"]
+    assert combined.to_dict("records") == whole.to_dict("records")
+    assert combined["q"].tolist()[-2:] == [None, "last"]
+
+    projected = list(iter_dataframe_chunks(str(path), chunk_size=4, usecols=["n"]))
+    assert [chunk.columns.tolist() for chunk in projected] == [["n"]] * 3
+    assert pd.concat(projected)["n"].tolist()[:7] == list(range(7))
+    assert ChunkedDataFile(str(path), chunk_size=3).count_rows() == 9
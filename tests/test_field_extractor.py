@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+import os
+
+import pytest
+
+from batch_data_test_tool.tools.field_extractor import (
+    FieldSpec, ParsedDocumentCache, RESPONSE_PARSING_METHODS, extract_fields, extract_fields_parallel
+)
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_tools_does_not_import_apps(tmp_path):
+    # 子进程在没有config.json/data目录的空目录中导入，与spawn方式启动的解析子进程一致
+    code = (
+        "import sys\n"
+        "import batch_data_test_tool.tools.field_extractor\n"
+        "assert not any(name.startswith('batch_data_test_tool.apps') for name in sys.modules), sorted(sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+    assert not (tmp_path / "logs").exists()
+
+
+def test_extract_fields_parallel_matches_serial():
+    texts = [json.dumps({"a": {"b": i}, "c": [i, i + 1]}) for i in range(50)] + ["not json"]
+    specs = [
+        FieldSpec("b", "a.b"),
+        FieldSpec("c0", "c[0]"),
+        FieldSpec("keys", "", RESPONSE_PARSING_METHODS["get_all_keys"]["method"]),
+    ]
+    serial_errors, parallel_errors = [], []
+    serial = extract_fields(texts, specs, on_error=lambda position, e: serial_errors.append(position))
+    parallel = extract_fields_parallel(
+        texts, specs, chunk_size=7, max_workers=2,
+        on_error=lambda position, e: parallel_errors.append(position)
+    )
+    assert parallel == serial
+    assert serial_errors == parallel_errors == [50]
+
+
+def test_double_encoded_response_is_decoded_again():
+    # 响应体为JSON字符串，字符串内容才是JSON文档
+    text = json.dumps(json.dumps({"a": {"b": 1}}))
+    columns = extract_fields([text, json.dumps("plain")], [FieldSpec("b", "a.b")])
+    assert columns == {"b": [1, None]}
+
+
+def test_parsed_document_cache_hit_and_invalidation():
+    cache = ParsedDocumentCache()
+    text = json.dumps({"a": 1})
+    document = cache.get(0, text)
+    # 同一位置相同内容（不同对象）命中缓存，返回同一个已解析文档
+    assert cache.get(0, "".join(text)) is document
+    # 同一位置的响应变化后重新解析
+    changed = cache.get(0, json.dumps({"a": 2}))
+    assert changed == {"a": 2} and changed is not document
+    assert len(cache) == 1
+
+    with pytest.raises(json.JSONDecodeError) as first:
+        cache.get(1, "not json")
+    with pytest.raises(json.JSONDecodeError) as second:
+        cache.get(1, "not json")
+    assert second.value is first.value  # 解析失败也被缓存，不会重复解析
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_extract_fields_with_cache_reuses_documents():
+    cache = ParsedDocumentCache()
+    texts = [json.dumps({"a": i, "b": [i]}) for i in range(3)] + ["bad"]
+    errors = []
+    first = extract_fields(texts, [FieldSpec("a", "a")], cache=cache, on_error=lambda position, e: errors.append(position))
+    documents = [cache.get(position, text) for position, text in enumerate(texts[:3])]
+    second = extract_fields(texts, [FieldSpec("b", "b[0]")], cache=cache, on_error=lambda position, e: errors.append(position))
+
+    assert first == {"a": [0, 1, 2, None]}
+    assert second == {"b": [0, 1, 2, None]}
+    assert errors == [3, 3]
+    assert [cache.get(position, text) for position, text in enumerate(texts[:3])] == documents
+
+
+def test_extract_fields_parallel_reports_error_positions_across_chunks():
+    texts = [json.dumps({"v": i}) if i % 4 else "bad" for i in range(10)]
+    errors = []
+    columns = extract_fields_parallel(
+        texts, [FieldSpec("v", "v")], chunk_size=3, max_workers=2,
+        on_error=lambda position, e: errors.append(position)
+    )
+    assert columns["v"] == [None if i % 4 == 0 else i for i in range(10)]
+    assert errors == [0, 4, 8]
+
+
+def test_extract_fields_parallel_requires_registered_method():
+    specs = [FieldSpec("v", "v", lambda document, path: None)]
+    with pytest.raises(ValueError):
+        extract_fields_parallel([json.dumps({"v": 1})] * 4, specs, chunk_size=1, max_workers=2)
+    # 单进程时直接在当前进程中解析，不要求方法可序列化
+    assert extract_fields_parallel([json.dumps({"v": 1})], specs, max_workers=1) == {"v": [None]}
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from batch_data_test_tool.tools.get_config import (
+    get_api_config, get_api_headers_by_name, get_api_params_by_name, get_api_params_placeholder_list_by_name
+)
+from batch_data_test_tool.tools.http_request import sync_http_request
+
+CONFIG = [{
+    "api_name": "demo",
+    "api_url": "http://127.0.0.1:9/demo",
+    "headers": {"X-Token": "abc"},
+    "params": {"query": "${query}", "history": [{"role": "user", "content": "${query}"}], "top_k": 3},
+}]
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(CONFIG), encoding="utf-8")
+    return str(path)
+
+
+def test_cached_config_is_read_only(config_path):
+    config = get_api_config(config_path, "demo")
+    with pytest.raises(TypeError):
+        config.headers["Content-Type"] = "application/json"
+    with pytest.raises(TypeError):
+        config.params["history"][0]["role"] = "system"
+    assert get_api_config(config_path, "demo") is config
+    assert config.placeholders == ("query",)
+
+
+def test_getters_return_independent_copies(config_path):
+    params = get_api_params_by_name(config_path, "demo")
+    assert params == CONFIG[0]["params"]
+    params["history"].append({"role": "assistant"})
+    headers = get_api_headers_by_name(config_path, "demo")
+    headers["Content-Type"] = "text/plain"
+
+    assert get_api_params_by_name(config_path, "demo") == CONFIG[0]["params"]
+    assert get_api_headers_by_name(config_path, "demo") == {"X-Token": "abc"}
+    assert get_api_params_placeholder_list_by_name(config_path, "demo") == ["query"]
+
+
+def test_sync_http_request_does_not_modify_headers(config_path):
+    headers = get_api_config(config_path, "demo").headers
+    plain_headers = {"X-Token": "abc"}
+    # 端口9不可连接，请求失败返回None
+    assert sync_http_request("http://127.0.0.1:9/demo", b"{}", headers=headers, timeout=1) is None
+    assert sync_http_request("http://127.0.0.1:9/demo", b"{}", headers=plain_headers, timeout=1) is None
+    assert dict(headers) == plain_headers == {"X-Token": "abc"}
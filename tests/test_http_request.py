@@ -0,0 +1,51 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from batch_data_test_tool.tools.http_request import clean_control_characters, sync_http_request
+
+
+@pytest.fixture
+def echo_server():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            received.append((body, dict(self.headers)))
+            out = b'{"ok":true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", received
+    server.shutdown()
+    server.server_close()
+
+
+def test_clean_control_characters():
+    text = "plain text"
+    assert clean_control_characters(text) is text
+    assert clean_control_characters("a\tb\r\nc\x00\x85​d") == "a    b\\r\\ncd"
+    assert clean_control_characters(None) is None
+
+
+def test_dict_params_are_cleaned_and_serialized_once(echo_server):
+    url, received = echo_server
+    params = {"q": "line1\nline2\t​", "nested": [{"x": "\x9fok"}], "n": 1}
+    response = sync_http_request(url, params, headers={"X-Token": "abc"}, timeout=5)
+
+    assert response.status_code == 200
+    body, headers = received[0]
+    assert json.loads(body) == {"q": "line1\\nline2    ", "nested": [{"x": "ok"}], "n": 1}
+    assert body.startswith(b'{"q":')  # 紧凑分隔符
+    assert headers["Content-Type"] == "application/json"
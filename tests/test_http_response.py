@@ -0,0 +1,122 @@
+import json
+
+import pandas as pd
+import pytest
+
+from batch_data_test_tool.concurrency.multi_threading import multi_exec_stream
+from batch_data_test_tool.tools.http_request import RequestBuildError, sync_http_request
+from batch_data_test_tool.tools.http_response import (
+    compile_request_params,
+    iter_request_bodies,
+    structure_request_params,
+    structure_request_params_batch,
+)
+
+PARAMS = {"query": "${query}", "meta": {"source": "test"}}
+MAPPING = {"query": "q"}
+
+
+def test_iter_request_bodies_yields_error_for_unserializable_row():
+    df = pd.DataFrame({"q": ["hello", "NaN", "Infinity", "[1, 2]"]})
+    bodies = list(iter_request_bodies(df, MAPPING, PARAMS))
+
+    assert len(bodies) == 4
+    assert json.loads(bodies[0]) == {"query": "hello", "meta": {"source": "test"}}
+    assert isinstance(bodies[1], RequestBuildError)
+    assert "第1行" in str(bodies[1])
+    assert isinstance(bodies[2], RequestBuildError)
+    assert json.loads(bodies[3])["query"] == [1, 2]
+
+
+def test_structure_request_params_batch_raises_build_error():
+    df = pd.DataFrame({"q": [{"bad": {1, 2}}]})
+    with pytest.raises(RequestBuildError):
+        structure_request_params_batch(df, MAPPING, PARAMS)
+
+
+def test_build_error_fails_only_its_row():
+    df = pd.DataFrame({"q": ["a", "NaN", "b"]})
+    sent = []
+
+    def fake_request(request_params, **kwargs):
+        if isinstance(request_params, RequestBuildError):
+            # 与sync_http_request一致：构建失败的行直接抛出，不发送
+            raise request_params
+        sent.append(json.loads(request_params))
+        return "ok"
+
+    kwargs_iter = ((position, {"request_params": body}) for position, body in enumerate(iter_request_bodies(df, MAPPING, PARAMS)))
+    results = dict(multi_exec_stream(fake_request, kwargs_iter, max_workers=2, return_exceptions=True))
+
+    assert results[0] == results[2] == "ok"
+    assert isinstance(results[1], RequestBuildError)
+    assert sorted(body["query"] for body in sent) == ["a", "b"]
+
+
+def test_sync_http_request_does_not_send_failed_row():
+    error = RequestBuildError("构建第0行请求参数时出错")
+    with pytest.raises(RequestBuildError):
+        sync_http_request(api_url="http://127.0.0.1:9/unused", request_params=error)
+
+
+TEMPLATE_PARAMS = json.dumps({
+    "whole": "${v}",
+    "mid": "id_${v}_${n}",
+    "const": {"k": ["a", 1]},
+    "nested": [{"x": "${n}"}, "${missing}"],
+    "twice": "${v}-${v}",
+})
+TEMPLATE_MAPPING = {"v": "col", "n": "num"}
+
+
+# 期望值与编译模板之前逐行解析params的实现一致
+@pytest.mark.parametrize("value, whole, mid", [
+    ("hello", "hello", "id_hello_7"),
+    ("[1, 2]", [1, 2], "id_[1, 2]_7"),
+    ('{"a": 1}', {"a": 1}, 'id_{"a": 1}_7'),
+    ("123", 123, "id_123_7"),
+    ("true", True, "id_true_7"),
+    ("null", None, "id_null_7"),
+    ('"quoted"', "quoted", 'id_"quoted"_7'),
+    (" 12", 12, "id_ 12_7"),
+    ("NaN-ish", "NaN-ish", "id_NaN-ish_7"),
+    ("", "", "id__7"),
+    (["x"], ["x"], "id_['x']_7"),
+    ({"d": 1}, {"d": 1}, "id_{'d': 1}_7"),
+    (5, 5, "id_5_7"),
+    (2.5, 2.5, "id_2.5_7"),
+    (None, None, "id_None_7"),
+])
+def test_request_template_matches_structure_request_params(value, whole, mid):
+    row = pd.Series({"col": value, "num": 7}, dtype=object)
+    expected = {
+        "whole": whole,
+        "mid": mid,
+        "const": {"k": ["a", 1]},
+        "nested": [{"x": 7}, "${missing}"],
+        "twice": f"{value}-{value}",
+    }
+
+    body = structure_request_params(row, TEMPLATE_MAPPING, TEMPLATE_PARAMS)
+    template = compile_request_params(TEMPLATE_PARAMS)
+    assert json.loads(body) == expected
+    assert json.dumps(template.render_row(row, TEMPLATE_MAPPING), ensure_ascii=False) == body
+    assert template.render_json({"v": value, "n": 7}) == body
+
+    df = pd.DataFrame({"col": pd.Series([value], dtype=object), "num": [7]})
+    assert list(iter_request_bodies(df, TEMPLATE_MAPPING, TEMPLATE_PARAMS, as_bytes=False)) == [body]
+
+
+def test_request_template_reuses_constant_substructures():
+    template = compile_request_params(TEMPLATE_PARAMS)
+    first = template.render({"v": "a", "n": 1})
+    second = template.render({"v": "b", "n": 2})
+
+    assert template.placeholders == ["v", "n", "missing"]
+    assert first["const"] is second["const"]
+    assert first["nested"] is not second["nested"]
+
+
+def test_structure_request_params_falls_back_for_non_json_params():
+    row = pd.Series({"col": "x"})
+    assert structure_request_params(row, {"v": "col"}, "q=${v}&t=${v}") == "q=x&t=x"
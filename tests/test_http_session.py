@@ -0,0 +1,99 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from batch_data_test_tool.tools import http_session
+from batch_data_test_tool.tools.http_session import (
+    acquire_pooled_session,
+    close_pooled_sessions,
+    get_pooled_session,
+    pop_connect_time,
+    release_pooled_session,
+    reset_connect_time,
+)
+
+URL = "http://example.test:8080/api"
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    close_pooled_sessions()
+    yield
+    close_pooled_sessions()
+
+
+@pytest.fixture
+def keep_alive_server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sessions_are_shared_per_host_and_worker_count():
+    session = get_pooled_session(URL, 4)
+    assert get_pooled_session("HTTP://EXAMPLE.test:8080/other", 4) is session
+    assert get_pooled_session(URL, 8) is not session
+    assert get_pooled_session("http://other.test/api", 4) is not session
+    assert session.get_adapter(URL)._pool_maxsize == 4
+
+
+def test_keep_alive_connection_is_reused(keep_alive_server):
+    session = get_pooled_session(keep_alive_server, 2)
+    connect_times = []
+    for _ in range(3):
+        reset_connect_time()
+        assert session.post(keep_alive_server, data=b"x").text == "ok"
+        connect_times.append(pop_connect_time())
+    assert connect_times[0] > 0
+    assert connect_times[1:] == [0.0, 0.0]
+
+
+def test_release_closes_only_after_last_user():
+    first = acquire_pooled_session(URL, 4)
+    second = acquire_pooled_session(URL, 4)
+    other = acquire_pooled_session(URL, 8)
+    assert first is second
+
+    assert release_pooled_session(URL, 4) is False
+    assert get_pooled_session(URL, 4) is first
+    assert release_pooled_session(URL, 4) is True
+    assert get_pooled_session(URL, 4) is not first
+    # 同一host其他并发数的会话仍由其批量使用，不受影响
+    assert get_pooled_session(URL, 8) is other
+    assert release_pooled_session(URL, 8) is True
+
+
+def test_release_without_acquire_keeps_session():
+    session = get_pooled_session(URL, 4)
+    assert release_pooled_session(URL, 4) is False
+    assert get_pooled_session(URL, 4) is session
+
+
+def test_close_pooled_sessions_by_host():
+    acquire_pooled_session(URL, 4)
+    get_pooled_session(URL, 8)
+    kept = get_pooled_session("http://other.test/api", 4)
+
+    assert close_pooled_sessions(URL) == 2
+    assert http_session._session_refs == {}
+    assert get_pooled_session("http://other.test/api", 4) is kept
+    # 强制关闭后成对的release不再关闭新建的会话
+    new_session = get_pooled_session(URL, 4)
+    assert release_pooled_session(URL, 4) is False
+    assert get_pooled_session(URL, 4) is new_session
@@ -0,0 +1,129 @@
+import threading
+
+import numpy as np
+import pytest
+
+from batch_data_test_tool.tools.metrics import (
+    PHASE_COLUMNS, LatencyHistogram, LiveBatchStats, RequestPhaseTimer, add_phase_columns, summarize_phase_timings
+)
+from batch_data_test_tool.tools.result_store import ResultStore
+
+
+def test_request_phase_timer_accumulates_and_stores():
+    timer = RequestPhaseTimer(build_time=0.002)
+    timer.start()
+    timer.add("ttfb", 0.1)
+    timer.add("phase_ttfb", 0.05)
+    timer.add("connect", 0.0)
+
+    store = ResultStore(2)
+    add_phase_columns(store)
+    timer.store(store, 1)
+
+    assert set(store.float_columns) == set(PHASE_COLUMNS)
+    assert store.float_columns["phase_build"][1] == 0.002
+    assert store.float_columns["phase_ttfb"][1] == 0.15
+    assert store.float_columns["phase_connect"][1] == 0.0
+    assert 0 <= store.float_columns["phase_queue_wait"][1] < 1
+    # 未记录的阶段和未写入的行保持为空
+    assert np.isnan(store.float_columns["phase_parse"][1])
+    assert np.isnan(store.float_columns["phase_ttfb"][0])
+
+
+def _summary_rows(summary):
+    lines = summary.splitlines()
+    return {line.split()[0]: line.split()[1:] for line in lines[1:]}
+
+
+def test_summarize_phase_timings():
+    store = ResultStore(4)
+    add_phase_columns(store)
+    for position, ttfb in enumerate([0.1, 0.2, 0.3]):
+        store.set_value("phase_ttfb", position, ttfb)
+        store.set_value("phase_build", position, 0.1)
+
+    rows = _summary_rows(summarize_phase_timings(store))
+    # 没有样本的阶段不输出；列依次为 样本数、平均、P50、P90、最大（毫秒）、占比
+    assert set(rows) == {"phase_build", "phase_ttfb"}
+    assert rows["phase_ttfb"] == ["3", "200.0", "200.0", "280.0", "300.0", "66.7%"]
+    assert rows["phase_build"] == ["3", "100.0", "100.0", "100.0", "100.0", "33.3%"]
+
+
+def test_summarize_phase_timings_from_chunks():
+    chunks = {"phase_ttfb": [np.array([0.1, np.nan]), np.array([0.3])], "phase_parse": []}
+    rows = _summary_rows(summarize_phase_timings(chunks))
+    assert rows == {"phase_ttfb": ["2", "200.0", "200.0", "280.0", "300.0", "100.0%"]}
+
+
+def test_summarize_phase_timings_without_samples():
+    store = ResultStore(2)
+    add_phase_columns(store)
+    assert summarize_phase_timings(store) == "暂无分阶段耗时数据"
+    assert summarize_phase_timings({}) == "暂无分阶段耗时数据"
+
+
+def test_histogram_percentiles_within_bucket_resolution():
+    rng = np.random.default_rng(7)
+    samples = rng.lognormal(mean=-2.5, sigma=1.0, size=20000)
+    histogram = LatencyHistogram(precision=0.01)
+    for value in samples:
+        histogram.record(float(value))
+
+    percents = (1, 50, 90, 99, 99.9, 100)
+    estimates = histogram.percentiles(percents)
+    for percent in percents:
+        exact = np.percentile(samples, percent, method="inverted_cdf")
+        # 取桶上界：不小于真实分位数，相对误差不超过精度
+        assert exact <= estimates[percent] <= exact * 1.01 + 1e-12, percent
+        if percent <= 99:
+            # 样本较密的区间内与numpy默认（线性插值）的差异同样在桶精度附近
+            assert estimates[percent] == pytest.approx(np.percentile(samples, percent), rel=0.02)
+    assert histogram.mean == pytest.approx(samples.mean())
+    assert histogram.max == samples.max()
+
+
+def test_empty_and_single_sample_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentiles((50, 99)) == {50: None, 99: None}
+    assert histogram.mean is None and histogram.max is None
+
+    histogram.record(None)
+    histogram.record(float("nan"))
+    assert histogram.count == 0
+
+    histogram.record(0.123)
+    assert histogram.percentiles((0, 50, 100)) == {0: 0.123, 50: 0.123, 100: 0.123}
+
+
+def test_histogram_clamps_out_of_range_values():
+    histogram = LatencyHistogram(min_value=0.001, max_value=1.0)
+    histogram.record(0.0)
+    histogram.record(5.0)
+    assert histogram.percentile(1) == pytest.approx(0.001 * 1.01)
+    assert histogram.percentile(100) == 5.0
+
+
+def test_live_batch_stats_snapshot():
+    stats = LiveBatchStats(total=10)
+    threads = [
+        threading.Thread(target=lambda: [stats.record(0.1) for _ in range(100)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.record(success=False)
+
+    snapshot = stats.snapshot()
+    assert snapshot["completed"] == 401
+    assert snapshot["total"] == 10
+    assert snapshot["error_rate"] == pytest.approx(1 / 401)
+    assert snapshot["p50"] == snapshot["p99"] == snapshot["max"] == 0.1
+    assert snapshot["throughput"] > 0
+
+
+def test_live_batch_stats_without_results():
+    snapshot = LiveBatchStats().snapshot()
+    assert snapshot["completed"] == 0 and snapshot["error_rate"] == 0.0
+    assert snapshot["p50"] is None and snapshot["max"] is None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from batch_data_test_tool.concurrency.multi_threading import multi_exec, multi_exec_stream
+
+
+def test_multi_exec_returns_results_by_index():
+    assert multi_exec(lambda x: x * 2, {"a": {"x": 1}, "b": {"x": 2}}, max_workers=2) == {"a": 2, "b": 4}
+
+
+def test_stream_caps_in_flight_tasks_and_reads_arguments_lazily():
+    state = {"pulled": 0, "yielded": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def kwargs_iter():
+        for i in range(40):
+            with lock:
+                # 本次提交后的在途任务数
+                state["max_in_flight"] = max(state["max_in_flight"], state["pulled"] - state["yielded"] + 1)
+                state["pulled"] += 1
+            yield i, {"x": i}
+
+    def func(x):
+        time.sleep(0.002)
+        return x
+
+    results = {}
+    for index, result in multi_exec_stream(func, kwargs_iter(), max_workers=2, max_in_flight=3):
+        with lock:
+            state["yielded"] += 1
+        results[index] = result
+
+    assert results == {i: i for i in range(40)}
+    assert state["max_in_flight"] == 3
+
+
+def test_stream_default_in_flight_is_twice_the_workers():
+    pulled = []
+
+    def kwargs_iter():
+        for i in range(100):
+            pulled.append(i)
+            yield i, {}
+
+    stream = multi_exec_stream(lambda: time.sleep(0.01), kwargs_iter(), max_workers=3)
+    next(stream)
+    # 第一个结果产出时最多读取了 max_workers*2 个参数
+    assert len(pulled) <= 6
+    stream.close()
+
+
+def test_stream_propagates_exception_and_cancels_pending_work():
+    started = []
+    pulled = []
+
+    def kwargs_iter():
+        for i in range(20):
+            pulled.append(i)
+            yield i, {"x": i}
+
+    def func(x):
+        started.append(x)
+        if x == 0:
+            raise ValueError("boom")
+        time.sleep(0.05)
+        return x
+
+    with pytest.raises(ValueError, match="boom"):
+        for _ in multi_exec_stream(func, kwargs_iter(), max_workers=1, max_in_flight=4):
+            pass
+    # 已提交但未开始的任务被取消，其余参数不再读取
+    assert len(pulled) == 4
+    assert set(started) <= {0, 1}
+
+
+def test_stream_returns_exceptions_as_results():
+    def func(x):
+        if x % 2:
+            raise ValueError(x)
+        return x
+
+    results = dict(multi_exec_stream(func, ((i, {"x": i}) for i in range(6)), max_workers=2, return_exceptions=True))
+    assert [results[i] for i in (0, 2, 4)] == [0, 2, 4]
+    assert all(isinstance(results[i], ValueError) for i in (1, 3, 5))
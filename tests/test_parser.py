@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from batch_data_test_tool.tools import parser
+from batch_data_test_tool.tools.parser import _deep_search, compile_json_path, get_json_field_value
+
+DOC = {
+    "user": {"name": "张三", "tags": ["a", "b", "c"]},
+    "items": [{"id": 1, "name": "x", "sub": {"name": "deep"}}, {"id": 2, "name": "y"}, {"id": 3}],
+    "data": {"answer": json.dumps({"text": "hi"}), "list": json.dumps([{"k": 1}, {"k": 2}])},
+    "matrix": [[1, 2], [3, 4]],
+    "empty": [],
+    "zero": 0,
+    "flag": False,
+    "nul": None,
+}
+
+
+@pytest.fixture(params=[True, False], ids=["jmespath", "builtin"])
+def jmespath_mode(request, monkeypatch):
+    """分别在使用jmespath和未安装jmespath（内置解析）两种情况下求值"""
+    if request.param and not parser._JMESPATH_AVAILABLE:
+        pytest.skip("jmespath未安装")
+    monkeypatch.setattr(parser, "_JMESPATH_AVAILABLE", request.param)
+    compile_json_path.cache_clear()
+    yield request.param
+    compile_json_path.cache_clear()
+
+
+# 期望值与路径编译之前（逐次扫描路径字符串、递归深度搜索）的 get_json_field_value 一致
+@pytest.mark.parametrize("path, expected", [
+    ("user.name", "张三"),
+    ("user.tags[0]", "a"),
+    ("user.tags[-1]", "c"),
+    ("user.tags[-3]", "a"),
+    ("user.tags[-4]", None),
+    ("user.tags[5]", None),
+    ("user.tags[0:2]", ["a", "b"]),
+    ("user.tags[1:10]", ["b", "c"]),
+    ("items[0].name", "x"),
+    ("items[-1].id", 3),
+    ("items[0].sub.name", "deep"),
+    ("matrix[1][0]", 3),
+    ("items[*].name", ["x", "y"]),
+    ("items[*].id", [1, 2, 3]),
+    ("items[*].sub.name", ["deep"]),
+    ("matrix[*][1]", [2, 4]),
+    ("user.*", ["张三", ["a", "b", "c"]]),
+    ("items.*", DOC["items"]),
+    ("data.list", DOC["data"]["list"]),
+    ("**.name", ["张三", "x", "deep", "y"]),
+    ("**.id", [1, 2, 3]),
+    ("**.missing", []),
+    ("missing", None),
+    ("user.missing.x", None),
+    ("user.name.first", None),
+    ("empty[0]", None),
+    ("[0]", None),
+    ("zero", 0),
+    ("flag", False),
+    ("nul", None),
+])
+def test_get_json_field_value_matches_previous_results(jmespath_mode, path, expected):
+    assert get_json_field_value(DOC, path) == expected
+    assert get_json_field_value(json.dumps(DOC, ensure_ascii=False), path) == expected
+
+
+def test_wildcard_over_json_string_values(jmespath_mode):
+    # jmespath对 "data.*.text" 直接返回空列表；内置解析会把通配符展开出的JSON字符串解析后再取值
+    expected = [] if jmespath_mode else ["hi"]
+    assert get_json_field_value(DOC, "data.*.text") == expected
+
+
+def test_compiled_path_is_cached_and_reusable(jmespath_mode):
+    compiled = compile_json_path("items[*].id")
+    assert compile_json_path("items[*].id") is compiled
+    assert compiled.search(DOC) == [1, 2, 3]
+    assert compiled.search({"items": [{"id": 9}]}) == [9]
+    assert (compiled.jmespath_expression is not None) == jmespath_mode
+    # jmespath不支持负索引，只走步骤求值
+    assert compile_json_path("items[-1].id").jmespath_expression is None
+
+
+def test_invalid_input_returns_none():
+    assert get_json_field_value("not json", "a") is None
+    assert get_json_field_value(None, "a") is None
+    assert get_json_field_value(DOC, "") is None
+
+
+NESTED = {"a": {"a": {"a": 1}}}
+
+
+def test_deep_search_max_results():
+    assert _deep_search(DOC, "name", max_results=2) == ["张三", "x"]
+    assert _deep_search(DOC, "name", max_results=0) == []
+
+
+def test_deep_search_max_depth():
+    assert _deep_search(NESTED, "a") == [{"a": {"a": 1}}, {"a": 1}, 1]
+    assert _deep_search(NESTED, "a", max_depth=1) == [{"a": {"a": 1}}, {"a": 1}]
+    assert _deep_search(NESTED, "a", max_depth=0) == [{"a": {"a": 1}}]
+
+
+def test_deep_search_with_paths():
+    assert _deep_search(DOC, "name", with_paths=True) == [
+        ("user.name", "张三"),
+        ("items[0].name", "x"),
+        ("items[0].sub.name", "deep"),
+        ("items[1].name", "y"),
+    ]
+    assert _deep_search({"a.b": [{"k": 1}]}, "k", with_paths=True) == [("a\\.b[0].k", 1)]
+
+
+def test_deep_search_does_not_recurse():
+    # 超过Python递归上限的嵌套深度
+    data = {"k": 0}
+    for _ in range(5000):
+        data = {"next": data}
+    assert _deep_search(data, "k", max_depth=10000) == [0]
+    assert _deep_search(data, "k") == []
@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_data_test_tool.tools.data_processing import clean_dataframe_for_json
+from batch_data_test_tool.tools.result_sink import ResultSink, IncrementalResultWriter, FSYNC_WRITE
+from batch_data_test_tool.tools.result_store import ResultStore, STATUS_FAILED
+
+pa_parquet = pytest.importorskip("pyarrow.parquet")
+
+
+def read_result_file(path):
+    if path.suffix == ".csv":
+        return pd.read_csv(path)
+    if path.suffix == ".jsonl":
+        return pd.read_json(path, lines=True)
+    return pd.read_parquet(path)
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".parquet"])
+def test_sink_appends_batches(tmp_path, extension):
+    path = tmp_path / f"result{extension}"
+    with ResultSink(str(path), fsync_policy=FSYNC_WRITE) as sink:
+        sink.write(pd.DataFrame({"n": [0, 1], "text": ["a", "b"]}))
+        sink.write(pd.DataFrame({"n": [2], "text": ["c"]}))
+        assert sink.rows_written == 3
+    assert sink.closed
+    result = read_result_file(path)
+    assert result["n"].tolist() == [0, 1, 2]
+    assert result["text"].tolist() == ["a", "b", "c"]
+
+
+def test_parquet_schema_is_stable_across_batches(tmp_path):
+    path = tmp_path / "result.parquet"
+    with ResultSink(str(path), column_kinds={"parsed": "string"}) as sink:
+        sink.write(pd.DataFrame({"n": [1, 2], "parsed": ["x", "y"], "empty": [None, None]}))
+        # 后续批次中解析字段变为list/dict，整数列出现空值，第一批全空的列出现数字
+        sink.write(clean_dataframe_for_json(pd.DataFrame({
+            "n": [3.0, np.nan],
+            "parsed": [["a", "b"], {"k": 1}],
+            "empty": pd.Series([5, None], dtype=object),
+        })))
+    table = pa_parquet.read_table(path)
+    assert str(table.schema.field("n").type) == "int64"
+    assert table.column("n").to_pylist() == [1, 2, 3, None]
+    assert table.column("parsed").to_pylist() == ["x", "y", '["a", "b"]', '{"k": 1}']
+    assert table.column("empty").to_pylist() == [None, None, "5", None]
+
+
+def test_writer_streams_rows_in_input_order(tmp_path):
+    path = tmp_path / "result.jsonl"
+    base_df = pd.DataFrame({"n": range(6)})
+    store = ResultStore(6)
+    writer = IncrementalResultWriter(ResultSink(str(path)), flush_rows=2, flush_interval=3600)
+    writer.bind(store, lambda positions: clean_dataframe_for_json(store.to_dataframe(base_df, positions)))
+
+    store.set_result(1, "r1", 0.1)
+    writer.poll()
+    assert writer.rows_written == 0  # 第0行未完成，不能跳过写出
+    store.set_result(0, "r0", 0.1)
+    writer.poll()
+    assert writer.rows_written == 2
+    store.set_result(4, None, status=STATUS_FAILED)
+    store.set_result(2, "r2", 0.1)
+    writer.flush(include_pending=True)  # 分块结束：已完成但不连续的行也写出
+    writer.close()
+
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [row["n"] for row in rows] == [0, 1, 2, 4]
+    assert rows[3]["response_text"] is None
+
+
+def test_writer_failure_stops_auto_save_without_raising(tmp_path):
+    class BrokenSink(ResultSink):
+        def write(self, df):
+            if self.rows_written:
+                raise OSError("disk full")
+            super().write(df)
+
+    path = tmp_path / "result.csv"
+    store = ResultStore(4)
+    writer = IncrementalResultWriter(BrokenSink(str(path)), flush_rows=1)
+    writer.bind(store, lambda positions: store.to_dataframe(None, positions))
+    for position in range(4):
+        store.set_result(position, f"r{position}", 0.1)
+        writer.poll()
+
+    assert writer.failed
+    assert isinstance(writer.error, OSError)
+    assert writer.sink.closed
+    writer.flush(include_pending=True)
+    writer.close()
+    assert writer.rows_written == 1
+    assert pd.read_csv(path)["response_text"].tolist() == ["r0"]
+
+
+def test_invalid_sink_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        ResultSink(str(tmp_path / "result.xlsx"))
+    with pytest.raises(ValueError):
+        ResultSink(str(tmp_path / "result.csv"), fsync_policy="sometimes")
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from batch_data_test_tool.tools.result_store import (
+    ResultStore, STATUS_ERROR, STATUS_FAILED, STATUS_PENDING, STATUS_SUCCEED
+)
+
+
+def _filled_store():
+    store = ResultStore(4, float_columns=["ttfb"], object_columns=["answer"])
+    # 按完成顺序（乱序）写入
+    for position, status in [(3, STATUS_SUCCEED), (0, STATUS_FAILED), (2, STATUS_SUCCEED)]:
+        store.set_result(position, f"text{position}" if status == STATUS_SUCCEED else None, position / 10, status)
+        store.set_value("ttfb", position, position / 100)
+        store.set_value("answer", position, {"p": position})
+    return store
+
+
+def test_to_dataframe_keeps_input_order_for_out_of_order_writes():
+    store = _filled_store()
+    base = pd.DataFrame({"q": list("abcd"), "response_text": ["old"] * 4}, index=[10, 11, 12, 13])
+    df = store.to_dataframe(base)
+
+    assert list(df.columns) == ["q", "response_text", "response_time", "answer", "ttfb"]
+    assert list(df.index) == [10, 11, 12, 13]
+    assert df["response_text"].isna().tolist() == [True, True, False, False]
+    assert df["response_text"].tolist()[2:] == ["text2", "text3"]
+    assert df["answer"].tolist() == [{"p": 0}, None, {"p": 2}, {"p": 3}]
+    assert math.isnan(df.loc[11, "response_time"]) and math.isnan(df.loc[11, "ttfb"])
+    assert df.loc[13, "ttfb"] == 0.03
+
+
+def test_to_dataframe_positions_select_completed_rows():
+    store = _filled_store()
+    base = pd.DataFrame({"q": list("abcd")}, index=[10, 11, 12, 13])
+    positions = np.array([3, 0])
+    df = store.to_dataframe(base, positions)
+
+    assert list(df.index) == [13, 10]
+    assert df["q"].tolist() == ["d", "a"]
+    assert df.loc[13, "response_text"] == "text3" and pd.isna(df.loc[10, "response_text"])
+    assert store.to_dataframe(positions=positions)["response_time"].tolist() == [0.3, 0.0]
+
+
+def test_status_counts_and_column_kinds():
+    store = _filled_store()
+    store.set_result(1, status=STATUS_ERROR)
+    assert store.completed_count == 4
+    assert store.success_count == 2
+    assert ResultStore(2).completed_count == 0 and ResultStore(2).status[0] == STATUS_PENDING
+    assert store.column_kinds() == {
+        "response_text": "string",
+        "response_time": "float",
+        "answer": "string",
+        "ttfb": "float",
+    }
@@ -0,0 +1,116 @@
+import json
+
+from batch_data_test_tool.tools.sse_parser import SSEStreamParser, SSEStreamRecorder, parse_http_stream_response
+
+
+def _event(finish, content):
+    return "data: " + json.dumps({"finish": finish, "content": content}, ensure_ascii=False)
+
+
+STREAM = "\r\n\r\n".join([
+    _event(False, [{"content": "你好"}]),
+    _event(False, [{"content": "，世界"}]),
+    ": keep-alive comment",
+    _event(True, [{"content": ""}, {"content": [{"id": 1}, {"id": 2}]}]),
+    "data: [DONE]",
+]).encode("utf-8") + b"\r\n\r\n"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+def _record(chunks):
+    recorder = SSEStreamRecorder(start_time=0.0, clock=FakeClock())
+    for chunk in chunks:
+        recorder.feed(chunk)
+    return recorder.close()
+
+
+def test_recorder_handles_any_chunk_boundary():
+    # 逐字节输入：多字节UTF-8字符和\r\n都会被分块拆开
+    for size in (1, 2, 3, 5, 7, len(STREAM)):
+        chunks = [STREAM[i:i + size] for i in range(0, len(STREAM), size)]
+        parser = _record(chunks).parser
+        assert parser.answer == "你好，世界", size
+        assert parser.recall_list == [{"id": 1}, {"id": 2}], size
+        assert parser.event_count == 4, size
+        assert parser.error_count == 1, size
+
+
+def test_recorder_crlf_split_between_chunks_does_not_end_event():
+    # 多行data事件的\r\n被拆到两个分块，不能被当作两次换行（空行）提前结束事件
+    chunks = [b'data: {"finish": false,\r', b'\ndata: "content": [{"content": "a"}]}\r', b'\n\r', b'\n']
+    parser = _record(chunks).parser
+    assert parser.event_count == 1
+    assert parser.error_count == 0
+    assert parser.answer == "a"
+
+
+def test_recorder_flushes_last_event_without_trailing_newline():
+    recorder = _record([_event(False, [{"content": "x"}]).encode()])
+    assert recorder.parser.answer == "x"
+    assert recorder.metrics()["event_count"] == 1
+
+
+def test_recorder_metrics_use_event_arrival_times():
+    first = _event(False, [{"content": "a"}]).encode() + b"\n\n"
+    second = _event(False, [{"content": "b"}]).encode() + b"\n\n"
+    metrics = _record([first, second]).metrics()
+    # 时钟每次调用加1秒：两个分块分别在1、2秒到达，close在3秒
+    assert metrics["ttfb"] == 1.0
+    assert metrics["time_to_first_event"] == 1.0
+    assert metrics["inter_event_gap_avg"] == 1.0
+    assert metrics["total_duration"] == 3.0
+    assert metrics["event_count"] == 2
+
+
+def test_parser_joins_multi_line_data():
+    parser = SSEStreamParser()
+    for line in ['data: {"finish": false,', 'data:  "content": [{"content": "z"}]}', '']:
+        parser.feed_line(line)
+    assert parser.answer == "z"
+    assert parser.error_count == 0
+
+
+def test_parse_http_stream_response_keeps_unicode_line_separator():
+    class FakeResponse:
+        def iter_lines(self):
+            return iter(STREAM.replace("你好".encode(), "你 好".encode()).splitlines())
+
+    answer, recall_list = parse_http_stream_response(FakeResponse())
+    assert answer == "你 好，世界"
+    assert recall_list == [{"id": 1}, {"id": 2}]
+
+
+NO_BLANK_LINE_STREAM = [
+    _event(False, [{"content": "a"}]),
+    _event(False, [{"content": "b"}]),
+    _event(True, [{"content": ""}, {"content": ["r"]}]),
+]
+
+
+def test_parser_splits_data_lines_without_blank_line_separators():
+    class FakeResponse:
+        def iter_lines(self):
+            return iter(line.encode() for line in NO_BLANK_LINE_STREAM)
+
+    parser = SSEStreamParser.from_response(FakeResponse())
+    assert (parser.answer, parser.recall_list) == ("ab", ["r"])
+    assert parser.event_count == 3
+    assert parser.error_count == 0
+
+
+def test_recorder_times_events_without_blank_line_separators():
+    # 每个data行单独一个分块到达（1、2、3秒），close在4秒
+    metrics = _record([line.encode() + b"\n" for line in NO_BLANK_LINE_STREAM]).metrics()
+    assert metrics["event_count"] == 3
+    assert metrics["time_to_first_event"] == 1.0
+    assert metrics["inter_event_gap_avg"] == 1.0
+    assert metrics["inter_event_gap_max"] == 1.0
+    assert metrics["total_duration"] == 4.0
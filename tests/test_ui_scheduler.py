@@ -0,0 +1,39 @@
+import time
+from types import SimpleNamespace
+
+from batch_data_test_tool.components.ui_scheduler import UIRefreshScheduler
+
+
+class FakeOutput:
+    def __init__(self):
+        self.text = ""
+
+    def append_stdout(self, text):
+        self.text += text
+
+
+def test_advance_is_throttled_and_close_flushes():
+    bar, output = SimpleNamespace(value=0), FakeOutput()
+    refresher = UIRefreshScheduler(progress_bar=bar, output=output, total=3, interval_ms=60000, periodic=False)
+    refresher.advance()
+    refresher.advance(line="❌ 行1: 请求失败\n")
+    assert bar.value == 0 and output.text == ""
+
+    refresher.close()
+    assert bar.value == 2
+    assert output.text == "❌ 行1: 请求失败\n"
+
+
+def test_periodic_tick_refreshes_without_completions():
+    refreshes = []
+    refresher = UIRefreshScheduler(total=1, interval_ms=20, on_refresh=lambda: refreshes.append(time.perf_counter()))
+    try:
+        time.sleep(0.2)
+        assert len(refreshes) >= 3
+    finally:
+        refresher.close()
+    assert not refresher._ticker.is_alive()
+    count = len(refreshes)
+    time.sleep(0.06)
+    assert len(refreshes) == count
+    refresher.close()